@@ -0,0 +1,335 @@
+# src/llm_logparser/bench/runner.py
+"""
+End-to-end benchmark (`llm-logparser bench`).
+
+A synthetic export (synth.SynthSpec) is written once per spec and then run
+through these scenarios:
+
+- parse, parse-mmap        parse_to_jsonl with jobs=1 (stream / mmap reader)
+- parse-jobsN, parse-mmap-jobsN   the same with N worker processes
+- adapter                  the provider adapter (NodeTable linearization) over conversations
+                           already in memory: no reading, no writing
+- export                   export_thread_md over every thread of "parse"
+- chain, chain-jobsN       the CLI chain command (parse + Markdown export)
+
+Each scenario runs in a fresh interpreter so that its peak RSS is its own;
+the timed region excludes interpreter start-up and imports. With repeat > 1
+the fastest run is kept (and the highest peak RSS).
+
+Parallel and mmap variants must write exactly the same bytes as their serial
+counterpart (manifest `exported_at` aside); the tree digests are compared
+and any mismatch fails the run, as does a regression against a baseline.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .synth import SynthSpec, write_export
+
+BENCH_VERSION = 1
+DEFAULT_TOLERANCE = 0.15
+DEFAULT_MEMORY_TOLERANCE = 0.25
+
+# scenario -> the serial scenario whose output it must reproduce byte for byte
+_REFERENCE = {"parse-mmap": "parse"}
+
+
+def scenario_names(jobs: int) -> List[str]:
+    names = ["parse", "parse-mmap", "adapter", "export", "chain"]
+    if jobs > 1:
+        names[2:2] = [f"parse-jobs{jobs}", f"parse-mmap-jobs{jobs}"]
+        names.append(f"chain-jobs{jobs}")
+    return names
+
+
+def reference_of(name: str) -> Optional[str]:
+    """The serial scenario `name` is checked against (None for serial ones)."""
+    base, _, jobs = name.partition("-jobs")
+    if jobs:
+        return base
+    return _REFERENCE.get(name)
+
+
+# ------------------------------------------------------------
+# child side: run one scenario and report its cost
+# ------------------------------------------------------------
+
+def _maxrss(who: int) -> Optional[int]:
+    from llm_logparser.core.runstats import _maxrss_bytes
+
+    return _maxrss_bytes(who)
+
+
+# Each _prepare_* does the untimed set-up and returns the timed callable.
+
+def _prepare_parse(params: Dict[str, Any]) -> Callable[[], Any]:
+    from llm_logparser.core.parser import parse_to_jsonl
+
+    return lambda: parse_to_jsonl(
+        "openai", Path(params["input"]), Path(params["outdir"]),
+        jobs=params["jobs"], reader=params["reader"],
+    )
+
+
+def _prepare_adapter(params: Dict[str, Any]) -> Callable[[], Any]:
+    from llm_logparser.core.parser import load_adapter
+
+    convs = json.loads(Path(params["input"]).read_text(encoding="utf-8"))
+    spec = load_adapter("openai")
+    source = params["input"]
+    return lambda: sum(len(spec.adapt(conv, source)) for conv in convs)
+
+
+def _prepare_export(params: Dict[str, Any]) -> Callable[[], Any]:
+    from llm_logparser.core.exporter import export_thread_md
+    from llm_logparser.core.store import find_parsed_threads
+
+    out = Path(params["outdir"])
+    threads = find_parsed_threads(Path(params["parsed_root"]))
+
+    def run() -> None:
+        for parsed in threads:
+            export_thread_md(parsed, out / f"{parsed.parent.name}.md")
+
+    return run
+
+
+def _prepare_chain(params: Dict[str, Any]) -> Callable[[], Any]:
+    from llm_logparser.cli.cli import main
+
+    sys.argv = [
+        "llm-logparser", "--log-level", "WARNING", "chain",
+        "--provider", "openai", "--input", params["input"],
+        "--outdir", params["outdir"], "--jobs", str(params["jobs"]),
+    ]
+    return main
+
+
+_PREPARE = {
+    "parse": _prepare_parse,
+    "adapter": _prepare_adapter,
+    "export": _prepare_export,
+    "chain": _prepare_chain,
+}
+
+
+def _child_main(kind: str, params_json: str, result_path: str) -> None:
+    import resource
+
+    run = _PREPARE[kind](json.loads(params_json))
+    cpu, wall = time.process_time(), time.perf_counter()
+    run()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    Path(result_path).write_text(json.dumps({
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "peak_rss_bytes": _maxrss(resource.RUSAGE_SELF),
+        "peak_rss_workers_bytes": _maxrss(resource.RUSAGE_CHILDREN),
+    }), encoding="utf-8")
+
+
+# ------------------------------------------------------------
+# parent side
+# ------------------------------------------------------------
+
+def _child_env() -> Dict[str, str]:
+    # make this copy of llm_logparser importable in the child
+    src = str(Path(__file__).resolve().parents[2])
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def _spawn(kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        result = Path(tmp) / "result.json"
+        proc = subprocess.run(
+            [sys.executable, "-m", "llm_logparser.bench.runner", kind, json.dumps(params), str(result)],
+            env=_child_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        if proc.returncode != 0 or not result.exists():
+            raise RuntimeError(f"bench scenario {kind} failed (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+        return json.loads(result.read_text(encoding="utf-8"))
+
+
+def _params(name: str, workdir: Path, input_path: Path) -> tuple[str, Dict[str, Any], Path]:
+    outdir = workdir / name
+    base, _, jobs = name.partition("-jobs")
+    n = int(jobs) if jobs else 1
+    if base in ("parse", "parse-mmap"):
+        reader = "mmap" if base == "parse-mmap" else "stream"
+        return "parse", {"input": str(input_path), "outdir": str(outdir), "jobs": n, "reader": reader}, outdir
+    if base == "adapter":
+        return "adapter", {"input": str(input_path)}, outdir
+    if base == "export":
+        return "export", {"parsed_root": str(workdir / "parse" / "openai"), "outdir": str(outdir)}, outdir
+    if base == "chain":
+        return "chain", {"input": str(input_path), "outdir": str(outdir), "jobs": n}, outdir
+    raise ValueError(f"unknown bench scenario: {name}")
+
+
+def tree_digest(root: Path) -> Optional[str]:
+    """
+    sha256 over every file under `root` (relative path + bytes); volatile
+    manifest fields are dropped and export-cache sidecars (which record input
+    mtimes) are skipped.
+    """
+    from llm_logparser.core.exporter import is_export_cache
+
+    if not root.exists():
+        return None
+    h = hashlib.sha256()
+    for p in sorted(root.rglob("*")):
+        if not p.is_file() or is_export_cache(p):
+            continue
+        data = p.read_bytes()
+        if p.name == "manifest.json":
+            manifest = json.loads(data)
+            manifest.pop("exported_at", None)
+            data = json.dumps(manifest, sort_keys=True).encode("utf-8")
+        h.update(p.relative_to(root).as_posix().encode("utf-8") + b"\0")
+        h.update(len(data).to_bytes(8, "little") + data)
+    return h.hexdigest()
+
+
+def prepare_input(workdir: Path, spec: SynthSpec) -> Dict[str, Any]:
+    """Write (or reuse) the synthetic export for `spec` under workdir."""
+    path = workdir / "conversations.json"
+    meta_path = workdir / "conversations.spec.json"
+    if path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("spec") == spec.to_dict() and meta.get("bytes") == path.stat().st_size:
+            return {**meta, "path": path}
+    info = write_export(path, spec)
+    meta = {"spec": spec.to_dict(), **info}
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return {**meta, "path": path}
+
+
+def run_bench(
+    workdir: Path,
+    spec: SynthSpec,
+    *,
+    jobs: int = 2,
+    repeat: int = 1,
+    scenarios: Optional[Sequence[str]] = None,
+    keep: bool = False,
+    log=print,
+) -> Dict[str, Any]:
+    """Run the scenarios and return the results (see README "Benchmarks")."""
+    workdir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    data = prepare_input(workdir, spec)
+    log(f"input: {data['path']} ({data['bytes']} bytes, {data['conversations']} conversations, "
+        f"{data['messages']} messages; {time.perf_counter() - t0:.1f}s)")
+
+    names = list(scenarios or scenario_names(jobs))
+    if "export" in names and "parse" not in names:
+        names.insert(names.index("export"), "parse")
+    results: Dict[str, Dict[str, Any]] = {}
+    digests: Dict[str, Optional[str]] = {}
+    for name in names:
+        kind, params, outdir = _params(name, workdir, data["path"])
+        best: Optional[Dict[str, Any]] = None
+        peak = 0
+        for _ in range(max(1, repeat)):
+            shutil.rmtree(outdir, ignore_errors=True)
+            run = _spawn(kind, params)
+            peak = max(peak, run["peak_rss_bytes"] or 0, run["peak_rss_workers_bytes"] or 0)
+            if best is None or run["wall_seconds"] < best["wall_seconds"]:
+                best = run
+        assert best is not None
+        wall = best["wall_seconds"]
+        row = {
+            "wall_seconds": round(wall, 6),
+            "cpu_seconds": round(best["cpu_seconds"], 6),
+            "mb_per_second": round(data["bytes"] / wall / 1e6, 3) if wall else None,
+            "conversations_per_second": round(data["conversations"] / wall, 3) if wall else None,
+            "messages_per_second": round(data["messages"] / wall, 3) if wall else None,
+            "peak_rss_bytes": peak,
+        }
+        results[name] = row
+        if kind != "adapter":
+            digests[name] = tree_digest(outdir)
+        log(f"{name:<22} {wall:8.3f}s {row['mb_per_second']:>9} MB/s "
+            f"{row['messages_per_second']:>12} msg/s  peak RSS {peak / 2**20:8.1f} MiB")
+
+    identical: Dict[str, bool] = {}
+    for name in names:
+        ref = reference_of(name)
+        if ref is not None and ref in digests and name in digests:
+            identical[name] = digests[name] is not None and digests[name] == digests[ref]
+
+    if not keep:
+        for name in names:
+            shutil.rmtree(workdir / name, ignore_errors=True)
+
+    return {
+        "version": BENCH_VERSION,
+        "spec": spec.to_dict(),
+        "input": {k: data[k] for k in ("bytes", "conversations", "messages")},
+        "jobs": jobs,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scenarios": results,
+        "identical": identical,
+    }
+
+
+def compare_to_baseline(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    *,
+    tolerance: float = DEFAULT_TOLERANCE,
+    memory_tolerance: float = DEFAULT_MEMORY_TOLERANCE,
+) -> List[str]:
+    """
+    Regressions of `current` against `baseline` (empty list: none).
+    Throughput may drop by `tolerance` and peak RSS grow by `memory_tolerance`
+    (fractions) before a scenario counts as regressed.
+    """
+    if baseline.get("version") != BENCH_VERSION:
+        raise ValueError(f"unsupported baseline version {baseline.get('version')!r}")
+    if baseline.get("spec") != current.get("spec"):
+        raise ValueError("baseline was recorded with a different spec; re-run with the same sizes")
+    problems = []
+    for name, row in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        now_rate, base_rate = row.get("messages_per_second"), base.get("messages_per_second")
+        if now_rate and base_rate and now_rate < base_rate * (1 - tolerance):
+            problems.append(
+                f"{name}: throughput {now_rate:.0f} msg/s is {1 - now_rate / base_rate:.0%} below baseline {base_rate:.0f}"
+            )
+        now_rss, base_rss = row.get("peak_rss_bytes"), base.get("peak_rss_bytes")
+        if now_rss and base_rss and now_rss > base_rss * (1 + memory_tolerance):
+            problems.append(
+                f"{name}: peak RSS {now_rss / 2**20:.1f} MiB is {now_rss / base_rss - 1:.0%} above baseline "
+                f"{base_rss / 2**20:.1f} MiB"
+            )
+    return problems
+
+
+def mismatches(results: Dict[str, Any]) -> List[str]:
+    return [
+        f"{name}: output differs from {reference_of(name)}"
+        for name, same in results.get("identical", {}).items()
+        if not same
+    ]
+
+
+if __name__ == "__main__":
+    _child_main(*sys.argv[1:4])
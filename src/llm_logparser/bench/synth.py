@@ -0,0 +1,128 @@
+# src/llm_logparser/bench/synth.py
+"""
+Synthetic ChatGPT-style exports for benchmarks.
+
+The output has the shape of a real `conversations.json`: a top-level array of
+conversations, each with a `mapping` of nodes linked by parent/children and
+a structural root. Content is deterministic for a given SynthSpec (seeded RNG).
+
+Each conversation has `nodes` messages on its main path, alternating user and
+assistant. With probability `branching` a node also gets an alternative
+child: an edited or regenerated message that ends its branch. The adapter
+linearizes every node, so a conversation yields `nodes` + branches messages.
+"""
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict
+
+# Word pools. The Latin pool includes JSON-significant characters so that
+# the scanners and decoders see escapes and brackets inside strings.
+_LATIN = (
+    "the quick export parser thread message reply model data stream value "
+    "index token error retry cache merge split render format output input "
+    'json "quoted" back\\slash {brace} [bracket] a,b tab\there'
+).split(" ")
+_CJK = (
+    "東京 データ 会話 解析 出力 変換 日本語 文字列 처리 대화 数据 导出 "
+    "メッセージ スレッド 分割 形式 確認 ありがとう こんにちは 了解しました"
+).split(" ")
+_CODE = "```python\nfor i in range(3):\n    print(i)\n```"
+
+
+@dataclass(frozen=True)
+class SynthSpec:
+    """Shape of a synthetic export (all sizes are per conversation unless noted)."""
+    conversations: int = 200
+    nodes: int = 40
+    branching: float = 0.1
+    message_chars: int = 400
+    cjk_ratio: float = 0.3
+    seed: int = 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _text(rng: random.Random, spec: SynthSpec) -> str:
+    target = max(1, int(spec.message_chars * rng.uniform(0.5, 1.5)))
+    words: list[str] = []
+    size = 0
+    while size < target:
+        w = rng.choice(_CJK) if rng.random() < spec.cjk_ratio else rng.choice(_LATIN)
+        words.append(w)
+        size += len(w) + 1
+    if rng.random() < 0.1:
+        words.append("\n\n" + _CODE + "\n")
+    return " ".join(words)
+
+
+def _node(nid: str, parent: str, role: str, ts: float, text: str) -> Dict[str, Any]:
+    return {
+        "id": nid,
+        "message": {
+            "id": nid,
+            "author": {"role": role, "name": None, "metadata": {}},
+            "create_time": ts,
+            "update_time": None,
+            "content": {"content_type": "text", "parts": [text]},
+            "status": "finished_successfully",
+            "end_turn": role == "assistant",
+            "weight": 1.0,
+            "metadata": {"model_slug": "gpt-4o"} if role == "assistant" else {},
+            "recipient": "all",
+            "channel": None,
+        },
+        "parent": parent,
+        "children": [],
+    }
+
+
+def make_conversation(index: int, rng: random.Random, spec: SynthSpec) -> Dict[str, Any]:
+    cid = f"synth-{spec.seed}-{index:07d}"
+    t0 = 1_700_000_000.0 + index * 3600
+    mapping: Dict[str, Any] = {
+        "client-created-root": {"id": "client-created-root", "message": None, "parent": None, "children": []}
+    }
+    parent = "client-created-root"
+    for k in range(spec.nodes):
+        nid = f"{cid}-n{k:05d}"
+        role = "user" if k % 2 == 0 else "assistant"
+        ts = t0 + k * 10
+        mapping[nid] = _node(nid, parent, role, ts, _text(rng, spec))
+        mapping[parent]["children"].append(nid)
+        if k and rng.random() < spec.branching:
+            alt = f"{nid}-alt"
+            mapping[alt] = _node(alt, parent, role, ts + 5, _text(rng, spec))
+            mapping[parent]["children"].append(alt)
+        parent = nid
+    return {
+        "title": f"synthetic {index}",
+        "create_time": t0,
+        "update_time": t0 + spec.nodes * 10,
+        "mapping": mapping,
+        "moderation_results": [],
+        "current_node": parent,
+        "conversation_id": cid,
+        "id": cid,
+    }
+
+
+def write_export(path: Path, spec: SynthSpec) -> Dict[str, int]:
+    """Stream a synthetic export to `path`; returns conversation/message/byte counts."""
+    rng = random.Random(spec.seed)
+    messages = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(spec.conversations):
+            conv = make_conversation(i, rng, spec)
+            messages += len(conv["mapping"]) - 1
+            if i:
+                f.write(", ")
+            f.write(json.dumps(conv, ensure_ascii=False))
+        f.write("]\n")
+    return {"conversations": spec.conversations, "messages": messages, "bytes": path.stat().st_size}
@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import argparse
+import glob
+import json
 import os
 import sys
 from typing import Any, Dict
@@ -46,6 +48,44 @@ def validate_path(
     return target
 
 
+def resolve_input_paths(specs: list[str | Path]) -> list[Path]:
+    """--input の展開: ファイル / ディレクトリ / glob / 複数指定
+
+    - directory: 直下の入力ファイル (parser.INPUT_SUFFIXES) を名前順
+    - glob: マッチしたファイルを名前順
+    - 重複は最初の出現位置で 1 回だけ
+    """
+    from llm_logparser.core.parser import INPUT_SUFFIXES
+
+    out: list[Path] = []
+    seen: set[Path] = set()
+    for spec in specs:
+        raw = str(spec)
+        target = Path(raw).expanduser()
+        if target.is_dir():
+            matches = sorted(
+                p for p in target.iterdir()
+                if p.is_file() and p.name.lower().endswith(INPUT_SUFFIXES)
+            )
+        elif target.exists():
+            matches = [target]
+        elif glob.has_magic(raw):
+            matches = sorted(
+                Path(p) for p in glob.glob(os.path.expanduser(raw), recursive=True)
+                if Path(p).is_file()
+            )
+        else:
+            matches = []
+        if not matches:
+            raise FileNotFoundError(f"指定されたパスが存在しません: {target}")
+        for p in matches:
+            key = p.resolve()
+            if key not in seen:
+                seen.add(key)
+                out.append(p)
+    return out
+
+
 def validate_split_option(raw: str | None) -> str | None:
     if raw is None:
         return None
@@ -78,6 +118,27 @@ def main():
         default=None,
         help=_("cli.option.log_level.help"),
     )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        type=Path,
+        metavar="DIR",
+        default=None,
+        help="Profile parse/export/chain per stage with cProfile; write <stage>.pstats and summary.txt to DIR",
+    )
+    parser.add_argument(
+        "--profile-top",
+        dest="profile_top",
+        type=int,
+        default=30,
+        help="Functions (and allocation sites) listed per stage in the profile summary (default: 30)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        dest="profile_memory",
+        action="store_true",
+        help="With --profile: trace allocations with tracemalloc and write memory-<phase>.txt",
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
@@ -96,7 +157,8 @@ def main():
     parse_cmd.add_argument(
         "--input",
         required=True,
-        type=Path,
+        nargs="+",
+        action="extend",
         help=_("cli.parse.opt.input.help"),
     )
     parse_cmd.add_argument(
@@ -124,6 +186,62 @@ def main():
         action="store_true",
         help="Validate normalized messages against message.schema.json",
     )
+    parse_cmd.add_argument(
+        "--jobs",
+        "-j",
+        dest="jobs",
+        type=int,
+        default=1,
+        help="Worker processes for adapter/validation/serialization (0 = all CPUs; default: 1)",
+    )
+    parse_cmd.add_argument(
+        "--reader",
+        dest="reader",
+        choices=["stream", "mmap"],
+        default="stream",
+        help="Input reader: stream (ijson/JSONL) or mmap (split JSON arrays into byte ranges decoded by workers)",
+    )
+    parse_cmd.add_argument(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        help="Continue an interrupted parse of the same inputs from its last checkpoint",
+    )
+    parse_cmd.add_argument(
+        "--layout",
+        dest="layout",
+        choices=["dirs", "packed"],
+        default="dirs",
+        help="Output layout: dirs (thread-<cid>/parsed.jsonl) or packed (threads.pack + threads.idx)",
+    )
+    parse_cmd.add_argument(
+        "--branch",
+        dest="branch",
+        choices=["merged", "active", "all"],
+        default="merged",
+        help="Regenerated/edited branches: merged (all nodes in one thread), active (current branch only), "
+             "all (one thread per branch, <cid>~<leaf>)",
+    )
+    parse_cmd.add_argument(
+        "--group-messages",
+        dest="group_messages",
+        action="store_true",
+        help="Input has one message per record: group records by conversation_id (external sort) before parsing",
+    )
+    parse_cmd.add_argument(
+        "--group-buffer",
+        dest="group_buffer",
+        type=int,
+        default=100_000,
+        help="With --group-messages: records kept in memory before spilling a sorted run to disk (default: 100000)",
+    )
+    parse_cmd.add_argument(
+        "--stats-json",
+        dest="stats_json",
+        type=Path,
+        metavar="PATH",
+        help="Write a JSON report (stage timings, throughput, peak RSS, largest thread) to PATH",
+    )
 
     # ------------------------------------------------------------
     # export サブコマンド
@@ -132,7 +250,8 @@ def main():
         "export",
         help="Export a normalized thread JSONL into a single Markdown file",
     )
-    export_cmd.add_argument("--input", required=True, type=Path, help="Path to thread parsed.jsonl")
+    export_cmd.add_argument("--input", required=True, type=Path, help="Path to thread parsed.jsonl (or a packed provider directory with --thread)")
+    export_cmd.add_argument("--thread", dest="thread", help="conversation_id to export from a packed provider directory")
     export_cmd.add_argument("--out", required=False, type=Path, help="Output Markdown path")
     export_cmd.add_argument(
         "--timezone",
@@ -148,6 +267,8 @@ def main():
     export_cmd.add_argument("--split-hard", dest="split_hard", action="store_true")
     export_cmd.add_argument("--split-preview", dest="split_preview", action="store_true")
     export_cmd.add_argument("--tiny-tail-threshold", dest="tiny_tail_threshold", type=int, default=20, help="Threshold for tail merge (message count)")
+    export_cmd.add_argument("--force", dest="force", action="store_true", help="Re-render even when the export cache says the Markdown is up to date")
+    export_cmd.add_argument("--stats-json", dest="stats_json", type=Path, metavar="PATH", help="Write a JSON report (stage timings, throughput, peak RSS, largest thread) to PATH")
 
     # ------------------------------------------------------------
     # chain サブコマンド（parse → export を一気通し）
@@ -163,7 +284,7 @@ def main():
         action="store_true",
         help=_("cli.parse.opt.dry_run.help"),
     )
-    chain_cmd.add_argument("--input", required=True, type=Path, help="Input JSON/JSONL path")
+    chain_cmd.add_argument("--input", required=True, nargs="+", action="extend", help="Input JSON/JSONL path(s), directories or globs (repeatable)")
     chain_cmd.add_argument("--outdir", required=False, type=Path, default=Path("artifacts"), help="Root directory for artifacts (parse+export). Parsed JSONL will be under outdir/output/<provider>/...")
     chain_cmd.add_argument(
         "--timezone",
@@ -179,6 +300,7 @@ def main():
     chain_cmd.add_argument("--split-hard", dest="split_hard", action="store_true")
     chain_cmd.add_argument("--split-preview", dest="split_preview", action="store_true")
     chain_cmd.add_argument("--tiny-tail-threshold", dest="tiny_tail_threshold", type=int, default=20, help="Threshold for tail merge (message count)")
+    chain_cmd.add_argument("--force", dest="force", action="store_true", help="Re-render every thread, ignoring the export cache")
     chain_cmd.add_argument("--export-outdir", dest="export_outdir", type=Path,help="Optional root directory to place all exported Markdown files. If omitted, Markdown is written next to each thread directory.")
     chain_cmd.add_argument("--parsed-root", dest="parsed_root", type=Path, help="Optional root directory that already contains parsed threads (…/thread-*/parsed.jsonl). If specified, parse phase is skipped.")
     chain_cmd.add_argument("--fail-fast", dest="fail_fast", action="store_true", help="Stop chain processing on first export error. Default is to continue.")
@@ -188,6 +310,104 @@ def main():
         action="store_true",
         help="Validate normalized messages during the parse phase",
     )
+    chain_cmd.add_argument(
+        "--jobs",
+        "-j",
+        dest="jobs",
+        type=int,
+        default=1,
+        help="Worker processes for the parse and export phases (0 = all CPUs; default: 1)",
+    )
+    chain_cmd.add_argument(
+        "--reader",
+        dest="reader",
+        choices=["stream", "mmap"],
+        default="stream",
+        help="Input reader for the parse phase (stream|mmap)",
+    )
+    chain_cmd.add_argument(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        help="Continue an interrupted parse phase from its last checkpoint",
+    )
+    chain_cmd.add_argument(
+        "--layout",
+        dest="layout",
+        choices=["dirs", "packed"],
+        default="dirs",
+        help="Parsed output layout (dirs|packed)",
+    )
+    chain_cmd.add_argument(
+        "--branch",
+        dest="branch",
+        choices=["merged", "active", "all"],
+        default="merged",
+        help="Branch handling for parse (merged|active|all)",
+    )
+    chain_cmd.add_argument(
+        "--group-messages",
+        dest="group_messages",
+        action="store_true",
+        help="Input has one message per record: group by conversation_id before parsing",
+    )
+    chain_cmd.add_argument(
+        "--group-buffer",
+        dest="group_buffer",
+        type=int,
+        default=100_000,
+        help="With --group-messages: records kept in memory before spilling to disk (default: 100000)",
+    )
+    chain_cmd.add_argument(
+        "--stats-json",
+        dest="stats_json",
+        type=Path,
+        metavar="PATH",
+        help="Write a JSON report (stage timings, throughput, peak RSS, largest thread) to PATH",
+    )
+
+    # ------------------------------------------------------------
+    # unpack サブコマンド
+    # ------------------------------------------------------------
+    unpack_cmd = subparsers.add_parser(
+        "unpack",
+        help="Rewrite a packed parse output (threads.pack) as thread-<cid>/parsed.jsonl directories",
+    )
+    unpack_cmd.add_argument("--input", required=True, type=Path, help="Provider directory containing threads.idx")
+    unpack_cmd.add_argument("--remove-pack", dest="remove_pack", action="store_true", help="Also delete threads.pack (threads.idx is always removed)")
+
+    # ------------------------------------------------------------
+    # providers サブコマンド
+    # ------------------------------------------------------------
+    providers_cmd = subparsers.add_parser(
+        "providers",
+        help="List available providers (built-in and installed plugins) without loading them",
+    )
+    providers_cmd.add_argument("--json", dest="as_json", action="store_true", help="Print the list as JSON")
+    providers_cmd.add_argument("--refresh", action="store_true", help="Load every adapter once to refresh the cached plugin metadata")
+
+    # ------------------------------------------------------------
+    # bench サブコマンド
+    # ------------------------------------------------------------
+    bench_cmd = subparsers.add_parser(
+        "bench",
+        help="Benchmark parse/export/chain on a synthetic export; compare with a baseline",
+    )
+    bench_cmd.add_argument("--workdir", type=Path, default=Path("artifacts/bench"), help="Where the synthetic input and outputs go (default: artifacts/bench)")
+    bench_cmd.add_argument("--conversations", type=int, default=200, help="Conversations in the synthetic export (default: 200)")
+    bench_cmd.add_argument("--nodes", type=int, default=40, help="Messages on each conversation's main path (default: 40)")
+    bench_cmd.add_argument("--branching", type=float, default=0.1, help="Probability that a node gets an alternative child (default: 0.1)")
+    bench_cmd.add_argument("--message-chars", dest="message_chars", type=int, default=400, help="Average message length in characters (default: 400)")
+    bench_cmd.add_argument("--cjk-ratio", dest="cjk_ratio", type=float, default=0.3, help="Fraction of CJK words in messages (default: 0.3)")
+    bench_cmd.add_argument("--seed", type=int, default=1)
+    bench_cmd.add_argument("--jobs", type=int, default=2, help="Worker processes for the parallel scenarios; 1 skips them (default: 2)")
+    bench_cmd.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the fastest is kept (default: 1)")
+    bench_cmd.add_argument("--scenario", dest="scenarios", action="append", default=None, help="Run only this scenario (repeatable)")
+    bench_cmd.add_argument("--output", type=Path, default=None, help="Write the results JSON to this path")
+    bench_cmd.add_argument("--baseline", type=Path, default=None, help="Fail when slower / larger than this results JSON")
+    bench_cmd.add_argument("--tolerance", type=float, default=0.15, help="Allowed throughput drop vs the baseline (default: 0.15)")
+    bench_cmd.add_argument("--memory-tolerance", dest="memory_tolerance", type=float, default=0.25, help="Allowed peak RSS growth vs the baseline (default: 0.25)")
+    bench_cmd.add_argument("--keep", action="store_true", help="Keep the scenario outputs under --workdir")
 
     # ------------------------------------------------------------
     # プレースホルダコマンド
@@ -200,6 +420,19 @@ def main():
     set_locale(args.locale)
     logger = setup_logger(args.log_level)
 
+    from llm_logparser.core.runstats import NULL_TIMES, RunStats
+
+    run_stats = None
+    profiler = None
+    if args.command in ("parse", "export", "chain"):
+        if args.profile:
+            from llm_logparser.core.profiling import ProfilingStageTimes
+
+            profiler = ProfilingStageTimes(args.profile, memory=args.profile_memory)
+        if profiler is not None or args.stats_json:
+            run_stats = RunStats(args.command, profiler)
+    times = run_stats.times if run_stats is not None else NULL_TIMES
+
     try:
         # --------------------------------------------------------
         # parse
@@ -207,16 +440,24 @@ def main():
         if args.command == "parse":
             from llm_logparser.core.parser import parse_to_jsonl
 
-            input_path = validate_path(args.input, expect_file=True)
+            input_paths = resolve_input_paths(args.input)
             # parse_to_jsonl() 側で <outdir>/<provider>/... を作る
             args.outdir.mkdir(parents=True, exist_ok=True)
             provider_outdir = args.outdir / args.provider
 
             logger.info(f"Provider: {args.provider}")
-            logger.info(f"Input file: {input_path}")
+            if len(input_paths) == 1:
+                logger.info(f"Input file: {input_paths[0]}")
+            else:
+                logger.info(f"Input files: {len(input_paths)} ({input_paths[0]} ...)")
             logger.info(f"Output directory: {provider_outdir}")
             logger.info(f"Dry run   : {args.dry_run}")
             logger.info(f"Fail fast : {args.fail_fast}")
+            logger.info(f"Jobs      : {args.jobs}")
+            logger.info(f"Reader    : {args.reader}")
+            logger.info(f"Resume    : {args.resume}")
+            logger.info(f"Layout    : {args.layout}")
+            logger.info(f"Branch    : {args.branch}")
             schema_validator = None
             if args.validate_schema:
                 from llm_logparser.core.schema_validation import MessageSchemaValidator
@@ -228,14 +469,25 @@ def main():
 
             stats: Dict[str, Any] = parse_to_jsonl(
                 args.provider,
-                input_path,
+                input_paths,
                 args.outdir,
                 dry_run=args.dry_run,
                 fail_fast=args.fail_fast,
                 validate_schema=args.validate_schema,
                 schema_validator=schema_validator,
+                jobs=args.jobs,
+                reader=args.reader,
+                resume=args.resume,
+                layout=args.layout,
+                branch=args.branch,
+                group_messages=args.group_messages,
+                group_buffer=args.group_buffer,
+                run_stats=run_stats,
             )
 
+            if profiler is not None:
+                profiler.memory_report("parse", args.profile_top)
+
             # stats の安全なアクセス
             threads = stats.get("threads", 0)
             messages = stats.get("messages", 0)
@@ -248,13 +500,23 @@ def main():
         elif args.command == "export":
             from llm_logparser.core.exporter import export_thread_md
 
-            in_path = validate_path(args.input, expect_file=True)
+            if args.thread:
+                from llm_logparser.core.store import iter_packed_threads
 
-            if args.out:
-                out_md = args.out
+                pack_dir = validate_path(args.input, expect_dir=True)
+                matches = [t for t in iter_packed_threads(pack_dir) if t.conversation_id == args.thread]
+                if not matches:
+                    raise FileNotFoundError(f"thread {args.thread} not found in {pack_dir}")
+                in_path = matches[0]
+                out_md = args.out or pack_dir / f"{in_path.name}.md"
             else:
-                parent = in_path.parent
-                out_md = parent / f"{parent.name}.md"
+                in_path = validate_path(args.input, expect_file=True)
+
+                if args.out:
+                    out_md = args.out
+                else:
+                    parent = in_path.parent
+                    out_md = parent / f"{parent.name}.md"
 
             try:
                 tz = ZoneInfo(args.timezone)
@@ -281,8 +543,12 @@ def main():
                 "split_preview": args.split_preview,
                 "tiny_tail_threshold": args.tiny_tail_threshold,
                 "formatting": args.formatting,
+                "cache": not args.force,
             }
-            paths = export_thread_md(in_path, out_md, tz=tz, **opts)
+            with times.profiled("export"):
+                paths = export_thread_md(in_path, out_md, tz=tz, run_stats=run_stats, **opts)
+            if profiler is not None:
+                profiler.memory_report("export", args.profile_top)
 
             if args.split_preview:
                 logger.info("✅ Preview only (no files written)")
@@ -296,19 +562,27 @@ def main():
         # chain: parse → export (全thread対象)
         # --------------------------------------------------------
         elif args.command == "chain":
-            from llm_logparser.core.exporter import export_thread_md
-            from llm_logparser.core.parser import parse_to_jsonl
+            from llm_logparser.core.exporter import export_threads
+            from llm_logparser.core.parser import parse_to_jsonl, resolve_jobs
 
-            input_path = validate_path(args.input, expect_file=True)
+            input_paths = resolve_input_paths(args.input)
             args.outdir.mkdir(parents=True, exist_ok=True)
 
             logger.info(f"[chain] Provider : {args.provider}")
-            logger.info(f"[chain] Input    : {input_path}")
+            if len(input_paths) == 1:
+                logger.info(f"[chain] Input    : {input_paths[0]}")
+            else:
+                logger.info(f"[chain] Input    : {len(input_paths)} files ({input_paths[0]} ...)")
             logger.info(f"[chain] Root     : {args.outdir}")
             logger.info(f"[chain] TZ       : {args.timezone}")
             logger.info(f"[chain] Formatting: {args.formatting}")
             logger.info(f"[chain] Dry run  : {args.dry_run}")
             logger.info(f"[chain] Fail fast: {args.fail_fast}")
+            logger.info(f"[chain] Jobs     : {args.jobs}")
+            logger.info(f"[chain] Reader   : {args.reader}")
+            logger.info(f"[chain] Resume   : {args.resume}")
+            logger.info(f"[chain] Layout   : {args.layout}")
+            logger.info(f"[chain] Branch   : {args.branch}")
 
             # timezone
             try:
@@ -340,16 +614,26 @@ def main():
 
                 stats = parse_to_jsonl(
                     args.provider,
-                    input_path,
+                    input_paths,
                     parse_outdir,
                     dry_run=args.dry_run,
                     fail_fast=args.fail_fast,
                     validate_schema=args.validate_schema,
                     schema_validator=schema_validator,
+                    jobs=args.jobs,
+                    reader=args.reader,
+                    resume=args.resume,
+                    layout=args.layout,
+                    branch=args.branch,
+                    group_messages=args.group_messages,
+                    group_buffer=args.group_buffer,
+                    run_stats=run_stats,
                 )
                 threads = stats.get("threads", 0)
                 messages = stats.get("messages", 0)
                 logger.info(f"[chain] Parsed {threads} threads ({messages} messages)")
+                if profiler is not None:
+                    profiler.memory_report("parse", args.profile_top)
 
                 parsed_root = parse_outdir / args.provider
 
@@ -361,9 +645,13 @@ def main():
                 )
                 sys.exit(4)
 
-            parsed_files = sorted(parsed_root.rglob("parsed.jsonl"))
+            from llm_logparser.core.store import PackedThread, find_parsed_threads
+
+            parsed_files = find_parsed_threads(parsed_root)
             if not parsed_files:
                 logger.warning(f"[chain] No parsed.jsonl found under {parsed_root}")
+                if run_stats is not None:
+                    run_stats.status = "ok"
                 return
 
             logger.info(f"[chain] Found {len(parsed_files)} thread(s)")
@@ -376,6 +664,7 @@ def main():
                 "split_preview": args.split_preview,
                 "tiny_tail_threshold": args.tiny_tail_threshold,
                 "formatting": args.formatting,
+                "cache": not args.force,
             }
 
             # export 出力ルート（未指定なら各threadディレクトリ直下）
@@ -385,30 +674,29 @@ def main():
                 export_root.mkdir(parents=True, exist_ok=True)
                 logger.info(f"[chain] Export outdir: {export_root}")
 
-            total_md = 0
-            failed = 0
-
+            tasks = []
             for parsed in parsed_files:
-                parent = parsed.parent
-                if export_root is not None:
-                    out_md = export_root / f"{parent.name}.md"
+                if isinstance(parsed, PackedThread):
+                    # no thread directory: default to <provider>/markdown/
+                    out_md = (export_root or parsed.pack.parent / "markdown") / f"{parsed.name}.md"
+                elif export_root is not None:
+                    out_md = export_root / f"{parsed.parent.name}.md"
                 else:
-                    out_md = parent / f"{parent.name}.md"
+                    out_md = parsed.parent / f"{parsed.parent.name}.md"
+                tasks.append((parsed, out_md))
 
-                logger.info(f"[chain] Exporting: {parsed} -> {out_md}")
-
-                try:
-                    paths = export_thread_md(parsed, out_md, tz=tz, **export_opts)
-                except Exception as e:
-                    failed += 1
-                    logger.error(f"[chain] Failed exporting {parsed}: {e}")
-                    if args.fail_fast:
-                        raise
-                    else:
-                        continue
+            total_md, failed = export_threads(
+                tasks,
+                tz=tz,
+                jobs=resolve_jobs(args.jobs),
+                fail_fast=args.fail_fast,
+                run_stats=run_stats,
+                logger=logger,
+                **export_opts,
+            )
 
-                if not args.split_preview:
-                    total_md += len(paths)
+            if profiler is not None:
+                profiler.memory_report("export", args.profile_top)
 
             if args.split_preview:
                 logger.info(f"[chain] ✅ Preview only (no files written)")
@@ -420,6 +708,78 @@ def main():
                     f"(failed: {failed})"
                 )
 
+        # --------------------------------------------------------
+        # unpack: threads.pack → thread-<cid>/parsed.jsonl
+        # --------------------------------------------------------
+        elif args.command == "unpack":
+            from llm_logparser.core.store import unpack
+
+            provider_dir = validate_path(args.input, expect_dir=True)
+            n = unpack(provider_dir, remove_pack=args.remove_pack, logger=logger)
+            logger.info(f"✅ Unpacked {n} threads")
+
+        # --------------------------------------------------------
+        # providers: registry listing (adapters are not imported)
+        # --------------------------------------------------------
+        elif args.command == "providers":
+            from llm_logparser.core.providers.registry import default_registry
+
+            registry = default_registry()
+            if args.refresh:
+                from llm_logparser.core.parser import load_adapter
+
+                for provider_id in list(registry.providers()):
+                    load_adapter(provider_id, registry=registry)
+            infos = list(registry.providers().values())
+            if args.as_json:
+                print(json.dumps([info.to_dict() for info in infos], indent=2, ensure_ascii=False))
+            else:
+                for info in infos:
+                    formats = ", ".join(info.input_formats) if info.described else "?"
+                    caps = ", ".join(info.capabilities) if info.described else "? (run: providers --refresh)"
+                    print(f"{info.id}\t{info.origin}\tformats: {formats}\tcapabilities: {caps or '-'}")
+
+        # --------------------------------------------------------
+        # bench: synthetic export → parse/export/chain
+        # --------------------------------------------------------
+        elif args.command == "bench":
+            from llm_logparser.bench.runner import compare_to_baseline, mismatches, run_bench
+            from llm_logparser.bench.synth import SynthSpec
+
+            spec = SynthSpec(
+                conversations=args.conversations,
+                nodes=args.nodes,
+                branching=args.branching,
+                message_chars=args.message_chars,
+                cjk_ratio=args.cjk_ratio,
+                seed=args.seed,
+            )
+            results = run_bench(
+                args.workdir,
+                spec,
+                jobs=args.jobs,
+                repeat=args.repeat,
+                scenarios=args.scenarios,
+                keep=args.keep,
+                log=logger.info,
+            )
+            if args.output:
+                args.output.parent.mkdir(parents=True, exist_ok=True)
+                args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+                logger.info(f"Bench results: {args.output}")
+
+            problems = mismatches(results)
+            if args.baseline:
+                baseline = json.loads(validate_path(args.baseline).read_text(encoding="utf-8"))
+                problems += compare_to_baseline(
+                    results, baseline, tolerance=args.tolerance, memory_tolerance=args.memory_tolerance
+                )
+            for problem in problems:
+                logger.error(f"[bench] {problem}")
+            if problems:
+                sys.exit(5)
+            logger.info("✅ Bench passed")
+
         # --------------------------------------------------------
         # viewer / config プレースホルダ
         # --------------------------------------------------------
@@ -428,6 +788,9 @@ def main():
         elif args.command == "config":
             logger.warning("[TODO] Config command not implemented yet.")
 
+        if run_stats is not None:
+            run_stats.status = "ok"
+
     except (FileNotFoundError, IsADirectoryError) as e:
         logger.error(f"パスエラー: {e}")
         sys.exit(2)
@@ -437,6 +800,14 @@ def main():
     except Exception as e:
         logger.exception(f"予期しないエラー: {e}")
         sys.exit(99)
+    finally:
+        if run_stats is not None:
+            if run_stats.status == "running":
+                run_stats.status = "error"
+            if args.stats_json:
+                logger.info(f"Stats report: {run_stats.write_json(args.stats_json)}")
+        if profiler is not None:
+            logger.info(f"Profile summary: {profiler.write_report(args.profile_top)}")
 
 
 if __name__ == "__main__":
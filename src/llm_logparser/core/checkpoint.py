@@ -0,0 +1,148 @@
+# src/llm_logparser/core/checkpoint.py
+"""
+Parse checkpoints for `parse --resume`.
+
+The checkpoint is an append-only JSONL journal in the provider output
+directory:
+
+- "header":   provider, reader mode and the input signature (path, size, mtime)
+- "snapshot": full state carried over from a previous (resumed) run
+- "entry":    one manifest entry, written after its thread file is in place
+- "progress": read position + counters; commits every entry before it
+
+Only state up to the last "progress" line is trusted, so a run killed at any
+point (even mid-line) resumes from its last progress line. Entries written
+after it are recomputed, and their thread files rewritten, by the next run.
+Appending keeps the cost per checkpoint constant instead of re-serializing
+the whole manifest every time.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from . import codec
+
+CHECKPOINT_NAME = ".parse-checkpoint.jsonl"
+CHECKPOINT_VERSION = 1
+
+
+def input_signature(paths: Sequence[Path]) -> List[list]:
+    """(path, size, mtime_ns) per input; a checkpoint only applies to identical inputs."""
+    sig = []
+    for p in paths:
+        st = Path(p).stat()
+        sig.append([str(Path(p).resolve()), st.st_size, st.st_mtime_ns])
+    return sig
+
+
+@dataclass
+class ResumeState:
+    """What a previous run had committed when its last progress line was written."""
+    position: List[Any]
+    counters: Dict[str, Any]
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def load_checkpoint(path: Path, header: Dict[str, Any]) -> Optional[ResumeState]:
+    """Read the journal at `path`; None if missing, unreadable or for other inputs."""
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+
+    lines = raw.split(b"\n")
+    try:
+        first = codec.loads(lines[0])
+    except ValueError:
+        return None
+    if first.get("t") != "header" or first.get("version") != CHECKPOINT_VERSION:
+        return None
+    if {k: first.get(k) for k in header} != header:
+        return None
+
+    state: Optional[ResumeState] = None
+    entries: List[Dict[str, Any]] = []
+    for line in lines[1:]:
+        try:
+            rec = codec.loads(line)
+        except ValueError:
+            break  # torn write at the end of a killed run
+        kind = rec.get("t")
+        if kind == "snapshot":
+            entries = list(rec["entries"])
+            state = ResumeState(rec["pos"], rec["counters"], list(entries))
+        elif kind == "entry":
+            entries.append(rec["e"])
+        elif kind == "progress":
+            state = ResumeState(rec["pos"], rec["counters"], list(entries))
+    return state
+
+
+class CheckpointWriter:
+    """Appends entries and, every `interval` records, a progress line."""
+
+    def __init__(
+        self,
+        path: Path,
+        header: Dict[str, Any],
+        *,
+        interval: int = 1000,
+        resumed: Optional[ResumeState] = None,
+        logger: Optional[logging.Logger] = None,
+        on_save: Optional[Callable[[], None]] = None,
+    ):
+        self.path = path
+        self.on_save = on_save
+        self.interval = max(1, interval)
+        self.log = logger or logging.getLogger("llm_logparser.checkpoint")
+        self._since = 0
+        # Start a fresh journal; a resumed run folds the old one into a snapshot.
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            self._f = f
+            self._write({"t": "header", "version": CHECKPOINT_VERSION, **header})
+            if resumed is not None:
+                self._write({
+                    "t": "snapshot",
+                    "pos": resumed.position,
+                    "counters": resumed.counters,
+                    "entries": resumed.entries,
+                })
+        os.replace(tmp, path)
+        self._f = path.open("a", encoding="utf-8")
+
+    def _write(self, obj: Dict[str, Any]) -> None:
+        self._f.write(codec.dumps(obj) + "\n")
+
+    def entry(self, entry: Dict[str, Any]) -> None:
+        self._write({"t": "entry", "e": entry})
+
+    def advance(self, position: List[Any], counters: Dict[str, Any]) -> None:
+        """Called once per finished record; checkpoints every `interval` records."""
+        self._since += 1
+        if self._since >= self.interval:
+            self.save(position, counters)
+
+    def save(self, position: List[Any], counters: Dict[str, Any]) -> None:
+        if self.on_save is not None:
+            self.on_save()  # e.g. flush output the progress line refers to
+        self._write({"t": "progress", "pos": position, "counters": counters})
+        self._f.flush()
+        self._since = 0
+        self.log.debug(f"checkpoint saved at {position}")
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+    def finish(self) -> None:
+        """The run completed: the checkpoint is no longer needed."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,131 @@
+# src/llm_logparser/core/codec.py
+"""
+Internal JSON codec shared by the reader, the parsed.jsonl writer and the exporter.
+
+- Decoding uses orjson or msgspec when installed, else the stdlib. The fast
+  decoders are stricter than `json.loads` (no NaN, no integers beyond 64 bits,
+  no lone surrogates), so on any failure the stdlib decoder is retried: results
+  and errors are always those `json.loads` would give. Decoder versions that
+  silently turn wide integers into floats get a cheap pre-check instead.
+- Encoding always produces exactly `json.dumps(obj, ensure_ascii=True)`. The
+  fast encoders cannot emit ASCII-escaped output with the stdlib separators,
+  and parsed.jsonl is part of the output contract, so the stdlib C encoder is
+  kept (pre-built, without the per-call keyword handling).
+
+Set LLM_LOGPARSER_JSON=orjson|msgspec|json to force a decoder backend.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable, Optional
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+# ensure_ascii=True + default separators == json.dumps(obj, ensure_ascii=True).
+# check_circular only changes behavior for self-referencing input.
+_ENCODER = json.JSONEncoder(ensure_ascii=True, check_circular=False)
+
+
+def _fast_decoder(name: str) -> Optional[Callable[[Any], Any]]:
+    try:
+        if name == "orjson":
+            import orjson  # type: ignore
+
+            return orjson.loads
+        if name == "msgspec":
+            import msgspec  # type: ignore
+
+            return msgspec.json.Decoder().decode
+    except ImportError:
+        return None
+    return None
+
+
+# Digits -> "0", everything else -> " ": a run of 19 zeros marks a possible
+# integer beyond 64 bits. translate + substring search both run in C.
+_DIGIT_MASK = bytes(0x30 if 0x30 <= i <= 0x39 else 0x20 for i in range(256))
+_WIDE_RUN = b"0" * 19
+
+
+def _coerces_wide_ints(fast: Callable[[Any], Any]) -> bool:
+    """Some decoder versions turn >64-bit integers into floats instead of failing."""
+    probe = 2**64 + 1
+    try:
+        value = fast(str(probe).encode())
+    except Exception:
+        return False
+    return type(value) is not int or value != probe
+
+
+def _with_fallback(fast: Callable[[Any], Any]) -> Callable[[bytes | str], Any]:
+    def loads(data: bytes | str) -> Any:
+        try:
+            return fast(data)
+        except Exception:
+            return json.loads(data)
+
+    return loads
+
+
+def make_loads(name: str) -> Callable[[bytes | str], Any]:
+    """Build a `loads` for backend `name` (falls back to stdlib if unavailable)."""
+    fast = _fast_decoder(name)
+    if fast is None:
+        return json.loads
+
+    if not _coerces_wide_ints(fast):
+        return _with_fallback(fast)
+
+    def guarded_loads(data: bytes | str) -> Any:
+        try:
+            raw = data.encode("utf-8") if isinstance(data, str) else data
+            if _WIDE_RUN in raw.translate(_DIGIT_MASK):
+                return json.loads(data)
+            return fast(raw)
+        except Exception:
+            return json.loads(data)
+
+    return guarded_loads
+
+
+def make_loads_for(name: str) -> Callable[..., Callable[[bytes | str], Any]]:
+    """
+    Build `loads_for(*chunks)` for backend `name`: it returns a `loads` for
+    documents cut out of `chunks` (each document inside a single chunk). The
+    wide-integer pre-check runs once over the chunks instead of once per
+    document, which is most of the per-call overhead on short JSONL lines.
+    """
+    full = make_loads(name)
+    fast = _fast_decoder(name)
+    if fast is None or not _coerces_wide_ints(fast):
+        return lambda *chunks: full
+    unchecked = _with_fallback(fast)
+
+    def loads_for(*chunks: bytes) -> Callable[[bytes | str], Any]:
+        for chunk in chunks:
+            if _WIDE_RUN in chunk.translate(_DIGIT_MASK):
+                return full
+        return unchecked
+
+    return loads_for
+
+
+def _select_backend() -> str:
+    forced = (os.getenv("LLM_LOGPARSER_JSON") or "").strip().lower()
+    if forced in BACKENDS:
+        return forced if forced == "json" or _fast_decoder(forced) else "json"
+    for name in BACKENDS[:-1]:
+        if _fast_decoder(name) is not None:
+            return name
+    return "json"
+
+
+BACKEND: str = _select_backend()
+loads: Callable[[bytes | str], Any] = make_loads(BACKEND)
+loads_for: Callable[..., Callable[[bytes | str], Any]] = make_loads_for(BACKEND)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize one JSONL record; identical to json.dumps(obj, ensure_ascii=True)."""
+    return _ENCODER.encode(obj)
@@ -1,15 +1,29 @@
 # src/llm_logparser/exporter.py
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
 import logging
+import os
+import tempfile
+from array import array
 from pathlib import Path
 from datetime import datetime, timezone
-from dataclasses import dataclass
-from typing import Iterable, List, Dict, Any, Optional, Literal
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Literal, Optional
 
+from . import codec
+from .runstats import NULL_TIMES, RunStats
 from .utils import parse_size_expr, format_bytes, sanitize_filename
 
+# spool → part file copy size (split export)
+COPY_CHUNK = 1024 * 1024
+
+# Bump when the rendered Markdown changes for the same input and options:
+# every export cache entry then becomes stale.
+EXPORT_CACHE_VERSION = 1
+
 def _ts_to_seconds(ts: float | int | None) -> float | None:
     if ts is None:
         return None
@@ -119,121 +133,443 @@ def _resolve_split(opts: Dict[str, Any]) -> Dict[str, Any]:
         raise ValueError(f"invalid --split: {spec}")
     return conf
 
+@dataclass
+class _ThreadScan:
+    """
+    First pass over parsed.jsonl: everything the front-matter needs, plus the
+    byte range of each message line so the second pass can fetch messages one
+    at a time (in ts order) instead of holding them all.
+    """
+    thread_meta: Dict[str, Any] | None = None
+    models: set = field(default_factory=set)
+    ts_min: float | int | None = None
+    ts_max: float | int | None = None
+    input_bytes: int = 0
+    offsets: array = field(default_factory=lambda: array("q"))
+    lengths: array = field(default_factory=lambda: array("q"))
+    order: List[int] | None = None  # None: file order is already ts order
+    digest: str | None = None  # sha256 of the whole input (export cache only)
+
+    @property
+    def count(self) -> int:
+        return len(self.offsets)
+
+
+def _scan_thread(f: BinaryIO, *, digest: bool = False) -> _ThreadScan:
+    scan = _ThreadScan()
+    keys: List[Any] = []
+    hasher = hashlib.sha256() if digest else None
+    pos = 0
+    for line in f:
+        offset, pos = pos, pos + len(line)
+        if hasher is not None:
+            hasher.update(line)
+        row_bytes = line.strip()
+        if not row_bytes:
+            continue
+        try:
+            row = codec.loads(row_bytes)
+        except ValueError:
+            # 壊れ行はスキップ（将来: logger.warning へ）
+            continue
+
+        rt = row.get("record_type")
+        if rt == "thread":
+            if scan.thread_meta is None:
+                scan.thread_meta = row
+        elif rt == "message":
+            scan.offsets.append(offset)
+            scan.lengths.append(len(line))
+            m = row.get("meta", {}).get("model")
+            if m:
+                scan.models.add(m)
+            ts = row.get("ts")
+            keys.append(ts)
+            if isinstance(ts, (int, float)):
+                scan.ts_min = ts if scan.ts_min is None else min(scan.ts_min, ts)
+                scan.ts_max = ts if scan.ts_max is None else max(scan.ts_max, ts)
+    scan.input_bytes = pos
+    if hasher is not None:
+        scan.digest = "sha256:" + hasher.hexdigest()
+
+    # 念のためts昇順ソート（Noneは末尾, 安定ソート）
+    order = sorted(range(len(keys)), key=lambda i: (keys[i] is None, keys[i]))
+    if any(i != j for i, j in enumerate(order)):
+        scan.order = order
+    return scan
+
+
+def _iter_messages(f: BinaryIO, scan: _ThreadScan) -> Iterator[Dict[str, Any]]:
+    """Message rows in ts order, decoded one at a time."""
+    for i in range(scan.count) if scan.order is None else scan.order:
+        f.seek(scan.offsets[i])
+        yield codec.loads(f.read(scan.lengths[i]))
+
+
+def _render_block(m: Dict[str, Any], tz, policy: ExportPolicy) -> str:
+    role = m.get("role", "unknown")
+    ts_human = _to_local_human(m.get("ts"), tz=tz)
+
+    # normally adapters MUST populate `text`
+    # (contract: exporter should not reconstruct text)
+    # this fallback exists only as a safety net for broken adapters / legacy data
+    raw_text = (m.get("text") or "")
+    if not raw_text:
+        parts = (m.get("content") or {}).get("parts")
+        if isinstance(parts, list):
+            raw_text = "\n".join(str(p) for p in parts)
+    text = _render_message_text(raw_text, policy)
+
+    message_id = m.get("message_id") or ""
+    parent_id = m.get("parent_id")
+    parent_text = parent_id if isinstance(parent_id, str) else ""
+    meta_lines = []
+    if message_id:
+        meta_lines.append(f"- message_id: {message_id}")
+    if parent_text:
+        meta_lines.append(f"- parent_id: {parent_text}")
+    meta = ("\n".join(meta_lines) + "\n\n") if meta_lines else ""
+    return f"## [{role}] {ts_human}\n{meta}{text}\n\n"
+
+
+def _part_front_matter(
+    *, conv_id, provider, models: str, ts_range: str, count, index, total, generated_at: str, tz_name: str
+) -> str:
+    # 分割 part の front-matter（従来どおり行を改行なしで連結する）
+    return "".join([
+        "---",
+        f"thread: {conv_id}",
+        f"provider: {provider}",
+        f"models: {models}",
+        f"message_count: {count}",
+        f"range: {ts_range}",
+        f"part_index: {index}",
+        f"part_total: {total}",
+        f"generated_at_utc: {generated_at}",
+        f"tz: {tz_name}",
+        "---",
+        "",
+    ])
+
+
+class SplitPlanner:
+    """
+    Part boundaries for --split, fed one block size at a time.
+
+    Only running totals are kept, so planning is O(1) per block. With
+    --split-hard the front-matter size is fm_fixed_bytes (rendered once with
+    empty message_count / part_index) plus the digits of those two fields,
+    which is exactly the size the per-block rendering used to measure.
+    finish() returns (message count, body bytes) per part.
+    """
+
+    FM_OVERHEAD_APPROX = 1024  # 近似（--split-hard 以外）
+
+    def __init__(
+        self,
+        *,
+        total: int,
+        size_limit: int | None,
+        count_limit: int | None,
+        soft_overflow: float = 0.20,
+        hard: bool = False,
+        tiny_tail_threshold: int = 20,
+        fm_fixed_bytes: int = 0,
+    ):
+        self.total = total
+        self.size_limit = size_limit
+        self.count_limit = int(count_limit) if count_limit else None
+        self.soft_limit = int(size_limit * (1 + soft_overflow)) if size_limit else None
+        self.hard = hard
+        self.tiny_tail_threshold = tiny_tail_threshold
+        self.fm_fixed_bytes = fm_fixed_bytes
+        self.parts: List[tuple[int, int]] = []
+        self._count = 0  # messages in the current part
+        self._bytes = 0  # body bytes in the current part
+        self._seen = 0
+
+    def _over_size(self, bsz: int) -> bool:
+        if not self.size_limit:
+            return False
+        if self.hard:
+            fm = self.fm_fixed_bytes + len(str(self._count + 1)) + len(str(len(self.parts) + 1))
+            return fm + self._bytes + bsz > self.size_limit
+        return self._bytes + bsz + self.FM_OVERHEAD_APPROX > self.size_limit
+
+    def add(self, bsz: int) -> None:
+        self._seen += 1
+        # size優先 → count補助
+        over_size = self._over_size(bsz)
+        over_count = (not over_size) and bool(self.count_limit) and self._count >= self.count_limit
+        if over_size or over_count:
+            within_soft = bool(self.size_limit) and (not over_count) and \
+                          (self._bytes + bsz + self.FM_OVERHEAD_APPROX) <= self.soft_limit
+            small_tail = self.total - self._seen <= self.tiny_tail_threshold
+            if self.hard or not (within_soft or small_tail):
+                self._flush()
+        self._count += 1
+        self._bytes += bsz
+
+    def _flush(self) -> None:
+        if self._count:
+            self.parts.append((self._count, self._bytes))
+            self._count, self._bytes = 0, 0
+
+    def finish(self) -> List[tuple[int, int]]:
+        self._flush()
+        if not self.parts:  # 念のため: メッセージなしでも 1 part
+            self.parts.append((0, 0))
+        return self.parts
+
+
+class _DigestWriter:
+    """Writes through to `f`; with a digests dict, records sha256 of the bytes under `name`."""
+
+    def __init__(self, f: BinaryIO, digests: Optional[Dict[str, str]], name: str):
+        self._f = f
+        self._hasher = hashlib.sha256() if digests is not None else None
+        self._digests = digests
+        self._name = name
+
+    def write(self, data: bytes) -> None:
+        if self._hasher is not None:
+            self._hasher.update(data)
+        self._f.write(data)
+
+    def close(self) -> None:
+        if self._hasher is not None:
+            self._digests[self._name] = "sha256:" + self._hasher.hexdigest()
+
+
+def _copy_bytes(src: Any, dst: Any, n: int) -> None:
+    while n > 0:
+        chunk = src.read(min(n, COPY_CHUNK))
+        if not chunk:
+            raise RuntimeError("export spool ended early")
+        dst.write(chunk)
+        n -= len(chunk)
+
+
 def export_thread_md(
     parsed_path: Path,
     out_path: Path,           # 単一出力時のファイルパス（分割時はディレクトリ基準）
     tz=timezone.utc,
     *,
     formatting: str = "light",
+    run_stats: Optional[RunStats] = None,
+    cache: bool = False,
     **opts: Any
 ) -> List[Path]:
     """
     parsed.jsonl → Markdown（分割対応）
+    - parsed_path は packed レイアウトの store.PackedThread でもよい
     - 分割なし: 従来どおり out_path に1ファイル
     - 分割あり: out_path.parent に thread-<cid>__partXX.md を複数出力
+    - run_stats を渡すと read/render/split/write の時間と件数を記録する
+    - ストリーミング: 1 パス目で front-matter 用の統計と各メッセージの
+      位置だけを集め、2 パス目で 1 メッセージずつ描画して書き出す
+      （分割時は本文を一時 spool に書き、境界確定後に各 part へコピー）。
+      メモリはスレッド全体ではなく 1 メッセージ分 + 位置索引に比例する。
+    - cache=True: out_path の隣の sidecar (.<name>.export.json) に入力 digest・
+      オプション hash・出力 part の digest を記録し、どちらも変わっていなければ
+      再描画せず既存の出力を返す。part 数が減った場合は古い part を削除する
     戻り値: 生成したファイルの List[Path]
     """
     logger = logging.getLogger("exporter")
     policy = ExportPolicy(formatting="none" if formatting is None else formatting)
+    lap = (run_stats.times if run_stats is not None else NULL_TIMES).laps()
+
+    use_cache = cache and not opts.get("split_preview")
+    sidecar = export_cache_path(out_path)
+    cached: Dict[str, Any] = {}
+    options_key = ""
+    stat_key = None
+    if use_cache:
+        cached = _read_export_cache(sidecar)
+        options_key = _export_options_key(tz, policy, opts)
+        stat_key = _input_stat_key(parsed_path)
+        if stat_key is not None and cached.get("options") == options_key and cached.get("input_stat") == stat_key:
+            hit = _cached_outputs(cached, out_path.parent)
+            if hit is not None:
+                lap("read")
+                return _cache_hit(hit, logger, run_stats)
+
+    with parsed_path.open("rb") as f:
+        scan = _scan_thread(f, digest=use_cache)
+        lap("read")
+        if not scan.thread_meta:
+            raise RuntimeError("parsed.jsonl missing thread record_type on first row.")
+        if use_cache and cached.get("options") == options_key and cached.get("input") == scan.digest:
+            # touched but unchanged input: refresh the stat key, keep the Markdown
+            hit = _cached_outputs(cached, out_path.parent)
+            if hit is not None:
+                _write_export_cache(sidecar, {**cached, "input_stat": stat_key})
+                return _cache_hit(hit, logger, run_stats)
+        if use_cache:
+            # the old record no longer describes what is on disk
+            sidecar.unlink(missing_ok=True)
+        digests: Optional[Dict[str, str]] = {} if use_cache else None
+        paths = _write_thread_md(f, scan, out_path, tz, policy, logger, lap, run_stats, opts, digests)
+
+    if use_cache:
+        parts = [{"name": p.name, "bytes": p.stat().st_size, "digest": digests[p.name]} for p in paths]
+        new_names = {p.name for p in paths}
+        for old in cached.get("parts", []):
+            name = old.get("name")
+            if isinstance(name, str) and name not in new_names and Path(name).name == name:
+                (out_path.parent / name).unlink(missing_ok=True)
+        _write_export_cache(sidecar, {
+            "version": EXPORT_CACHE_VERSION,
+            "input": scan.digest,
+            "input_stat": stat_key,
+            "options": options_key,
+            "parts": parts,
+        })
+    return paths
 
-    messages: List[Dict[str, Any]] = []
-    thread_meta: Dict[str, Any] | None = None
-    models = set()
-    ts_min: float | int | None = None
-    ts_max: float | int | None = None
 
-    with parsed_path.open("r", encoding="utf-8") as f:
-        for line_no, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                row = json.loads(line)
-            except json.JSONDecodeError:
-                # 壊れ行はスキップ（将来: logger.warning へ）
-                continue
+# ============================================================
+# Export cache (export_thread_md(cache=True))
+# ============================================================
 
-            rt = row.get("record_type")
-            if rt == "thread":
-                if thread_meta is None:
-                    thread_meta = row
-                continue
-            elif rt == "message":
-                messages.append(row)
-                m = row.get("meta", {}).get("model")
-                if m:
-                    models.add(m)
-                ts = row.get("ts")
-                if isinstance(ts, (int, float)):
-                    ts_min = ts if ts_min is None else min(ts_min, ts)
-                    ts_max = ts if ts_max is None else max(ts_max, ts)
-
-    if not thread_meta:
-        raise RuntimeError("parsed.jsonl missing thread record_type on first row.")
-
-    # 念のためts昇順ソート（Noneは末尾）
-    messages.sort(key=lambda r: (r.get("ts") is None, r.get("ts")))
+EXPORT_CACHE_SUFFIX = ".export.json"
+
+
+def export_cache_path(out_path: Path) -> Path:
+    """Sidecar record for one export target (hidden, next to the Markdown)."""
+    return out_path.parent / f".{out_path.name}{EXPORT_CACHE_SUFFIX}"
+
+
+def is_export_cache(path: Path) -> bool:
+    """True for a sidecar written by export_cache_path()."""
+    return path.name.startswith(".") and path.name.endswith(EXPORT_CACHE_SUFFIX)
+
+
+def _export_options_key(tz, policy: ExportPolicy, opts: Dict[str, Any]) -> str:
+    conf = _resolve_split(opts)
+    key = {
+        "version": EXPORT_CACHE_VERSION,
+        "tz": tz.key if hasattr(tz, "key") else str(tz),
+        "formatting": policy.formatting,
+        "split": [conf["mode"], conf["size_limit"], conf["count_limit"], conf["soft_overflow"],
+                  conf["hard"], conf["tiny_tail_threshold"]],
+    }
+    return "sha256:" + hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _input_stat_key(parsed_path: Any) -> Optional[list]:
+    """(size, mtime_ns) of a parsed.jsonl file; packed threads are always hashed."""
+    if not isinstance(parsed_path, Path):
+        return None
+    try:
+        st = parsed_path.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_export_cache(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != EXPORT_CACHE_VERSION:
+        return {}
+    return data
+
+
+def _write_export_cache(path: Path, record: Dict[str, Any]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(record, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
 
+
+def _cached_outputs(cached: Dict[str, Any], outdir: Path) -> Optional[List[Path]]:
+    """The recorded parts, if every one is still there with its recorded size."""
+    parts = cached.get("parts")
+    if not isinstance(parts, list) or not parts:
+        return None
+    paths = []
+    for part in parts:
+        path = outdir / str(part.get("name"))
+        try:
+            if path.stat().st_size != part.get("bytes"):
+                return None
+        except OSError:
+            return None
+        paths.append(path)
+    return paths
+
+
+def _cache_hit(paths: List[Path], logger: logging.Logger, run_stats: Optional[RunStats]) -> List[Path]:
+    for p in paths:
+        logger.info(f"  - {p.name} (unchanged, cached)")
+    if run_stats is not None:
+        run_stats.count("export_cached_threads")
+    return paths
+
+
+def _write_thread_md(
+    f: BinaryIO,
+    scan: _ThreadScan,
+    out_path: Path,
+    tz,
+    policy: ExportPolicy,
+    logger: logging.Logger,
+    lap: Callable[[str], None],
+    run_stats: Optional[RunStats],
+    opts: Dict[str, Any],
+    digests: Optional[Dict[str, str]] = None,
+) -> List[Path]:
+    thread_meta = scan.thread_meta or {}
     conv_id = thread_meta.get("conversation_id", "unknown")
     provider = thread_meta.get("provider_id", "unknown")
-
-    # 本文ブロックを先に作る（二重レンダ回避）
-    body_blocks: List[str] = []
-    for m in messages:
-        role = m.get("role", "unknown")
-        ts_human = _to_local_human(m.get("ts"), tz=tz)
-
-        # normally adapters MUST populate `text`
-        # (contract: exporter should not reconstruct text)
-        # this fallback exists only as a safety net for broken adapters / legacy data
-        raw_text = (m.get("text") or "")
-        if not raw_text:
-            parts = (m.get("content") or {}).get("parts")
-            if isinstance(parts, list):
-                raw_text = "\n".join(str(p) for p in parts)
-        text = _render_message_text(raw_text, policy)
-
-        message_id = m.get("message_id") or ""
-        parent_id = m.get("parent_id")
-        parent_text = parent_id if isinstance(parent_id, str) else ""
-        meta_lines = []
-        if message_id:
-            meta_lines.append(f"- message_id: {message_id}")
-        if parent_text:
-            meta_lines.append(f"- parent_id: {parent_text}")
-        meta = ("\n".join(meta_lines) + "\n\n") if meta_lines else ""
-        block = f"## [{role}] {ts_human}\n{meta}{text}\n\n"
-        body_blocks.append(block)
+    n_messages = scan.count
+    models, ts_min, ts_max = scan.models, scan.ts_min, scan.ts_max
 
     # 分割設定
     split_conf = _resolve_split(opts)
 
     # プレビュー（総バイト概算）
-    total_preview = len("".join(body_blocks).encode("utf-8"))
     if split_conf["preview"]:
-        logger.info(f"[preview] ~{format_bytes(total_preview)} / {len(messages)} messages")
+        total_preview = 0
+        for m in _iter_messages(f, scan):
+            total_preview += len(_render_block(m, tz, policy).encode("utf-8"))
+        lap("render")
+        logger.info(f"[preview] ~{format_bytes(total_preview)} / {n_messages} messages")
         if split_conf["mode"] in ("auto", "size"):
             size_limit = split_conf["size_limit"] or parse_size_expr("4M")
             est = max(1, total_preview // max(1, size_limit))
             logger.info(f"[preview] estimated parts: {est}")
         return []
 
-    # 分割なし（既存互換）
+    # 分割なし（既存互換）: front-matter の後に 1 ブロックずつ書き出す
     if not split_conf["mode"]:
         fm_lines = [
             "---",
             f"thread: {conv_id}",
             f"provider: {provider}",
-            f"messages: {len(messages)}",
+            f"messages: {n_messages}",
             f"models: {_as_yaml_list(sorted(models))}",
             f"range: {_to_iso_utc(ts_min)} 〜 {_to_iso_utc(ts_max)}",
             "---",
             "",
         ]
-        md = "\n".join(fm_lines) + "".join(body_blocks)
         out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(md, encoding="utf-8")
-        logger.info(f"  - {out_path.name} (messages={len(messages)}, ~{format_bytes(len(md.encode('utf-8')))})")
+        with out_path.open("wb") as raw_out:
+            out = _DigestWriter(raw_out, digests, out_path.name)
+            data = "\n".join(fm_lines).encode("utf-8")
+            out.write(data)
+            md_bytes = len(data)
+            for m in _iter_messages(f, scan):
+                data = _render_block(m, tz, policy).encode("utf-8")
+                lap("render")
+                out.write(data)
+                md_bytes += len(data)
+                lap("write")
+            out.close()
+        logger.info(f"  - {out_path.name} (messages={n_messages}, ~{format_bytes(md_bytes)})")
+        _count_export(run_stats, conv_id, n_messages, scan.input_bytes, [md_bytes])
         return [out_path]
 
     # 分割あり
@@ -245,98 +581,251 @@ def export_thread_md(
         size_limit = size_limit or parse_size_expr("4M")
         count_limit = count_limit or 1500
 
-    fm_overhead_approx = 1024  # 近似。--split-hard時は仮レンダで厳密計測
-    parts: List[List[str]] = []
-    buf_blocks: List[str] = []
-    buf_bytes_body = 0
-    idx = 0
-
-    def flush():
-        nonlocal buf_blocks, buf_bytes_body, idx, parts
-        if not buf_blocks:
-            return
-        parts.append(buf_blocks)
-        idx += 1
-        buf_blocks, buf_bytes_body = [], 0
-
-    def would_be_tiny_after(next_i: int) -> bool:
-        remain = len(body_blocks) - next_i
-        return remain <= split_conf["tiny_tail_threshold"]
-
-    def hard_will_overflow(next_block: str) -> bool:
-        if not size_limit:
-            return False
-        if split_conf["hard"]:
-            # front-matter込みで仮レンダして厳密長を判定
-            fm = [
-                "---",
-                f"thread: {conv_id}",
-                f"provider: {provider}",
-                f"models: {_as_yaml_list(sorted(models))}",
-                f"message_count: {len(buf_blocks) + 1}",
-                f"range: {_to_iso_utc(ts_min)} 〜 {_to_iso_utc(ts_max)}",
-                f"part_index: {idx + 1}",
-                f"part_total: 0",
-                f"generated_at_utc: {datetime.now(timezone.utc).isoformat()}",
-                f"tz: {tz.key if hasattr(tz, 'key') else str(tz)}",
-                "---",
-                "",
-            ]
-            tmp = "".join(fm) + "".join(buf_blocks + [next_block])
-            return len(tmp.encode("utf-8")) > size_limit
-        else:
-            return (buf_bytes_body + len(next_block.encode("utf-8")) + fm_overhead_approx) > size_limit
+    part_fm = functools.partial(
+        _part_front_matter,
+        conv_id=conv_id,
+        provider=provider,
+        models=_as_yaml_list(sorted(models)),
+        ts_range=f"{_to_iso_utc(ts_min)} 〜 {_to_iso_utc(ts_max)}",
+        generated_at=datetime.now(timezone.utc).isoformat(),
+        tz_name=tz.key if hasattr(tz, "key") else str(tz),
+    )
+    planner = SplitPlanner(
+        total=n_messages,
+        size_limit=size_limit,
+        count_limit=count_limit,
+        soft_overflow=split_conf["soft_overflow"],
+        hard=split_conf["hard"],
+        tiny_tail_threshold=split_conf["tiny_tail_threshold"],
+        # part_total は未確定なので 0 で計測する（従来どおり）
+        fm_fixed_bytes=len(part_fm(count="", index="", total=0).encode("utf-8")),
+    )
 
-    for i, block in enumerate(body_blocks):
-        bsz = len(block.encode("utf-8"))
-        # size優先 → count補助
-        over_size = bool(size_limit) and hard_will_overflow(block)
-        over_count = (not over_size) and bool(count_limit) and (len(buf_blocks) >= int(count_limit))
+    outdir = out_path.parent
+    outdir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryFile(prefix=".export-spool-", dir=outdir) as spool:
+        for m in _iter_messages(f, scan):
+            data = _render_block(m, tz, policy).encode("utf-8")
+            lap("render")
+            spool.write(data)
+            lap("write")
+            planner.add(len(data))
+            lap("split")
+
+        parts = planner.finish()
+        part_total = len(parts)
+        spool.seek(0)
+        base = f"thread-{conv_id}"
+        paths: List[Path] = []
+        sizes: List[int] = []
+
+        for pidx, (count, body_bytes) in enumerate(parts, start=1):
+            head = part_fm(count=count, index=pidx, total=part_total).encode("utf-8")
+            suffix = "" if part_total == 1 else f"__part{pidx:02d}"
+            out_name = sanitize_filename(f"{base}{suffix}.md")
+            out_file = outdir / out_name
+            with out_file.open("wb") as raw_out:
+                out = _DigestWriter(raw_out, digests, out_name)
+                out.write(head)
+                _copy_bytes(spool, out, body_bytes)
+                out.close()
+            sizes.append(len(head) + body_bytes)
+            logger.info(f"  - {out_name} (messages={count}, ~{format_bytes(sizes[-1])})")
+            paths.append(out_file)
+        lap("write")
+
+    _count_export(run_stats, conv_id, n_messages, scan.input_bytes, sizes)
+    return paths
 
-        if over_size or over_count:
-            within_soft = bool(size_limit) and (not over_count) and \
-                          ((buf_bytes_body + bsz + fm_overhead_approx) <= int(size_limit * (1 + split_conf["soft_overflow"])))
-            small_tail = would_be_tiny_after(i + 1)
-            if not split_conf["hard"] and (within_soft or small_tail):
-                buf_blocks.append(block); buf_bytes_body += bsz
-                continue
-            flush()
 
-        buf_blocks.append(block); buf_bytes_body += bsz
+def _count_export(
+    run_stats: Optional[RunStats], conv_id: str, messages: int, input_bytes: int, sizes: List[int]
+) -> None:
+    if run_stats is None:
+        return
+    run_stats.count("export_threads")
+    run_stats.count("export_input_bytes", input_bytes)
+    run_stats.count("markdown_files", len(sizes))
+    run_stats.count("markdown_bytes", sum(sizes))
+    run_stats.thread("markdown", conv_id, messages, sum(sizes))
 
-    flush()
 
-    part_total = len(parts)
-    if part_total == 0:  # 念のため
-        parts = [body_blocks]
-        part_total = 1
+# ============================================================
+# Many threads (chain): serial or across a process pool
+# ============================================================
 
-    outdir = out_path.parent
-    outdir.mkdir(parents=True, exist_ok=True)
-    base = f"thread-{conv_id}"
-    paths: List[Path] = []
+# Threads at least this large get a pool task of their own; smaller ones are
+# batched up to this many bytes / threads per task.
+EXPORT_BATCH_BYTES = 4 * 1024 * 1024
+EXPORT_BATCH_THREADS = 256
 
-    for pidx, blocks in enumerate(parts, start=1):
-        fm = [
-            "---",
-            f"thread: {conv_id}",
-            f"provider: {provider}",
-            f"models: {_as_yaml_list(sorted(models))}",
-            f"message_count: {len(blocks)}",
-            f"range: {_to_iso_utc(ts_min)} 〜 {_to_iso_utc(ts_max)}",
-            f"part_index: {pidx}",
-            f"part_total: {part_total}",
-            f"generated_at_utc: {datetime.now(timezone.utc).isoformat()}",
-            f"tz: {tz.key if hasattr(tz, 'key') else str(tz)}",
-            "---",
-            "",
-        ]
-        page = "".join(fm) + "".join(blocks)
-        suffix = "" if part_total == 1 else f"__part{pidx:02d}"
-        out_name = sanitize_filename(f"{base}{suffix}.md")
-        out_file = outdir / out_name
-        out_file.write_text(page, encoding="utf-8")
-        logger.info(f"  - {out_name} (messages={len(blocks)}, ~{format_bytes(len(page.encode('utf-8')))})")
-        paths.append(out_file)
 
-    return paths
+def thread_weight(parsed: Any) -> int:
+    """Scheduling weight of one thread: its parsed.jsonl size in bytes."""
+    length = getattr(parsed, "length", None)  # store.PackedThread (from threads.idx)
+    if length is not None:
+        return int(length)
+    try:
+        return parsed.stat().st_size
+    except OSError:
+        return 0
+
+
+def schedule_exports(
+    weights: List[int],
+    *,
+    batch_bytes: int = EXPORT_BATCH_BYTES,
+    batch_threads: int = EXPORT_BATCH_THREADS,
+) -> List[List[int]]:
+    """
+    Pool tasks as lists of thread indexes, largest first: a big thread
+    starts early instead of becoming the tail, and small threads share a task
+    so each one does not pay for a pickle round trip.
+    """
+    batches: List[List[int]] = []
+    cur: List[int] = []
+    cur_bytes = 0
+    for i in sorted(range(len(weights)), key=lambda i: -weights[i]):
+        w = weights[i]
+        if w >= batch_bytes:
+            batches.append([i])
+            continue
+        if cur and (cur_bytes + w > batch_bytes or len(cur) >= batch_threads):
+            batches.append(cur)
+            cur, cur_bytes = [], 0
+        cur.append(i)
+        cur_bytes += w
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def export_threads(
+    tasks: List[tuple[Any, Path]],
+    *,
+    tz=timezone.utc,
+    jobs: int = 1,
+    fail_fast: bool = False,
+    run_stats: Optional[RunStats] = None,
+    logger: Optional[logging.Logger] = None,
+    batch_bytes: int = EXPORT_BATCH_BYTES,
+    batch_threads: int = EXPORT_BATCH_THREADS,
+    **opts: Any,
+) -> tuple[int, int]:
+    """
+    (parsed, out_md) ごとに export_thread_md を実行する（chain 用）。
+    - jobs > 1: プロセスプールで並列実行（大きいスレッドから順に、小さい
+      スレッドはまとめて 1 タスク）。run_stats / --profile の集計は親に合流する
+    - 失敗は数えてログに出し、fail_fast なら最初の失敗で中断する
+    戻り値: (生成した Markdown ファイル数, 失敗スレッド数)
+    """
+    log = logger or logging.getLogger("exporter")
+    times = run_stats.times if run_stats is not None else NULL_TIMES
+    total_md = 0
+    failed = 0
+
+    def record(parsed: Any, paths: Optional[List[Path]], error: Optional[str]) -> None:
+        nonlocal total_md, failed
+        if error is not None:
+            failed += 1
+            if run_stats is not None:
+                run_stats.count("export_errors")
+            log.error(f"[chain] Failed exporting {parsed}: {error}")
+        elif paths:
+            total_md += len(paths)
+
+    if jobs <= 1 or len(tasks) <= 1:
+        for parsed, out_md in tasks:
+            log.info(f"[chain] Exporting: {parsed} -> {out_md}")
+            try:
+                with times.profiled("export"):
+                    paths = export_thread_md(parsed, out_md, tz=tz, run_stats=run_stats, **opts)
+            except Exception as e:
+                record(parsed, None, str(e))
+                if fail_fast:
+                    raise
+                continue
+            record(parsed, paths, None)
+        return total_md, failed
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from concurrent.futures.process import BrokenProcessPool
+
+    batches = schedule_exports(
+        [thread_weight(parsed) for parsed, _ in tasks], batch_bytes=batch_bytes, batch_threads=batch_threads
+    )
+    options = {
+        "timings": run_stats is not None and times.enabled,
+        "profile_dir": getattr(times, "profile_dir", None),
+        "fail_fast": fail_fast,
+    }
+    log.info(f"[chain] Exporting {len(tasks)} thread(s) in {len(batches)} task(s) with {jobs} worker(s)")
+    pool = ProcessPoolExecutor(
+        max_workers=min(jobs, len(batches)),
+        initializer=_init_export_worker,
+        initargs=(tz, opts, options),
+    )
+    try:
+        pending = {pool.submit(_export_in_worker, [(i, *tasks[i]) for i in batch]) for batch in batches}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    res = fut.result()
+                except BrokenProcessPool as e:
+                    raise RuntimeError(f"export worker pool crashed: {e}")
+                if run_stats is not None:
+                    run_stats.merge(res["counts"], res["largest"])
+                    times.merge(res["timings"])
+                for i, paths, error in res["outcomes"]:
+                    parsed, out_md = tasks[i]
+                    if error is None:
+                        log.info(f"[chain] Exported: {parsed} -> {out_md} ({len(paths)} file(s))")
+                    record(parsed, paths, error)
+                    if error is not None and fail_fast:
+                        raise RuntimeError(f"export failed for {parsed}: {error}")
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return total_md, failed
+
+
+# Per-process state for export_threads(jobs > 1) (populated by the pool initializer).
+_EXPORT_WORKER: Dict[str, Any] = {}
+
+
+def _init_export_worker(tz, opts: Dict[str, Any], options: Dict[str, Any]) -> None:
+    from .runstats import StageTimes
+
+    times = StageTimes() if options.get("timings") else NULL_TIMES
+    if options.get("profile_dir") is not None:
+        import multiprocessing.util
+
+        from .profiling import ProfilingStageTimes, dump_worker_profiles
+
+        times = ProfilingStageTimes(options["profile_dir"], worker=True)
+        # runs when the pool shuts the worker down
+        multiprocessing.util.Finalize(None, dump_worker_profiles, args=(times,), exitpriority=10)
+    _EXPORT_WORKER.update(tz=tz, opts=opts, times=times, fail_fast=options.get("fail_fast", False))
+
+
+def _export_in_worker(items: List[tuple[int, Any, Path]]) -> Dict[str, Any]:
+    assert _EXPORT_WORKER, "worker not initialized"
+    times = _EXPORT_WORKER["times"]
+    stats = RunStats("export", times) if times.enabled else None
+    outcomes = []
+    for i, parsed, out_md in items:
+        try:
+            with times.profiled("export"):
+                paths = export_thread_md(parsed, out_md, tz=_EXPORT_WORKER["tz"], run_stats=stats, **_EXPORT_WORKER["opts"])
+        except Exception as e:
+            outcomes.append((i, None, str(e)))
+            if _EXPORT_WORKER["fail_fast"]:
+                break
+            continue
+        outcomes.append((i, paths, None))
+    return {
+        "outcomes": outcomes,
+        "counts": stats.counts if stats is not None else {},
+        "largest": stats.largest if stats is not None else {},
+        "timings": times.drain() if times.enabled else {},
+    }
@@ -0,0 +1,120 @@
+# src/llm_logparser/core/grouping.py
+"""
+External-sort grouping of message-level records (`parse --group-messages`).
+
+Flat message logs (one message per JSONL line, conversations interleaved)
+have to be regrouped into complete threads before the adapter runs. The
+grouper keeps at most `buffer_size` records in memory; when the buffer is
+full it is sorted by (thread id, arrival order) and spilled to a run file.
+At the end the runs and the last buffer are k-way merged (heapq.merge) and
+yielded one thread at a time, so memory stays bounded by the buffer plus
+the largest single conversation, whatever the input size.
+
+Runs are JSONL files ([thread id, seq, source index, record] per line) in a
+temporary directory, by default next to the output rather than in /tmp
+(which is often RAM-backed). At most MERGE_FANIN runs are open at once;
+beyond that, runs are first merged into larger runs.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from . import codec
+
+GROUP_BUFFER_RECORDS = 100_000
+MERGE_FANIN = 64
+
+
+@dataclass
+class MessageGroup:
+    """All message records of one thread, in input order."""
+    cid: str
+    records: List[Dict[str, Any]]
+    source: str
+
+
+class MessageGrouper:
+    """add() records with their thread id, then iterate groups() once."""
+
+    def __init__(self, *, buffer_size: int = GROUP_BUFFER_RECORDS, tmpdir: Optional[Path] = None):
+        self.buffer_size = max(1, buffer_size)
+        self._tmpdir_parent = tmpdir
+        self._tmpdir: Optional[Path] = None
+        self._buffer: List[tuple] = []
+        self._runs: List[Path] = []
+        self._run_count = 0
+        self._sources: Dict[str, int] = {}
+        self._seq = 0
+        self.spilled = 0  # records written to run files
+
+    def add(self, cid: str, record: Dict[str, Any], source: str) -> None:
+        src = self._sources.setdefault(source, len(self._sources))
+        self._buffer.append((cid, self._seq, src, record))
+        self._seq += 1
+        if len(self._buffer) >= self.buffer_size:
+            self._spill()
+
+    def _run_path(self) -> Path:
+        if self._tmpdir is None:
+            if self._tmpdir_parent is not None:
+                self._tmpdir_parent.mkdir(parents=True, exist_ok=True)
+            self._tmpdir = Path(tempfile.mkdtemp(prefix=".group-runs-", dir=self._tmpdir_parent))
+        self._run_count += 1
+        return self._tmpdir / f"run-{self._run_count:06d}.jsonl"
+
+    def _write_run(self, rows: Iterable[tuple]) -> Path:
+        path = self._run_path()
+        with path.open("w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(codec.dumps(list(row)) + "\n")
+        self._runs.append(path)
+        return path
+
+    def _spill(self) -> None:
+        self._buffer.sort(key=lambda row: (row[0], row[1]))
+        self.spilled += len(self._buffer)
+        self._write_run(self._buffer)
+        self._buffer = []
+
+    @staticmethod
+    def _read_run(path: Path) -> Iterator[tuple]:
+        with path.open("rb") as f:
+            for line in f:
+                cid, seq, src, record = codec.loads(line)
+                yield cid, seq, src, record
+
+    def _merge_runs(self) -> None:
+        """Reduce the number of runs to at most MERGE_FANIN."""
+        while len(self._runs) > MERGE_FANIN:
+            batch, self._runs = self._runs[:MERGE_FANIN], self._runs[MERGE_FANIN:]
+            merged = heapq.merge(*(self._read_run(p) for p in batch), key=lambda row: (row[0], row[1]))
+            self._write_run(merged)
+            for p in batch:
+                p.unlink()
+
+    def groups(self) -> Iterator[MessageGroup]:
+        """Complete threads in thread-id order; run files are removed afterwards."""
+        try:
+            self._buffer.sort(key=lambda row: (row[0], row[1]))
+            self._merge_runs()
+            streams = [self._read_run(p) for p in self._runs] + [iter(self._buffer)]
+            merged = heapq.merge(*streams, key=lambda row: (row[0], row[1]))
+            sources = list(self._sources)
+            for cid, rows in itertools.groupby(merged, key=lambda row: row[0]):
+                rows = list(rows)
+                yield MessageGroup(cid, [row[3] for row in rows], sources[rows[0][2]])
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._buffer = []
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+        self._runs = []
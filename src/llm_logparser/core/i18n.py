@@ -20,7 +20,7 @@ _MESSAGES: Dict[str, Dict[str, str]] = {
         "cli.config.help": "(placeholder) Manage runtime configuration",
 
         "cli.parse.opt.provider.help": "Provider ID (e.g., openai)",
-        "cli.parse.opt.input.help": "Input JSON/JSONL path",
+        "cli.parse.opt.input.help": "Input JSON/JSONL path(s), directories or globs (repeatable)",
         "cli.parse.opt.outdir.help": "Output root directory (provider subdir will be auto-created)",
         "cli.parse.opt.dry_run.help": "Run parse without writing any files (stats/log only).",
         "cli.parse.opt.fail_fast.help": "Stop parsing on first error instead of continuing.",
@@ -1,13 +1,40 @@
 # src/llm_logparser/parser.py
 from __future__ import annotations
 import json
-import importlib
+import bz2
+import codecs
+import gzip
+import hashlib
+import io
+import itertools
 import logging
-from pathlib import Path
-from typing import Any, Dict, Generator, Optional
+import lzma
+import os
+import queue
+import re
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, Generator, Iterable, Optional, Sequence
 from datetime import datetime
+from decimal import Decimal
 from inspect import signature
 
+from . import codec
+from .checkpoint import CHECKPOINT_NAME, CheckpointWriter, input_signature, load_checkpoint
+from .runstats import NULL_TIMES, RunStats, StageTimes
+from .grouping import GROUP_BUFFER_RECORDS, MessageGroup, MessageGrouper
+from .providers.registry import ProviderRegistry, UnknownProviderError, default_registry
+from .store import LAYOUTS, DirectoryStore, PackedStore, open_store, thread_relpath
+from .scanner import RecordSpan, ScanError, iter_record_spans, release_maps
+
+if TYPE_CHECKING:
+    from .schema_validation import MessageSchemaValidator
+
 try:
     import ijson  # type: ignore
 except Exception:  # pragma: no cover
@@ -38,80 +65,577 @@ class LLPWriteError(LLPError):
 # 2. Provider Adapter Loader
 # ============================================================
 
-def load_adapter(provider: str):
-    """動的に provider adapter をロードする。"""
-    mod = importlib.import_module(f"llm_logparser.core.providers.{provider}.adapter")
+ADAPTER_PROTOCOL_VERSION = 1
+BRANCH_MODES = ("merged", "active", "all")
+DEFAULT_BRANCH = "merged"
+
+
+@dataclass(frozen=True)
+class AdapterSpec:
+    """A provider adapter with its capabilities resolved once at load time.
+
+    Providers declare them in get_manifest()["adapter"]:
+        {"protocol": 1, "accepts_source": bool, "batch": bool}
+    "batch": True means the module defines
+        adapter_batch(conversations, *, source=None) -> list[list[dict]]
+    returning one message list per conversation, in order. Adapters without
+    the declaration are inspected once instead (legacy behavior).
+
+    Optional "thread_id_fields" / "update_time_field" name the raw record
+    keys holding the conversation id and its last update time; they let the
+    differential cache skip unchanged conversations before the adapter runs.
+
+    Optional "branch_modes" lists the --branch modes the adapter accepts as
+    branch=<mode> ("merged", the default, is never passed). In "all" mode the
+    adapter may yield several threads per record, each a run of messages with
+    its own conversation_id (see _ThreadProcessor._finish_branches).
+
+    Optional "message_records": {"thread_id_field": <key>} means the module
+    defines adapter_messages(records, *, source=None) -> list[dict] for
+    message-level inputs (one message per record); --group-messages groups
+    such records by <key> before calling it (see grouping.py).
+    """
+    provider: str
+    func: Callable[..., Iterable[Dict[str, Any]]]
+    manifest: Dict[str, Any]
+    policy: Dict[str, Any]
+    accepts_source: bool = False
+    batch_func: Callable[..., Sequence[Iterable[Dict[str, Any]]]] | None = None
+    thread_id_fields: tuple[str, ...] = ()
+    update_time_field: str | None = None
+    branch_modes: tuple[str, ...] = (DEFAULT_BRANCH,)
+    messages_func: Callable[..., Iterable[Dict[str, Any]]] | None = None
+    message_thread_field: str | None = None
+
+    def thread_key(self, raw: Dict[str, Any]) -> tuple[str | None, Any]:
+        """(conversation_id, update_time) read straight from a raw record."""
+        cid = None
+        for name in self.thread_id_fields:
+            value = raw.get(name)
+            if isinstance(value, str) and value:
+                cid = value
+                break
+        update_time = raw.get(self.update_time_field) if self.update_time_field else None
+        return cid, update_time
+
+    def iter_adapt(self, raw: Dict[str, Any], source: str | None, branch: str = DEFAULT_BRANCH) -> Iterable:
+        """The adapter's output as returned (possibly a lazy generator)."""
+        kwargs: Dict[str, Any] = {} if branch == DEFAULT_BRANCH else {"branch": branch}
+        if self.accepts_source:
+            return self.func(raw, source=source, **kwargs)
+        return self.func(raw, **kwargs)
+
+    def adapt(self, raw: Dict[str, Any], source: str | None, branch: str = DEFAULT_BRANCH) -> list:
+        return list(self.iter_adapt(raw, source, branch))
+
+    def adapt_messages(self, records: list[Dict[str, Any]], source: str | None) -> list:
+        """One thread from its message-level records; needs messages_func."""
+        assert self.messages_func is not None
+        if self.accepts_source:
+            return list(self.messages_func(records, source=source))
+        return list(self.messages_func(records))
+
+    def adapt_batch(self, raws: list[Dict[str, Any]], source: str | None, branch: str = DEFAULT_BRANCH) -> list[list]:
+        """One message list per record; needs batch_func."""
+        assert self.batch_func is not None
+        kwargs: Dict[str, Any] = {} if branch == DEFAULT_BRANCH else {"branch": branch}
+        if self.accepts_source:
+            out = self.batch_func(raws, source=source, **kwargs)
+        else:
+            out = self.batch_func(raws, **kwargs)
+        out = [list(recs) for recs in out]
+        if len(out) != len(raws):
+            raise LLPAdapterError(
+                f"adapter_batch returned {len(out)} results for {len(raws)} records"
+            )
+        return out
+
+
+def _accepts_source(func: Callable[..., Any]) -> bool:
+    try:
+        return "source" in signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def load_adapter(provider: str, *, registry: ProviderRegistry | None = None) -> AdapterSpec:
+    """provider registry から adapter を import し、adapter protocol を一度だけ解決する。"""
+    registry = registry or default_registry()
+    try:
+        mod = registry.import_module(provider)
+    except UnknownProviderError as e:
+        raise LLPAdapterError(str(e)) from None
     get_adapter = getattr(mod, "get_adapter", None)
     if not get_adapter:
         raise LLPAdapterError(f"adapter missing for provider={provider}")
     manifest = getattr(mod, "get_manifest", lambda: {})()
+    registry.remember(provider, manifest)
     policy = getattr(mod, "get_policy", lambda: {})()
-    return get_adapter(), manifest, policy
+    func = get_adapter()
+
+    declared = manifest.get("adapter")
+    if not isinstance(declared, dict):
+        return AdapterSpec(provider, func, manifest, policy, accepts_source=_accepts_source(func))
+
+    version = declared.get("protocol", ADAPTER_PROTOCOL_VERSION)
+    if version != ADAPTER_PROTOCOL_VERSION:
+        raise LLPAdapterError(f"unsupported adapter protocol {version!r} for provider={provider}")
+    batch_func = None
+    if declared.get("batch"):
+        batch_func = getattr(mod, "adapter_batch", None)
+        if not callable(batch_func):
+            raise LLPAdapterError(f"provider={provider} declares batch but has no adapter_batch()")
+    messages_func, message_thread_field = None, None
+    message_records = declared.get("message_records")
+    if isinstance(message_records, dict):
+        messages_func = getattr(mod, "adapter_messages", None)
+        message_thread_field = message_records.get("thread_id_field")
+        if not callable(messages_func) or not isinstance(message_thread_field, str):
+            raise LLPAdapterError(
+                f"provider={provider} declares message_records but has no adapter_messages() or thread_id_field"
+            )
+    return AdapterSpec(
+        provider,
+        func,
+        manifest,
+        policy,
+        accepts_source=bool(declared.get("accepts_source")),
+        batch_func=batch_func,
+        thread_id_fields=tuple(declared.get("thread_id_fields") or ()),
+        update_time_field=declared.get("update_time_field"),
+        branch_modes=tuple(declared.get("branch_modes") or (DEFAULT_BRANCH,)),
+        messages_func=messages_func,
+        message_thread_field=message_thread_field,
+    )
 
 
 # ============================================================
 # 3. JSON Stream Reader (Hybrid)
 # ============================================================
 
-def iter_json_records(path: Path, logger: logging.Logger) -> Generator[Dict[str, Any], None, None]:
+_BOM = b"\xef\xbb\xbf"
+
+# Extensions picked up when a directory is given as input.
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+JSON_SUFFIXES = (".json",) + JSONL_SUFFIXES
+ARCHIVE_SUFFIXES = (".zip",)
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zst")
+INPUT_SUFFIXES = (
+    JSON_SUFFIXES
+    + ARCHIVE_SUFFIXES
+    + tuple(j + c for j in JSON_SUFFIXES for c in COMPRESSED_SUFFIXES)
+)
+
+# Magic bytes -> container kind (checked in order).
+_MAGIC = (
+    (b"PK\x03\x04", "zip"),
+    (b"PK\x05\x06", "zip"),
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+
+# Fastest first. yajl2 (ctypes) is skipped: it is slower than the C extension
+# and needs the shared library at runtime.
+IJSON_BACKENDS = ("yajl2_c", "yajl2_cffi", "python")
+IJSON_BUF_SIZE = 256 * 1024
+JSONL_BLOCK_SIZE = 1024 * 1024
+_SNIFF_SIZE = 64 * 1024
+
+# ChatGPT export archives keep the conversations in this member.
+ZIP_PRIMARY_MEMBER = "conversations.json"
+
+_ijson_backend_cache: list = []
+
+
+def select_ijson_backend():
+    """Return the fastest importable ijson backend module (or None without ijson)."""
+    if _ijson_backend_cache:
+        return _ijson_backend_cache[0]
+    backend = None
+    if ijson is not None:
+        for name in IJSON_BACKENDS:
+            try:
+                backend = ijson.get_backend(name)
+                break
+            except Exception:
+                continue
+    _ijson_backend_cache.append(backend)
+    return backend
+
+
+def _ijson_has_use_float() -> bool:
+    """items(use_float=...) exists from ijson 3.1; older releases only yield Decimal."""
+    try:
+        major, minor = (int(p) for p in str(ijson.__version__).split(".")[:2])
+    except (AttributeError, ValueError):
+        return False
+    return (major, minor) >= (3, 1)
+
+
+def _decimals_to_float(obj: Any) -> Any:
+    """Decimal -> float throughout a decoded value (ijson < 3.1 without use_float)."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, dict):
+        return {k: _decimals_to_float(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_decimals_to_float(v) for v in obj]
+    return obj
+
+
+def detect_container(path: Path) -> str:
+    """Identify the input container by magic bytes (see _MAGIC), else "plain"."""
+    with path.open("rb") as f:
+        magic = f.read(6)
+    for prefix, kind in _MAGIC:
+        if magic.startswith(prefix):
+            return kind
+    return "plain"
+
+
+def _open_zstd(raw: BinaryIO) -> BinaryIO:
+    try:
+        from compression import zstd  # type: ignore  # Python 3.14+
+
+        return zstd.ZstdFile(raw)
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore
+    except ImportError:
+        raise LLPInputError("zstd input requires the 'zstandard' package (or Python 3.14+)")
+    reader = zstandard.ZstdDecompressor().stream_reader(raw, read_size=IJSON_BUF_SIZE)
+    return io.BufferedReader(reader, buffer_size=IJSON_BUF_SIZE)
+
+
+def _open_decompressed(raw: BinaryIO, kind: str) -> BinaryIO:
+    """Wrap `raw` in a streaming decompressor for `kind`."""
+    if kind == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if kind == "bz2":
+        return bz2.BZ2File(raw, mode="rb")
+    if kind == "xz":
+        return lzma.LZMAFile(raw, mode="rb")
+    if kind == "zstd":
+        return _open_zstd(raw)
+    return raw
+
+
+def _strip_compression_suffix(name: str) -> str:
+    lowered = name.lower()
+    for suffix in COMPRESSED_SUFFIXES:
+        if lowered.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _select_zip_members(zf: zipfile.ZipFile, path: Path) -> list[zipfile.ZipInfo]:
+    """conversations.json (shallowest) if present, else every JSON/JSONL member by name."""
+    files = [i for i in zf.infolist() if not i.is_dir()]
+    primary = [i for i in files if PurePosixPath(i.filename).name == ZIP_PRIMARY_MEMBER]
+    if primary:
+        return [min(primary, key=lambda i: (i.filename.count("/"), i.filename))]
+    members = sorted(
+        (i for i in files if i.filename.lower().endswith(JSON_SUFFIXES)),
+        key=lambda i: i.filename,
+    )
+    if not members:
+        raise LLPInputError(f"no JSON/JSONL member in archive: {path}")
+    return members
+
+
+def _iter_input_streams(
+    path: Path, logger: logging.Logger
+) -> Generator[tuple[str, BinaryIO], None, None]:
     """
-    巨大JSON/JSONLをストリーム的に読み込む。
-    - JSON配列: ijson（あれば）で逐次読み取り
-    - JSONオブジェクト: json.load で1件として読み取り
-    - JSONL/NDJSON: 行単位で処理
+    Yield (name, binary stream) for each logical input inside `path`.
+
+    Archive members and compressed files (gzip/bz2/xz, zstd when importable)
+    are decompressed on the fly; nothing is written to disk.
     """
-    try:
-        with path.open("r", encoding="utf-8-sig") as f:
-            first = ""
-            while True:
-                ch = f.read(1)
-                if ch == "":
-                    break
-                if not ch.isspace():
-                    first = ch
-                    break
-            f.seek(0)
-
-            # JSONL / NDJSON
-            if first not in ("[", "{"):
-                for i, line in enumerate(f, start=1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        yield json.loads(line)
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"skip invalid JSON line ({i}): {e}")
-                        continue
-                return
+    kind = detect_container(path)
+    if kind == "zip":
+        with zipfile.ZipFile(path) as zf:
+            for info in _select_zip_members(zf, path):
+                logger.info(f"reading archive member: {path.name}!{info.filename}")
+                with zf.open(info) as member:
+                    yield info.filename, member
+        return
+    with path.open("rb") as f:
+        if kind == "plain":
+            yield path.name, f
+            return
+        logger.info(f"reading {kind}-compressed input: {path.name}")
+        with _open_decompressed(f, kind) as stream:
+            yield _strip_compression_suffix(path.name), stream
+
+
+def _skip_preamble(stream) -> tuple[int, int]:
+    """
+    Consume an optional BOM and leading whitespace; return (bytes consumed,
+    newlines among them) so JSONL offsets and line numbers stay exact.
+    `stream` must support peek().
+    """
+    skipped = newlines = 0
+    head = stream.peek(_SNIFF_SIZE)
+    if head.startswith(_BOM):
+        skipped += len(stream.read(3))
+        head = stream.peek(_SNIFF_SIZE)
+    while head:
+        stripped = head.lstrip()
+        ws = stream.read(len(head) - len(stripped)) if stripped else stream.read(len(head))
+        skipped += len(ws)
+        newlines += ws.count(b"\n")
+        if stripped:
+            return skipped, newlines
+        head = stream.peek(_SNIFF_SIZE)
+    return skipped, newlines
 
-            # JSON array
-            if first == "[":
-                if ijson is not None:
-                    for i, item in enumerate(ijson.items(f, "item"), start=1):
-                        if not isinstance(item, dict):
-                            logger.warning(f"skip invalid element ({i})")
-                            continue
-                        yield item
-                    return
-                # fallback: load entire array (smaller files)
-                data = json.load(f)
-                if not isinstance(data, list):
-                    raise LLPInputError("expected JSON array")
-                for i, item in enumerate(data, start=1):
-                    if not isinstance(item, dict):
-                        logger.warning(f"skip invalid element ({i})")
-                        continue
-                    yield item
-                return
 
-            # JSON object
-            obj = json.load(f)
-            if isinstance(obj, dict):
-                yield obj
+def _sniff_first_byte(stream) -> bytes:
+    """
+    Consume an optional BOM and leading whitespace; return the next byte (b"" at EOF)
+    without consuming it. `stream` must support peek().
+    """
+    _skip_preamble(stream)
+    return stream.peek(1)[:1]
+
+
+def _first_significant_byte(path: Path) -> bytes:
+    """First non-whitespace byte of a plain file, after an optional UTF-8 BOM."""
+    with path.open("rb") as f:
+        return _sniff_first_byte(f)
+
+
+_WS_RE = re.compile(r"[ \t\n\r]*")
+# Decode errors this close to the end of the buffer may just be a cut-off
+# literal (`tru`, `1e+`, `\u12`); read more before giving up.
+_TRUNCATION_SLACK = 8
+
+
+class _ArrayItemReader:
+    """
+    Stdlib-only incremental reader for a top-level JSON array.
+
+    UTF-8 text is decoded chunk by chunk into a sliding buffer and each element
+    is parsed with json.JSONDecoder.raw_decode; the consumed prefix is dropped
+    whenever more input is read. Memory stays around the largest element plus
+    one chunk. An element cut off by the chunk boundary fails to decode and is
+    retried after reading more; the read size doubles on every retry so large
+    elements cost linear, not quadratic, time.
+    """
+
+    def __init__(self, stream: BinaryIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.raw_decode = json.JSONDecoder().raw_decode
+        self.buf = ""
+        self.pos = 0
+        self.base = 0  # characters dropped from the front of buf
+        self.eof = False
+
+    def _fill(self, size: int) -> bool:
+        """Append up to `size` more bytes of text; False at end of input."""
+        if self.eof:
+            return False
+        data = self.stream.read(size)
+        self.eof = not data
+        text = self.decoder.decode(data, final=self.eof)
+        self.base += self.pos
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return bool(data)
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ("" at end of input)."""
+        while True:
+            self.pos = _WS_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def _error(self, msg: str, pos: int) -> LLPInputError:
+        return LLPInputError(f"invalid JSON array at char {self.base + pos}: {msg}")
+
+    def _truncated(self, e: json.JSONDecodeError) -> bool:
+        """Could more input make this decode error go away?"""
+        if self.eof:
+            return False
+        return e.pos >= len(self.buf) - _TRUNCATION_SLACK or e.msg.startswith("Unterminated string")
+
+    def _value(self) -> Any:
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = self.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if not self._truncated(e):
+                    raise self._error(e.msg, e.pos)
+                self._fill(size)
+                size *= 2
+                continue
+            # a bare number cut by the chunk boundary ("1." / "1e+") decodes
+            # short; containers and strings end on their own closing character
+            if (
+                not self.eof
+                and not isinstance(obj, (dict, list, str))
+                and end + _TRUNCATION_SLACK >= len(self.buf)
+            ):
+                self._fill(size)
+                continue
+            self.pos = end
+            return obj
+
+    def __iter__(self) -> Generator[Any, None, None]:
+        if self._peek() != "[":
+            raise self._error("expected JSON array", self.pos)
+        self.pos += 1
+        if self._peek() == "]":
+            return
+        while True:
+            self._peek()
+            yield self._value()
+            c = self._peek()
+            if c == "]":
                 return
-            raise LLPInputError("expected JSON object at top-level")
+            if c != ",":
+                raise self._error("expected ',' or ']'", self.pos)
+            self.pos += 1
+
+
+def iter_array_items(stream: BinaryIO, *, chunk_size: int = IJSON_BUF_SIZE) -> Iterable[Any]:
+    """
+    Yield the elements of the JSON array in binary `stream` one at a time
+    (stdlib only; used when ijson is not installed). `stream` must be
+    positioned at the opening `[` or the whitespace before it.
+    """
+    return iter(_ArrayItemReader(stream, chunk_size))
+
+
+def _iter_json_array(stream, logger: logging.Logger) -> Generator[Dict[str, Any], None, None]:
+    backend = select_ijson_backend()
+    if backend is not None:
+        logger.info(f"ijson backend: {backend.backend_name}")
+        # use_float: numbers arrive as float/int (not Decimal), so records
+        # are JSON-safe as decoded and adapters need no conversion pass.
+        # ijson < 3.1 has no use_float (and only rejects it once iterated),
+        # so there the Decimals are converted here instead.
+        if _ijson_has_use_float():
+            items = backend.items(stream, "item", use_float=True, buf_size=IJSON_BUF_SIZE)
+        else:
+            items = map(_decimals_to_float, backend.items(stream, "item", buf_size=IJSON_BUF_SIZE))
+    else:
+        logger.info("ijson not available; using the built-in incremental array reader")
+        items = iter_array_items(stream)
+    for i, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            logger.warning(f"skip invalid element ({i})")
+            continue
+        yield item
+
+
+def _iter_jsonl(
+    stream, logger: logging.Logger, *, offset: int = 0, lineno: int = 1
+) -> Generator[Dict[str, Any], None, None]:
+    """
+    JSONL/NDJSON in binary blocks: split on b"\n" without decoding to str and
+    hand the line bytes straight to the codec. The decoder is chosen once per
+    block (codec.loads_for), so its wide-integer pre-check is not paid per line.
+    Bad lines are skipped with their line number and byte offset (`offset` /
+    `lineno` are where `stream` starts in the input, e.g. after a BOM and
+    blank lines).
+    """
+    pending: list[bytes] = []  # pieces of a line not terminated yet
+    while True:
+        block = stream.read(JSONL_BLOCK_SIZE)
+        if block:
+            lines = block.split(b"\n")
+            if len(lines) == 1:
+                pending.append(block)
+                continue
+            if pending:
+                pending.append(lines[0])
+                lines[0] = b"".join(pending)
+            pending = [lines.pop()]
+            # lines[1:] lie inside `block`; lines[0] may span earlier blocks
+            loads = codec.loads_for(lines[0], block)
+        else:
+            lines = [b"".join(pending)]
+            loads = codec.loads_for(lines[0])
+        for line in lines:
+            if line and not line.isspace():
+                try:
+                    yield loads(line)
+                except ValueError as e:  # JSONDecodeError / UnicodeDecodeError
+                    logger.warning(f"skip invalid JSON line ({lineno}, byte {offset}): {e}")
+            lineno += 1
+            offset += len(line) + 1
+        if not block:
+            return
+
+
+def _iter_stream_records(
+    stream, name: str, logger: logging.Logger
+) -> Generator[Dict[str, Any], None, None]:
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream, buffer_size=_SNIFF_SIZE)
+    skipped, skipped_lines = _skip_preamble(stream)
+    first = stream.peek(1)[:1]
 
+    # JSON array
+    if first == b"[":
+        yield from _iter_json_array(stream, logger)
+        return
+
+    # JSON object, or JSONL under another name (.log, .txt, ...): a first line
+    # that is a complete JSON value means line-delimited records (a one-line
+    # object is just one of them), so only a multi-line document is read whole.
+    if first == b"{" and not name.lower().endswith(JSONL_SUFFIXES):
+        line = stream.readline()
+        try:
+            obj = codec.loads(line)
+        except ValueError:
+            pass
+        else:
+            yield obj
+            yield from _iter_jsonl(stream, logger, offset=skipped + len(line), lineno=2 + skipped_lines)
+            return
+        data = line + stream.read()
+        try:
+            obj = codec.loads(data)
+        except json.JSONDecodeError as e:
+            if not e.msg.startswith("Extra data"):
+                raise
+            yield from _iter_jsonl(io.BytesIO(data), logger, offset=skipped, lineno=1 + skipped_lines)
+            return
+        if isinstance(obj, dict):
+            yield obj
+            return
+        raise LLPInputError("expected JSON object at top-level")
+
+    # JSONL / NDJSON
+    yield from _iter_jsonl(stream, logger, offset=skipped, lineno=1 + skipped_lines)
+
+
+def iter_json_records(path: Path, logger: logging.Logger) -> Generator[Dict[str, Any], None, None]:
+    """
+    巨大JSON/JSONLをストリーム的に読み込む。
+    - JSON配列: ijson（あれば、最速バックエンド・バイナリ入力）で逐次読み取り。
+      ijson が無い場合は標準ライブラリの逐次リーダー (iter_array_items)
+    - JSONオブジェクト: 1件として読み取り
+    - JSONL/NDJSON: 行単位で処理
+    - .zip (ChatGPT エクスポート): conversations.json をアーカイブから直接ストリーム
+    - gzip/bz2/xz/zstd 圧縮: マジックバイトで判定し展開しながら読み取り
+    """
+    try:
+        for name, stream in _iter_input_streams(path, logger):
+            yield from _iter_stream_records(stream, name, logger)
+    except LLPInputError:
+        raise
     except FileNotFoundError:
         raise LLPInputError(f"input not found: {path}")
     except PermissionError:
@@ -120,6 +644,187 @@ def iter_json_records(path: Path, logger: logging.Logger) -> Generator[Dict[str,
         raise LLPInputError(f"reader error: {e}")
 
 
+READER_MODES = ("stream", "mmap")
+
+
+def iter_record_units(
+    path: Path,
+    logger: logging.Logger,
+    *,
+    reader: str = "stream",
+    skip: int = 0,
+    resume_at: int | None = None,
+) -> Iterable[Dict[str, Any] | RecordSpan]:
+    """
+    Yield parse units for `path`: decoded records (stream) or byte spans (mmap).
+
+    reader="mmap" only applies to top-level JSON arrays; spans are decoded by
+    whoever processes them, so with --jobs N decoding runs in the workers.
+    Other layouts fall back to the stream reader.
+
+    `skip` drops the first N units (used by --resume). With the mmap reader,
+    `resume_at` (the byte offset where unit N ended) seeks there directly
+    instead of rescanning the skipped part.
+    """
+    if reader not in READER_MODES:
+        raise LLPInputError(f"unknown reader mode: {reader}")
+    if reader == "mmap":
+        try:
+            plain = detect_container(path) == "plain"
+            first = _first_significant_byte(path) if plain else b""
+        except FileNotFoundError:
+            raise LLPInputError(f"input not found: {path}")
+        if first == b"[":
+            logger.info("reader: mmap (byte-range spans)")
+            if resume_at is not None:
+                return _iter_spans_checked(path, resume_at=resume_at, index=skip)
+            return itertools.islice(_iter_spans_checked(path), skip, None)
+        logger.info("reader: mmap needs an uncompressed top-level JSON array; using stream reader")
+    return itertools.islice(iter_json_records(path, logger), skip, None)
+
+
+def _iter_spans_checked(path: Path, **kwargs: Any) -> Generator[RecordSpan, None, None]:
+    try:
+        yield from iter_record_spans(path, **kwargs)
+    except ScanError as e:
+        raise LLPInputError(f"reader error: {e}")
+    except PermissionError:
+        raise LLPInputError(f"permission denied: {path}")
+
+
+
+@dataclass(frozen=True)
+class ReadPosition:
+    """Where reading stands after a unit: file index, units read from that
+    file, and (mmap reader only) the byte offset the unit ended at."""
+    file: int
+    record: int
+    offset: int | None = None
+
+    def to_list(self) -> list:
+        return [self.file, self.record, self.offset]
+
+
+_EOF = object()
+
+
+class _PrefetchReader(threading.Thread):
+    """Reads one input file into a bounded queue on a background thread.
+
+    Lets file I/O (and, later, decompression) of upcoming files overlap with
+    processing of the current one. Consumers still drain files in order.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        logger: logging.Logger,
+        reader: str,
+        maxsize: int,
+        resume: Dict[str, Any] | None = None,
+    ):
+        super().__init__(name=f"llp-reader:{path.name}", daemon=True)
+        self.path = path
+        self.logger = logger
+        self.reader = reader
+        self.resume = resume or {}
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.stop = threading.Event()
+
+    def _put(self, item: Any) -> bool:
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self) -> None:
+        try:
+            units = iter_record_units(self.path, self.logger, reader=self.reader, **self.resume)
+            for unit in units:
+                if not self._put(unit):
+                    return
+        except BaseException as e:  # re-raised by the consumer
+            self._put(e)
+            return
+        self._put(_EOF)
+
+    def __iter__(self):
+        while True:
+            item = self.queue.get()
+            if item is _EOF:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+
+def iter_input_units(
+    paths: Sequence[Path],
+    logger: logging.Logger,
+    *,
+    reader: str = "stream",
+    readers: int = 4,
+    queue_size: int = 64,
+    start: ReadPosition | None = None,
+) -> Generator[tuple[Dict[str, Any] | RecordSpan, str, ReadPosition], None, None]:
+    """
+    Yield (unit, source, position) across several inputs, in file order then
+    record order.
+
+    Up to `readers` files are read concurrently ahead of the consumer; the
+    output order does not depend on thread scheduling. `position` is where
+    reading would continue after this unit; passing it back as `start`
+    resumes right after the unit (files before it are not opened at all).
+    """
+    first = start.file if start else 0
+    resume = {0: {"skip": start.record, "resume_at": start.offset}} if start else {}
+    todo = list(enumerate(paths))[first:]
+
+    def positioned(file_index: int, skip: int, units: Iterable[Any]):
+        for n, unit in enumerate(units, start=skip + 1):
+            offset = unit.end if isinstance(unit, RecordSpan) else None
+            yield unit, ReadPosition(file_index, n, offset)
+
+    if len(todo) <= 1 or readers <= 1:
+        for k, (i, path) in enumerate(todo):
+            opts = resume.get(k, {})
+            source = str(path)
+            units = iter_record_units(path, logger, reader=reader, **opts)
+            for unit, pos in positioned(i, opts.get("skip", 0), units):
+                yield unit, source, pos
+        return
+
+    pending = deque(enumerate(todo))
+    active: deque[tuple[int, _PrefetchReader]] = deque()
+
+    def start_next() -> None:
+        if pending:
+            k, (i, path) = pending.popleft()
+            r = _PrefetchReader(path, logger, reader, queue_size, resume.get(k))
+            r.start()
+            active.append((i, r))
+
+    for _ in range(readers):
+        start_next()
+    try:
+        while active:
+            i, current = active[0]
+            source = str(current.path)
+            for unit, pos in positioned(i, current.resume.get("skip", 0), current):
+                yield unit, source, pos
+            active.popleft()
+            start_next()
+    finally:
+        for _, r in active:
+            r.stop.set()
+        # a reader may still be scanning a mapped input; let it finish first
+        for _, r in active:
+            r.join()
+
+
 # ============================================================
 # 4. Validation / Cache Utilities
 # ============================================================
@@ -174,34 +879,529 @@ def load_manifest_if_exists(provider_dir: Path) -> dict:
     if not man_path.exists():
         return {}
     try:
-        return json.loads(man_path.read_text(encoding="utf-8"))
+        return codec.loads(man_path.read_bytes())
     except Exception:
         return {}
 
 
-def should_skip_thread(conv_id: str, msgs: list, manifest_old: dict) -> bool:
-    """update_timeなどで差分スキップを判定。"""
+def index_manifest(manifest: dict) -> Dict[str, Dict[str, Any]]:
+    """manifest の index.threads を conversation_id で引ける dict にする。"""
+    threads = manifest.get("index", {}).get("threads", []) if isinstance(manifest, dict) else []
+    out: Dict[str, Dict[str, Any]] = {}
+    for entry in threads if isinstance(threads, list) else []:
+        if isinstance(entry, dict) and isinstance(entry.get("conversation_id"), str):
+            out[entry["conversation_id"]] = entry
+    return out
+
+
+def thread_digest(data: bytes) -> str:
+    """Content digest of one serialized parsed.jsonl."""
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+class ThreadCache:
+    """Differential cache backed by the previous run's manifest.
+
+    An entry is only usable while its parsed.jsonl (or its byte range in
+    threads.pack) still exists, so deleting a thread directory forces that
+    thread to be regenerated.
+    """
+
+    def __init__(self, manifest_old: dict, provider_dir: Path | None = None):
+        self.entries = index_manifest(manifest_old)
+        self.provider_dir = provider_dir
+        self._sizes: Dict[str, int] = {}
+
+    def _size(self, rel: str) -> int:
+        size = self._sizes.get(rel)
+        if size is None:
+            p = self.provider_dir / rel
+            size = self._sizes[rel] = p.stat().st_size if p.is_file() else -1
+        return size
+
+    def get(self, cid: str) -> Dict[str, Any] | None:
+        entry = self.entries.get(cid)
+        if entry is None or self.provider_dir is None:
+            return entry
+        rel = entry.get("path", "")
+        if "offset" in entry:
+            if entry["offset"] + entry.get("length", 0) > self._size(rel):
+                return None
+        elif not (self.provider_dir / rel).is_file():
+            return None
+        return entry
+
+    def check_update_time(self, cid: str | None, update_time: Any) -> tuple[Dict[str, Any] | None, str]:
+        """
+        update_time による判定: (entry, "same" | "older") ならスキップ可、
+        (None, "") なら adapter を通して内容 digest で判定する。
+        """
+        if cid is None or update_time is None:
+            return None, ""
+        entry = self.get(cid)
+        cached = entry.get("update_time") if entry else None
+        if cached is None:
+            return None, ""
+        try:
+            if update_time == cached:
+                return entry, "same"
+            if update_time < cached:
+                return entry, "older"
+        except TypeError:
+            pass
+        return None, ""
+
+
+# ============================================================
+# 5. Thread Processing (shared by serial / parallel modes)
+# ============================================================
+
+@dataclass
+class ThreadResult:
+    """Outcome of running adapter + validation + serialization on one raw record.
+
+    status: "ok" | "empty" | "no_cid" | "skip" | "invalid" | "error"
+    Results are plain data so they can cross process boundaries unchanged.
+    """
+    status: str
+    cid: str | None = None
+    count: int = 0
+    skipped: int = 0
+    ts_min: int | float | None = None
+    ts_max: int | float | None = None
+    update_time: Any = None
+    digest: str | None = None
+    data: bytes = b""
+    stored: Dict[str, Any] | None = None  # storage location carried over by "skip"
+    warnings: list[str] = field(default_factory=list)
+    error: str | None = None
+    timings: Dict[str, list] | None = None  # worker stage times (--stats-json)
+    variants: list["ThreadResult"] = field(default_factory=list)  # --branch all: other branches
+
+    @classmethod
+    def cached(cls, entry: Dict[str, Any], **kwargs: Any) -> "ThreadResult":
+        """A "skip" result that carries the previous manifest entry forward."""
+        return cls(
+            status="skip",
+            cid=entry["conversation_id"],
+            count=entry.get("count", 0),
+            ts_min=entry.get("ts_min"),
+            ts_max=entry.get("ts_max"),
+            update_time=entry.get("update_time"),
+            digest=entry.get("digest"),
+            stored={k: entry[k] for k in ("path", "offset", "length") if k in entry},
+            **kwargs,
+        )
+
+
+class _ThreadProcessor:
+    """Runs the per-record half of the pipeline.
+
+    Used directly in serial mode and once per worker process with --jobs N.
+    Warnings are collected (not logged) so the writer can replay them in
+    input order, keeping logs identical between serial and parallel runs.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        *,
+        manifest_old: dict,
+        dry_run: bool,
+        fail_fast: bool,
+        schema_validator: "MessageSchemaValidator" | None = None,
+        provider_dir: Path | None = None,
+        times: StageTimes = NULL_TIMES,
+        branch: str = DEFAULT_BRANCH,
+    ):
+        self.adapter = load_adapter(provider)
+        self.branch = branch
+        self.times = times
+        self.provider = provider
+        self.cache = ThreadCache(manifest_old, provider_dir)
+        self.dry_run = dry_run
+        self.fail_fast = fail_fast
+        self.schema_validator = schema_validator
+        self.validation_error_cls = None
+        if schema_validator:
+            from .schema_validation import MessageValidationError
+
+            self.validation_error_cls = MessageValidationError
+
+    def _load(self, unit: Dict[str, Any] | RecordSpan) -> Dict[str, Any] | ThreadResult:
+        """Decode a span; a ThreadResult means the unit is already settled."""
+        if not isinstance(unit, RecordSpan):
+            return unit
+        hit = self._peek_cached(unit)
+        if hit is not None:
+            return hit
+        try:
+            with self.times.stage("read"):
+                raw = unit.load()
+        except ValueError as e:
+            return ThreadResult(status="error", error=f"reader error: element {unit.index}: {e}")
+        if not isinstance(raw, dict):
+            return ThreadResult(status="invalid", warnings=[f"skip invalid element ({unit.index})"])
+        return raw
+
+    def _peek_cached(self, span: RecordSpan) -> ThreadResult | None:
+        """Pre-decode skip: read only the id/update_time bytes of a span.
+
+        Needs the highest-priority id field itself (a lower one may not be
+        the id the adapter would pick); anything inconclusive decodes as usual.
+        """
+        ids, ut_field = self.adapter.thread_id_fields, self.adapter.update_time_field
+        if not ids or not ut_field or not self.cache.entries:
+            return None
+        try:
+            found = span.peek((ids[0], ut_field))
+        except ValueError:
+            return None
+        cid = found.get(ids[0])
+        if not isinstance(cid, str) or not cid:
+            return None
+        hit, _ = self._precheck({ids[0]: cid, ut_field: found.get(ut_field)})
+        return hit
+
+    def _precheck(self, raw: Dict[str, Any]) -> tuple[ThreadResult | None, Any]:
+        """Skip by update_time before the adapter runs; returns (result, update_time)."""
+        cid, update_time = self.adapter.thread_key(raw)
+        entry, verdict = self.cache.check_update_time(cid, update_time)
+        if verdict not in ("same", "older"):
+            return None, update_time
+        variants = [self.cache.get(v) for v in entry.get("variants") or ()]
+        if None in variants:
+            # a branch thread is gone: run the adapter again
+            return None, update_time
+        warnings = []
+        if verdict == "older":
+            warnings.append(f"update_time of {cid} is older than the cached thread; keeping cached output")
+        hit = ThreadResult.cached(entry, warnings=warnings)
+        hit.variants = [ThreadResult.cached(v) for v in variants]
+        return hit, update_time
+
+    def __call__(self, unit: Dict[str, Any] | RecordSpan | MessageGroup, source: str) -> ThreadResult:
+        if isinstance(unit, MessageGroup):
+            try:
+                return self._process_group(unit)
+            except Exception as e:
+                return ThreadResult(status="error", error=f"adapter error: {e}")
+        raw = self._load(unit)
+        if isinstance(raw, ThreadResult):
+            return raw
+        try:
+            return self._process(raw, source)
+        except Exception as e:
+            return ThreadResult(status="error", error=f"adapter error: {e}")
+
+    def run_batch(self, units: Sequence[tuple[Dict[str, Any] | RecordSpan, str]]) -> list[ThreadResult]:
+        """Process several units; results are identical to calling self per unit.
+
+        Batch-capable adapters get one adapter_batch() call per run of units
+        from the same source. If that call fails, the run is retried record
+        by record so the failure is pinned to the record that caused it.
+        """
+        if (
+            self.adapter.batch_func is None
+            or self.branch == "all"
+            or any(isinstance(unit, MessageGroup) for unit, _ in units)
+        ):
+            return [self(unit, source) for unit, source in units]
+
+        results: list[ThreadResult | None] = [None] * len(units)
+        todo: list[tuple[int, Dict[str, Any], str]] = []
+        update_times: Dict[int, Any] = {}
+        for i, (unit, source) in enumerate(units):
+            raw = self._load(unit)
+            if not isinstance(raw, ThreadResult):
+                try:
+                    hit, update_times[i] = self._precheck(raw)
+                except Exception as e:
+                    hit = ThreadResult(status="error", error=f"adapter error: {e}")
+                if hit is None:
+                    todo.append((i, raw, source))
+                    continue
+                raw = hit
+            results[i] = raw
+
+        for source, run in itertools.groupby(todo, key=lambda t: t[2]):
+            run = list(run)
+            try:
+                with self.times.stage("adapter"):
+                    batch = self.adapter.adapt_batch([raw for _, raw, _ in run], source, self.branch)
+            except Exception:
+                for i, raw, _ in run:
+                    results[i] = self(raw, source)
+                continue
+            for (i, _, _), recs in zip(run, batch):
+                try:
+                    results[i] = self._finish(recs, update_times.get(i))
+                except Exception as e:
+                    results[i] = ThreadResult(status="error", error=f"adapter error: {e}")
+        return results  # type: ignore[return-value]
+
+    def _process(self, raw: Dict[str, Any], source: str) -> ThreadResult:
+        hit, update_time = self._precheck(raw)
+        if hit is not None:
+            return hit
+        if self.branch == "all":
+            recs = self.adapter.iter_adapt(raw, source, self.branch)
+            return self._finish_branches(self.times.timed_iter("adapter", recs), update_time)
+        with self.times.stage("adapter"):
+            recs = self.adapter.adapt(raw, source, self.branch)
+        return self._finish(recs, update_time)
+
+    def _process_group(self, group: MessageGroup) -> ThreadResult:
+        # regrouped message-level records: no update_time to skip on, the digest still applies
+        with self.times.stage("adapter"):
+            recs = self.adapter.adapt_messages(group.records, group.source)
+        return self._finish(recs)
+
+    def _finish_branches(self, recs: Iterable[Dict[str, Any]], update_time: Any) -> ThreadResult:
+        """
+        --branch all: each run of messages with the same conversation_id is
+        one thread. The first is the record's result, the others ride along
+        as its variants; runs are consumed (and serialized) one at a time.
+        """
+        results = [
+            self._finish(list(run), update_time)
+            for _, run in itertools.groupby(recs, key=lambda r: r.get("conversation_id"))
+        ]
+        if not results:
+            return ThreadResult(status="empty")
+        first = results[0]
+        first.variants = [r for r in results[1:] if r.status in ("ok", "skip")]
+        return first
+
+    def _finish(self, recs: list, update_time: Any = None) -> ThreadResult:
+        if not recs:
+            return ThreadResult(status="empty")
+
+        cid = recs[0].get("conversation_id")
+        if not cid:
+            return ThreadResult(status="no_cid", skipped=len(recs))
+
+        recs.sort(key=lambda r: (r.get("ts") is None, r.get("ts"), r.get("message_id") or ""))
+
+        ts_values = [m.get("ts") for m in recs if isinstance(m.get("ts"), (int, float))]
+        result = ThreadResult(
+            status="ok",
+            cid=cid,
+            count=len(recs),
+            ts_min=min(ts_values) if ts_values else None,
+            ts_max=max(ts_values) if ts_values else None,
+            update_time=update_time,
+        )
+        if self.dry_run:
+            return result
+
+        with self.times.stage("validate"):
+            kept = []
+            for m in recs:
+                if self.schema_validator:
+                    try:
+                        self.schema_validator.validate_message(m)
+                    except self.validation_error_cls as verr:
+                        idx = m.get("message_id") or "<unknown>"
+                        result.warnings.append(f"schema validation failed for {cid}/{idx}: {verr}")
+                        result.skipped += 1
+                        if self.fail_fast:
+                            raise LLPAdapterError("message schema validation failed") from verr
+                        continue
+
+                if not validate_message(m, fail_fast=self.fail_fast):
+                    result.skipped += 1
+                    continue
+                kept.append(m)
+
+        with self.times.stage("serialize"):
+            thread_meta = {
+                "record_type": "thread",
+                "provider_id": self.provider,
+                "conversation_id": cid,
+                "message_count": len(recs),
+            }
+            lines = [codec.dumps(thread_meta) + "\n"]
+            for m in kept:
+                lines.append(
+                    codec.dumps({"record_type": "message", "provider_id": self.provider, **m}) + "\n"
+                )
+            data = "".join(lines).encode("utf-8")
+            result.digest = thread_digest(data)
+        cached = self.cache.get(cid)
+        if cached is not None and cached.get("digest") == result.digest:
+            # same content: keep the file, refresh the entry (e.g. update_time)
+            result.status = "skip"
+            result.stored = {k: cached[k] for k in ("path", "offset", "length") if k in cached}
+        else:
+            result.data = data
+        return result
+
+
+# Per-process state for --jobs N (populated by the pool initializer).
+_WORKER_PROCESSOR: _ThreadProcessor | None = None
+
+
+def _init_worker(provider: str, options: Dict[str, Any]) -> None:
+    global _WORKER_PROCESSOR
+    schema_validator = None
+    if options.get("schema_path") is not None:
+        from .schema_validation import MessageSchemaValidator
+
+        schema_validator = MessageSchemaValidator(options["schema_path"])
+    times = StageTimes() if options.get("timings") else NULL_TIMES
+    if options.get("profile_dir") is not None:
+        import multiprocessing.util
+
+        from .profiling import ProfilingStageTimes, dump_worker_profiles
+
+        times = ProfilingStageTimes(options["profile_dir"], worker=True)
+        # runs when the pool shuts the worker down
+        multiprocessing.util.Finalize(None, dump_worker_profiles, args=(times,), exitpriority=10)
+    _WORKER_PROCESSOR = _ThreadProcessor(
+        provider,
+        manifest_old=options["manifest_old"],
+        dry_run=options["dry_run"],
+        fail_fast=options["fail_fast"],
+        schema_validator=schema_validator,
+        provider_dir=options.get("provider_dir"),
+        times=times,
+        branch=options.get("branch", DEFAULT_BRANCH),
+    )
+
+
+def _process_in_worker(units: list[tuple[Dict[str, Any] | RecordSpan, str]]) -> list[ThreadResult]:
+    assert _WORKER_PROCESSOR is not None, "worker not initialized"
+    results = _WORKER_PROCESSOR.run_batch(units)
+    if _WORKER_PROCESSOR.times.enabled and results:
+        # ship this batch's stage times back with its first result
+        results[0].timings = _WORKER_PROCESSOR.times.drain()
+    return results
+
+
+def _iter_batches(
+    records: Iterable[tuple[Dict[str, Any] | RecordSpan, str, ReadPosition]],
+    size: int,
+) -> Generator[tuple[list[ReadPosition], list[tuple[Dict[str, Any] | RecordSpan, str]]], None, None]:
+    """Group reader output into (positions, units) batches of up to `size`."""
+    it = iter(records)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield [pos for _, _, pos in chunk], [(unit, source) for unit, source, _ in chunk]
+
+
+def _iter_results_serial(
+    records: Iterable[tuple[Dict[str, Any] | RecordSpan, str, ReadPosition]],
+    processor: _ThreadProcessor,
+    batch_size: int,
+) -> Generator[tuple[ReadPosition, tuple[Dict[str, Any] | RecordSpan, str], ThreadResult], None, None]:
+    if processor.adapter.batch_func is None or batch_size <= 1:
+        for unit, source, pos in records:
+            yield pos, (unit, source), processor(unit, source)
+        return
+    for positions, units in _iter_batches(records, batch_size):
+        yield from zip(positions, units, processor.run_batch(units))
+
+
+def _iter_results_parallel(
+    records: Iterable[tuple[Dict[str, Any] | RecordSpan, str, ReadPosition]],
+    *,
+    jobs: int,
+    provider: str,
+    options: Dict[str, Any],
+    max_pending: int,
+    batch_size: int = 1,
+) -> Generator[tuple[ReadPosition, tuple[Dict[str, Any] | RecordSpan, str], ThreadResult], None, None]:
+    """Fan records out to a process pool and yield (position, unit, result) in input order.
+
+    Records travel in batches of `batch_size` (one task and one pickle round
+    trip per batch). `max_pending` bounds the number of submitted-but-
+    unconsumed batches, so a fast reader cannot run ahead of the workers and
+    buffer the whole input.
+    """
+    pool = ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(provider, options),
+    )
+    pending: deque[tuple[list[ReadPosition], list, Future]] = deque()
+
+    def collect(item: tuple[list[ReadPosition], list, Future]):
+        positions, units, fut = item
+        try:
+            results = fut.result()
+        except BrokenProcessPool as e:
+            raise LLPAdapterError(f"worker pool crashed: {e}")
+        except Exception as e:
+            results = [ThreadResult(status="error", error=f"adapter error: {e}")] * len(positions)
+        return zip(positions, units, results)
+
     try:
-        index = manifest_old.get("index", {}).get("threads", [])
-        old = next((t for t in index if t["conversation_id"] == conv_id), None)
-        if not old:
-            return False
-        old_count = old.get("count")
-        new_count = len(msgs)
-        if old_count == new_count:
-            return True
-    except Exception:
-        pass
-    return False
+        for positions, units in _iter_batches(records, batch_size):
+            pending.append((positions, units, pool.submit(_process_in_worker, units)))
+            if len(pending) >= max_pending:
+                yield from collect(pending.popleft())
+        while pending:
+            yield from collect(pending.popleft())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _iter_message_groups(
+    records: Iterable[tuple[Dict[str, Any] | RecordSpan, str, ReadPosition]],
+    thread_field: str,
+    log: logging.Logger,
+    *,
+    buffer_size: int,
+    tmpdir: Path | None,
+    on_invalid: Callable[[str], None],
+) -> Generator[tuple[MessageGroup, str, None], None, None]:
+    """
+    --group-messages: read every message-level record, group them by
+    `thread_field` (external sort, see grouping.py) and yield one unit per
+    thread. There is no read position to resume from, hence None.
+    """
+    grouper = MessageGrouper(buffer_size=buffer_size, tmpdir=tmpdir)
+    try:
+        n = 0
+        for unit, source, _ in records:
+            n += 1
+            try:
+                raw = unit.load() if isinstance(unit, RecordSpan) else unit
+            except ValueError as e:
+                on_invalid(f"skip unreadable message record ({source} #{n}): {e}")
+                continue
+            cid = raw.get(thread_field) if isinstance(raw, dict) else None
+            if not isinstance(cid, str) or not cid:
+                on_invalid(f"skip message record without {thread_field} ({source} #{n})")
+                continue
+            grouper.add(cid, raw, source)
+        if grouper.spilled:
+            log.info(f"grouped {n} message records ({grouper.spilled} spilled to sorted runs)")
+        for group in grouper.groups():
+            yield group, group.source, None
+    finally:
+        grouper.close()
+
+
+def resolve_jobs(jobs: int | None) -> int:
+    """Normalize a --jobs value (<=0 means "all CPUs")."""
+    if jobs is None:
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
 
 
 # ============================================================
-# 5. Main Parser
+# 6. Main Parser
 # ============================================================
 
 def parse_to_jsonl(
     provider: str,
-    input_path: Path,
+    input_path: Path | Sequence[Path],
     outdir: Path,
     *,
     dry_run: bool = False,
@@ -210,161 +1410,364 @@ def parse_to_jsonl(
     progress_interval: int = 100,
     validate_schema: bool = False,
     schema_validator: "MessageSchemaValidator" | None = None,
+    jobs: int = 1,
+    reader: str = "stream",
+    readers: int = 4,
+    resume: bool = False,
+    checkpoint_interval: int = 1000,
+    batch_size: int = 8,
+    layout: str = "dirs",
+    branch: str = DEFAULT_BRANCH,
+    group_messages: bool = False,
+    group_buffer: int = GROUP_BUFFER_RECORDS,
+    run_stats: RunStats | None = None,
 ) -> Dict[str, Any]:
     """
     各プロバイダのエクスポートJSONを解析し、スレッド単位のJSONLファイルを生成する。
     fail_fast=True の場合は一定数エラーで停止。
+    jobs>1 の場合は adapter/検証/シリアライズをプロセスプールで並列実行する
+    (書き込みと manifest 集約はメインプロセスで入力順に行うため出力は serial と同一)。
+    batch_size 件ずつまとめて worker に渡す (adapter が batch 対応なら adapter_batch を使う)。
+    reader="mmap" の場合は JSON 配列を要素のバイト範囲に分割し、デコードも worker 側で行う。
+    input_path に複数ファイルを渡すと最大 readers 本を並行して先読みし、
+    1つの manifest.json に統合する (同じ conversation_id は後勝ち)。
+    dry_run でなければ checkpoint_interval 件ごとに進捗を provider ディレクトリの
+    .parse-checkpoint.jsonl に記録し、resume=True では同じ入力に対する前回の
+    中断位置から再開する (最終的な出力は中断なしの実行と同一)。完了時に削除される。
+    layout="packed" ではスレッドごとのディレクトリを作らず threads.pack に追記し、
+    threads.idx に索引を書く (store.py 参照)。
+    run_stats を渡すとステージ別の時間・件数・スループットを記録する (--stats-json)。
+    branch は分岐 (再生成・編集) の扱い: "merged" は全ノードを時刻順に 1 スレッドへ、
+    "active" は current_node までの経路のみ、"all" は分岐ごとに別スレッド
+    (<cid>~<leaf>) を出力する。adapter が branch_modes で宣言したモードのみ使える。
+    group_messages=True では入力を 1 行 1 メッセージのレコードとみなし、
+    conversation_id ごとに外部ソートでまとめてから adapter_messages に渡す
+    (メモリ上は最大 group_buffer 件、超えた分はソート済みランとしてディスクへ)。
+    全入力を読み終えるまでスレッドが確定しないため resume/checkpoint は使わない。
     """
     log = logger or logging.getLogger("llm_logparser.parser")
-    log.info(f"Starting parse for provider={provider} (dry-run={dry_run}, fail-fast={fail_fast})")
+    jobs = resolve_jobs(jobs)
+    log.info(
+        f"Starting parse for provider={provider} "
+        f"(dry-run={dry_run}, fail-fast={fail_fast}, jobs={jobs})"
+    )
+    log.debug(f"JSON codec: {codec.BACKEND}")
+    if layout not in LAYOUTS:
+        raise LLPWriteError(f"unknown output layout: {layout}")
 
-    adapter_func, manifest, policy = load_adapter(provider)
+    adapter_spec = load_adapter(provider)
+    if branch not in adapter_spec.branch_modes:
+        raise LLPAdapterError(f"provider={provider} does not support --branch {branch}")
+    if group_messages:
+        if adapter_spec.messages_func is None:
+            raise LLPAdapterError(f"provider={provider} does not support message-level records")
+        if branch != DEFAULT_BRANCH:
+            log.warning("--branch has no effect with --group-messages")
+        if resume:
+            log.warning("--resume is not supported with --group-messages; starting from the beginning")
+            resume = False
+    policy = adapter_spec.policy
     provider_dir = outdir / provider
     provider_dir.mkdir(parents=True, exist_ok=True)
     manifest_old = load_manifest_if_exists(provider_dir)
+    if manifest_old and manifest_old.get("branch", DEFAULT_BRANCH) != branch:
+        # threads cut for another branch mode cannot be reused
+        log.info(f"previous output used --branch {manifest_old.get('branch', DEFAULT_BRANCH)}; re-parsing every thread")
+        manifest_old = {}
 
     if validate_schema and schema_validator is None:
         from .schema_validation import MessageSchemaValidator
 
         schema_validator = MessageSchemaValidator()
-    message_validation_error_cls = None
-    if schema_validator:
-        from .schema_validation import MessageValidationError
-
-        message_validation_error_cls = MessageValidationError
 
     errors, skipped, count = 0, 0, 0
     sample_errors: list[str] = []
     stats = {"threads": 0, "messages": 0}
-    manifest_index = []
+    # conversation_id -> entry; a thread seen again in a later file replaces
+    # its entry (and its file on disk) but keeps its first position.
+    manifest_index: Dict[str, Dict[str, Any]] = {}
+    rewritten: set[str] = set()  # conversation_ids whose output this run wrote
 
-    for raw in iter_json_records(input_path, log):
+    input_paths = [input_path] if isinstance(input_path, (str, Path)) else list(input_path)
+    input_paths = [Path(p) for p in input_paths]
+    times = run_stats.times if run_stats is not None else NULL_TIMES
+    if run_stats is not None:
+        run_stats.settings.update(
+            provider=provider, jobs=jobs, reader=reader, layout=layout,
+            batch_size=batch_size, codec=codec.BACKEND, branch=branch,
+        )
+        run_stats.count("input_bytes", sum(p.stat().st_size for p in input_paths if p.is_file()))
+    if len(input_paths) > 1:
+        log.info(f"Reading {len(input_paths)} input files (readers={readers})")
+
+    checkpoint: CheckpointWriter | None = None
+    store: DirectoryStore | PackedStore | None = None
+    start: ReadPosition | None = None
+    if dry_run:
+        if resume:
+            log.warning("--resume has no effect with --dry-run")
+    else:
         try:
-            # adapter may optionally accept source context (e.g., filename)
-            try:
-                try:
-                    params = signature(adapter_func).parameters
-                except Exception:
-                    params = {}
-                if "source" in params:
-                    recs_iter = adapter_func(raw, source=str(input_path))
-                else:
-                    recs_iter = adapter_func(raw)
-            except TypeError:
-                recs_iter = adapter_func(raw)
-
-            recs = list(recs_iter)
-            if not recs:
-                continue
+            header = {
+                "provider": provider,
+                "reader": reader,
+                "layout": layout,
+                "branch": branch,
+                "inputs": input_signature(input_paths),
+            }
+        except FileNotFoundError as e:
+            raise LLPInputError(f"input not found: {e.filename}")
+        checkpoint_path = provider_dir / CHECKPOINT_NAME
+        resumed = load_checkpoint(checkpoint_path, header) if resume else None
+        if resume and resumed is None:
+            log.warning("no checkpoint for these inputs; starting from the beginning")
+        if resumed is not None:
+            start = ReadPosition(*resumed.position)
+            c = resumed.counters
+            errors, skipped, count = c["errors"], c["skipped"], c["count"]
+            stats = {"threads": c["threads"], "messages": c["messages"]}
+            sample_errors = list(c["samples"])
+            manifest_index = {e["conversation_id"]: e for e in resumed.entries}
+            log.info(
+                f"resuming after file #{start.file + 1} record {start.record} "
+                f"({stats['threads']} threads already written)"
+            )
+        try:
+            store = open_store(
+                layout,
+                provider_dir,
+                truncate_to=resumed.counters.get("store_size") if resumed else None,
+            )
+        except OSError as e:
+            raise LLPWriteError(f"write error: {e}")
+        if not group_messages:
+            checkpoint = CheckpointWriter(
+                checkpoint_path,
+                header,
+                interval=checkpoint_interval,
+                resumed=resumed,
+                logger=log,
+                on_save=store.flush,
+            )
 
-            cid = recs[0].get("conversation_id")
-            if not cid:
-                skipped += len(recs)
-                continue
+    def counters() -> Dict[str, Any]:
+        return {
+            **stats,
+            "errors": errors,
+            "skipped": skipped,
+            "count": count,
+            "samples": list(sample_errors),
+            "store_size": store.tell() if store is not None else None,
+        }
 
-            count += len(recs)
-            if count % progress_interval == 0:
-                log.info(f"processed {count} messages...")
+    inputs = iter_input_units(input_paths, log, reader=reader, readers=readers, start=start)
+    records = times.timed_iter("read", inputs)
+    if group_messages:
+        def invalid_message(msg: str) -> None:
+            nonlocal skipped
+            log.warning(msg)
+            skipped += 1
 
-            recs.sort(key=lambda r: (r.get("ts") is None, r.get("ts"), r.get("message_id") or ""))
+        assert adapter_spec.message_thread_field is not None
+        records = times.timed_iter("group", _iter_message_groups(
+            records,
+            adapter_spec.message_thread_field,
+            log,
+            buffer_size=group_buffer,
+            tmpdir=None if dry_run else provider_dir,
+            on_invalid=invalid_message,
+        ))
+    if jobs > 1:
+        results = _iter_results_parallel(
+            records,
+            jobs=jobs,
+            provider=provider,
+            options={
+                "manifest_old": manifest_old,
+                "provider_dir": provider_dir,
+                "dry_run": dry_run,
+                "fail_fast": fail_fast,
+                "schema_path": schema_validator.schema_path if schema_validator else None,
+                "timings": times.enabled,
+                "profile_dir": getattr(times, "profile_dir", None),
+                "branch": branch,
+            },
+            max_pending=jobs * 2,
+            batch_size=batch_size,
+        )
+    else:
+        processor = _ThreadProcessor(
+            provider,
+            manifest_old=manifest_old,
+            dry_run=dry_run,
+            fail_fast=fail_fast,
+            schema_validator=schema_validator,
+            provider_dir=provider_dir,
+            times=times,
+            branch=branch,
+        )
+        results = _iter_results_serial(records, processor, batch_size)
 
-            if should_skip_thread(cid, recs, manifest_old):
-                skipped += 1
-                log.info(f"SKIP thread {cid} (unchanged)")
-                continue
+    def record_error(msg: str) -> None:
+        nonlocal errors
+        log.warning(msg)
+        errors += 1
+        if len(sample_errors) < 5:
+            sample_errors.append(msg)
+        if fail_fast and errors > 3:
+            raise LLPAdapterError(f"too many adapter errors ({errors})")
+
+    def handle(res: ThreadResult) -> None:
+        nonlocal skipped
+        if run_stats is not None:
+            run_stats.count("records")
+            if res.timings:
+                times.merge(res.timings)
+        if res.status == "error":
+            for w in res.warnings:
+                log.warning(w)
+            skipped += res.skipped
+            record_error(res.error or "adapter error")
+            return
+        try:
+            handle_thread(res, [v.cid for v in res.variants])
+            for v in res.variants:
+                handle_thread(v)
+        except Exception as e:
+            record_error(f"adapter error: {e}")
 
-            ts_values = [m.get("ts") for m in recs if isinstance(m.get("ts"), (int, float))]
-            ts_min = min(ts_values) if ts_values else None
-            ts_max = max(ts_values) if ts_values else None
+    def handle_thread(res: ThreadResult, variants: list[str] | None = None) -> None:
+        nonlocal skipped, count
+        for w in res.warnings:
+            log.warning(w)
+        skipped += res.skipped
+        if res.status in ("empty", "no_cid", "invalid"):
+            return
 
-            outdir_thread = provider_dir / f"thread-{cid}"
-            outdir_thread.mkdir(parents=True, exist_ok=True)
-            outpath = outdir_thread / "parsed.jsonl"
+        cid = res.cid
+        count += res.count
+        if count % progress_interval == 0:
+            log.info(f"processed {count} messages...")
 
-            if not dry_run:
-                tmp = outpath.with_suffix(".tmp")
+        if res.status == "skip":
+            skipped += 1
+            log.info(f"SKIP thread {cid} (unchanged)")
+            stored = res.stored or {"path": thread_relpath(cid)}
+        else:
+            stored = {"path": thread_relpath(cid)}
+            if store is not None:
                 try:
-                    with tmp.open("w", encoding="utf-8") as f:
-                        thread_meta = {
-                            "record_type": "thread",
-                            "provider_id": provider,
-                            "conversation_id": cid,
-                            "message_count": len(recs),
-                        }
-                        f.write(json.dumps(thread_meta, ensure_ascii=True) + "\n")
-                        for m in recs:
-                            if schema_validator:
-                                try:
-                                    schema_validator.validate_message(m)
-                                except message_validation_error_cls as verr:
-                                    idx = m.get("message_id") or "<unknown>"
-                                    log.warning(
-                                        f"schema validation failed for "
-                                        f"{cid}/{idx}: {verr}"
-                                    )
-                                    skipped += 1
-                                    if fail_fast:
-                                        raise LLPAdapterError(
-                                            "message schema validation failed"
-                                        ) from verr
-                                    continue
-
-                            if not validate_message(m, fail_fast=fail_fast):
-                                skipped += 1
-                                continue
-                            f.write(
-                                json.dumps(
-                                    {"record_type": "message", "provider_id": provider, **m},
-                                    ensure_ascii=True,
-                                )
-                                + "\n"
-                            )
+                    with times.stage("write"):
+                        stored = store.write(cid, res.data)
                 except Exception as e:
                     raise LLPWriteError(f"write error: {e}")
-                tmp.replace(outpath)
+            if run_stats is not None:
+                run_stats.count("output_bytes", len(res.data))
+                run_stats.thread("parsed", cid, res.count, len(res.data))
 
+            if cid in rewritten:
+                # a later file replaces a thread already counted in this run
+                stats["threads"] -= 1
+                stats["messages"] -= manifest_index[cid]["count"]
+            rewritten.add(cid)
             stats["threads"] += 1
-            stats["messages"] += len(recs)
-
-            manifest_index.append(
-                {
-                    "conversation_id": cid,
-                    "path": f"thread-{cid}/parsed.jsonl",
-                    "count": len(recs),
-                    "ts_min": ts_min,
-                    "ts_max": ts_max,
-                }
+            stats["messages"] += res.count
+
+        # skipped threads are carried forward so the next run still knows them
+        manifest_index[cid] = {
+            "conversation_id": cid,
+            **stored,
+            "count": res.count,
+            "ts_min": res.ts_min,
+            "ts_max": res.ts_max,
+            "update_time": res.update_time,
+            "digest": res.digest,
+        }
+        if variants:
+            # --branch all: the record's other branches (see _ThreadProcessor._precheck)
+            manifest_index[cid]["variants"] = variants
+        if checkpoint is not None:
+            checkpoint.entry(manifest_index[cid])
+
+    # A later record of a thread already written in this run may still be
+    # judged "skip" against the previous manifest, although the file now holds
+    # the earlier record; such a record is parsed again without the cache so
+    # the later file wins, as on a cold run.
+    reparser: _ThreadProcessor | None = None
+
+    def reparse(unit: Dict[str, Any] | RecordSpan | MessageGroup, source: str) -> ThreadResult:
+        nonlocal reparser
+        if reparser is None:
+            reparser = _ThreadProcessor(
+                provider,
+                manifest_old={},
+                dry_run=dry_run,
+                fail_fast=fail_fast,
+                schema_validator=schema_validator,
+                times=times,
+                branch=branch,
             )
-        except Exception as e:
-            msg = f"adapter error: {e}"
-            log.warning(msg)
-            errors += 1
-            if len(sample_errors) < 5:
-                sample_errors.append(msg)
-            if fail_fast and errors > 3:
-                raise LLPAdapterError(f"too many adapter errors ({errors})")
+        return reparser(unit, source)
+
+    # The last position whose result is fully handled, with matching counters.
+    done: tuple[ReadPosition, Dict[str, Any]] | None = None
+    try:
+        for pos, (unit, source), res in results:
+            if any(r.status == "skip" and r.cid in rewritten for r in (res, *res.variants)):
+                res = reparse(unit, source)
+            handle(res)
+            if checkpoint is not None:
+                done = (pos, counters())
+                checkpoint.advance(done[0].to_list(), done[1])
+    except BaseException:
+        if checkpoint is not None:
+            if done is not None:
+                checkpoint.save(done[0].to_list(), done[1])
+            checkpoint.close()
+        if store is not None:
+            store.close()
+        raise
+    finally:
+        # inputs are mapped lazily while the results are read: stop the
+        # workers and the prefetch readers before the maps are closed
+        results.close()
+        inputs.close()
+        release_maps()
+
+    if store is not None:
+        with times.stage("write"):
+            store.close(manifest_index.values())
 
     # manifest出力
     if not dry_run:
         manifest_path = provider_dir / "manifest.json"
         manifest_obj = {
-            "schema_version": "1.3",
+            "schema_version": "1.4",
             "provider": provider,
             "policy": policy,
+            **({"branch": branch} if branch != DEFAULT_BRANCH else {}),
             "exported_at": datetime.utcnow().isoformat(),
-            "index": {"threads": manifest_index},
+            "index": {"threads": list(manifest_index.values())},
         }
-        manifest_path.write_text(json.dumps(manifest_obj, ensure_ascii=True, indent=2), encoding="utf-8")
+        with times.stage("write"):
+            manifest_path.write_text(json.dumps(manifest_obj, ensure_ascii=True, indent=2), encoding="utf-8")
         log.info(f"manifest saved: {manifest_path}")
+    if checkpoint is not None:
+        checkpoint.finish()
 
     log.info(
         f"SUMMARY: threads={stats['threads']} messages={stats['messages']} errors={errors} skipped={skipped}"
     )
+    if run_stats is not None:
+        run_stats.count("threads", stats["threads"])
+        run_stats.count("messages", stats["messages"])
+        run_stats.count("errors", errors)
+        run_stats.count("skipped", skipped)
     return {**stats, "errors": errors, "skipped": skipped, "samples": sample_errors}
 
 
 # ============================================================
-# 6. CLI Entry (Debug Only)
+# 7. CLI Entry (Debug Only)
 # ============================================================
 
 if __name__ == "__main__":
@@ -375,11 +1778,18 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Parse LLM export logs to JSONL (final robust version)")
     parser.add_argument("--provider", required=True)
-    parser.add_argument("--input", required=True, type=Path)
+    parser.add_argument("--input", required=True, type=Path, nargs="+")
     parser.add_argument("--outdir", type=Path, default=Path("artifacts/output"))
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--fail-fast", action="store_true")
     parser.add_argument("--progress-interval", type=int, default=100)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--reader", choices=READER_MODES, default="stream")
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--layout", choices=LAYOUTS, default="dirs")
+    parser.add_argument("--branch", choices=BRANCH_MODES, default=DEFAULT_BRANCH)
+    parser.add_argument("--group-messages", action="store_true")
+    parser.add_argument("--group-buffer", type=int, default=GROUP_BUFFER_RECORDS)
 
     args = parser.parse_args()
 
@@ -390,4 +1800,11 @@ if __name__ == "__main__":
         dry_run=args.dry_run,
         fail_fast=args.fail_fast,
         progress_interval=args.progress_interval,
+        jobs=args.jobs,
+        reader=args.reader,
+        resume=args.resume,
+        layout=args.layout,
+        branch=args.branch,
+        group_messages=args.group_messages,
+        group_buffer=args.group_buffer,
     )
@@ -0,0 +1,178 @@
+# src/llm_logparser/core/profiling.py
+"""
+Built-in profiling (`--profile DIR`).
+
+ProfilingStageTimes is a StageTimes that also runs one cProfile.Profile per
+stage (read, adapter, validate, serialize, write for parse; export for the
+Markdown exporter), so hot code is attributed to the stage that ran it.
+Only the thread that runs a stage is profiled; with several inputs the
+prefetch reader threads are not covered.
+
+With --jobs N every worker process profiles its own stages and dumps
+`<stage>.worker-<pid>.pstats` when it exits; write_report() merges those
+into `<stage>.pstats` next to the main process's data.
+
+With memory tracing (--profile-memory), tracemalloc runs in the main
+process and a snapshot is kept whenever traced memory reaches a new high at
+a stage boundary; the top allocation sites of that snapshot are written to
+`memory-<phase>.txt`.
+
+Output in DIR: `<stage>.pstats` (load with pstats / snakeviz) and
+`summary.txt` (top N functions per stage by own time).
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from .runstats import StageTimes
+
+T = TypeVar("T")
+
+# Take a new memory snapshot only when traced memory grew this much (and at
+# most every MEMORY_SNAPSHOT_INTERVAL seconds): snapshots are expensive.
+MEMORY_SNAPSHOT_GROWTH = 1.10
+MEMORY_SNAPSHOT_INTERVAL = 1.0
+MEMORY_TRACE_FRAMES = 8
+
+
+class ProfilingStageTimes(StageTimes):
+    """StageTimes plus a cProfile.Profile per stage (and optional tracemalloc)."""
+
+    def __init__(self, profile_dir: Path, *, memory: bool = False, worker: bool = False):
+        super().__init__()
+        self.profile_dir = profile_dir
+        self.memory = memory and not worker
+        self.worker = worker
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self._active = False
+        self._peak: Optional[tracemalloc.Snapshot] = None
+        self._peak_size = 0
+        self._last_snapshot = 0.0
+        self._started_tracing = self.memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(MEMORY_TRACE_FRAMES)
+
+    def _profile(self, name: str) -> cProfile.Profile:
+        prof = self.profiles.get(name)
+        if prof is None:
+            prof = self.profiles[name] = cProfile.Profile()
+        return prof
+
+    @contextmanager
+    def profiled(self, name: str) -> Iterator[None]:
+        if self._active:
+            # only one profiler can run at a time; the outer stage keeps it
+            yield
+            return
+        prof = self._profile(name)
+        self._active = True
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            self._active = False
+            self._check_memory()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        with self.profiled(name), super().stage(name):
+            yield
+
+    def timed_iter(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        it = iter(items)
+        while True:
+            with self.profiled(name), super().stage(name):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    def _check_memory(self) -> None:
+        if not self.memory:
+            return
+        current, _ = tracemalloc.get_traced_memory()
+        now = time.monotonic()
+        if current <= self._peak_size * MEMORY_SNAPSHOT_GROWTH:
+            return
+        if self._peak is not None and now - self._last_snapshot < MEMORY_SNAPSHOT_INTERVAL:
+            return
+        self._peak = tracemalloc.take_snapshot()
+        self._peak_size = current
+        self._last_snapshot = time.monotonic()
+
+    def dump(self) -> List[Path]:
+        """Write this process's raw profiles (`<stage>.main.pstats` / `<stage>.worker-<pid>.pstats`)."""
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        suffix = f".worker-{os.getpid()}" if self.worker else ".main"
+        out = []
+        for name, prof in self.profiles.items():
+            path = self.profile_dir / f"{name}{suffix}.pstats"
+            prof.dump_stats(str(path))
+            out.append(path)
+        return out
+
+    def memory_report(self, phase: str, top: int) -> Optional[Path]:
+        """Write the top allocation sites at this phase's memory high point."""
+        if not self.memory:
+            return None
+        self._check_memory()
+        snapshot = self._peak or tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"phase: {phase}",
+            f"traced memory: current={current} peak={peak} snapshot={self._peak_size}",
+            f"top {top} allocation sites at the snapshot (by size):",
+            "",
+        ]
+        for stat in snapshot.statistics("lineno")[:top]:
+            lines.append(str(stat))
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profile_dir / f"memory-{phase}.txt"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        # the next phase starts from a clean slate
+        self._peak, self._peak_size = None, 0
+        tracemalloc.reset_peak()
+        return path
+
+    def write_report(self, top: int) -> Path:
+        """
+        Merge this process's and the workers' profiles into `<stage>.pstats`
+        and write `summary.txt` (top N functions per stage by own time).
+        """
+        self.dump()
+        stages: Dict[str, List[Path]] = {}
+        for path in sorted(self.profile_dir.glob("*.pstats")):
+            name, _, rest = path.name.partition(".")
+            if rest.startswith(("main.", "worker-")):
+                stages.setdefault(name, []).append(path)
+
+        summary = io.StringIO()
+        for name, parts in stages.items():
+            stats = pstats.Stats(*map(str, parts), stream=summary)
+            stats.dump_stats(str(self.profile_dir / f"{name}.pstats"))
+            for p in parts:
+                p.unlink()
+            summary.write(f"==== stage: {name} ({len(parts)} process(es)) ====\n")
+            stats.sort_stats("tottime").print_stats(top)
+        path = self.profile_dir / "summary.txt"
+        path.write_text(summary.getvalue(), encoding="utf-8")
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return path
+
+
+def dump_worker_profiles(times: StageTimes) -> None:
+    """multiprocessing finalizer for pool workers (see parser._init_worker)."""
+    if isinstance(times, ProfilingStageTimes):
+        times.dump()
@@ -1,15 +1,21 @@
-from importlib import import_module
 from typing import Callable, Any, Dict, Iterable
 
+from .registry import ProviderInfo, ProviderRegistry, UnknownProviderError, default_registry
+
+__all__ = ["ProviderInfo", "ProviderRegistry", "UnknownProviderError", "default_registry", "get_provider"]
+
 def get_provider(name: str) -> Callable[[Dict[str, Any]], Iterable[Dict[str, Any]]]:
     """
-    providers.<name>.adapter から adapter/get_adapter を取得して返す。
-    ここでは動的importのみ（レガシー互換なし）。
+    provider registry (組み込み / entry point / providers.<name>.adapter) から
+    adapter/get_adapter を取得して返す。モジュールは選択時にだけ import する。
     """
     key = (name or "openai").lower()
-    mod = import_module(f"{__name__}.{key}.adapter")
+    try:
+        mod = default_registry().import_module(key)
+    except UnknownProviderError as e:
+        raise ValueError(str(e)) from None
     if hasattr(mod, "get_adapter"):
         return mod.get_adapter()
     if hasattr(mod, "adapter"):
         return mod.adapter
-    raise ValueError(f"Provider '{name}' has no adapter or get_adapter()")
\ No newline at end of file
+    raise ValueError(f"Provider '{name}' has no adapter or get_adapter()")
@@ -1,12 +1,21 @@
 # src/llm_logparser/providers/openai/adapter.py
 from __future__ import annotations
 import typing as t
-from collections import defaultdict, deque
+from datetime import datetime, timezone
 from hashlib import sha1
 from pathlib import Path
 
+from .nodetable import NodeTable
 from .utils import json_safe
 
+# merged: every node of the mapping, interleaved by create_time (default)
+# active: only the path from the root to current_node
+# all:    one thread per branch; branches other than the active one get the
+#         conversation id "<cid>~<leaf node id>"
+BRANCH_MODES = ("merged", "active", "all")
+VARIANT_SEPARATOR = "~"
+# message-level records (one message per line) carry their thread id here
+MESSAGE_THREAD_FIELD = "conversation_id"
 
 # ============================================================
 #  Manifest & Policy
@@ -20,6 +29,15 @@ def get_manifest() -> dict:
         "description": "Improved adapter with structural correction and linearization.",
         "expected_top_keys": ["mapping", "id", "create_time", "update_time"],
         "id_fields": ["conversation_id", "message_id"],
+        "adapter": {
+            "protocol": 1,
+            "accepts_source": True,
+            "batch": True,
+            "thread_id_fields": ["conversation_id", "id", "uuid"],
+            "update_time_field": "update_time",
+            "branch_modes": list(BRANCH_MODES),
+            "message_records": {"thread_id_field": MESSAGE_THREAD_FIELD},
+        },
     }
 
 
@@ -34,113 +52,6 @@ def get_policy() -> dict:
     }
 
 
-# ============================================================
-#  Helper: Extract nodes from mapping
-# ============================================================
-
-def _extract_nodes(mapping: dict) -> dict[str, dict]:
-    """extract node_id → node_info safely.
-
-    Note: includes structural nodes (message is None) to preserve graph order.
-    """
-    nodes = {}
-    for node_id, node in mapping.items():
-        if not isinstance(node, dict):
-            continue
-        nodes[node_id] = node
-
-    return nodes
-
-
-# ============================================================
-#  Helper: Build graph based on parent-child relation
-# ============================================================
-
-def _build_graph(nodes: dict[str, dict]):
-    """Construct parent → children adjacency graph."""
-    parents = {}
-    children_map = defaultdict(list)
-
-    for node_id, node in nodes.items():
-        parent = node.get("parent")
-        parents[node_id] = parent
-        for child_id in node.get("children") or []:
-            if isinstance(child_id, str) and child_id in nodes:
-                children_map[node_id].append(child_id)
-
-    # Fallback: parent pointers (when children are missing)
-    if not children_map:
-        for node_id, parent in parents.items():
-            if parent and parent in nodes:
-                children_map[parent].append(node_id)
-
-    return parents, children_map
-
-
-# ============================================================
-#  Helper: Determine root nodes
-# ============================================================
-
-def _find_roots(nodes: dict[str, dict], parents: dict[str, str | None]):
-    """Find valid root nodes (no valid parent)."""
-    roots = []
-
-    for nid in nodes:
-        p = parents.get(nid)
-        if not p or p not in nodes:
-            roots.append(nid)
-
-    return roots
-
-
-# ============================================================
-#  Helper: Linearize graph
-# ============================================================
-
-def _linearize(nodes, parents, children_map):
-    """
-    Parent-first traversal (BFS) with timestamp secondary ordering.
-    """
-    roots = _find_roots(nodes, parents)
-    roots.sort(
-        key=lambda rid: (
-            (nodes[rid].get("message") or {}).get("create_time") is None,
-            (nodes[rid].get("message") or {}).get("create_time"),
-            rid,
-        )
-    )
-
-    # BFS queue
-    queue = deque(roots)
-    order: list[str] = []
-    seen = set()
-
-    while queue:
-        nid = queue.popleft()
-        if nid in seen:
-            continue
-        seen.add(nid)
-        order.append(nid)
-
-        # sort children by timestamp fallback
-        kids = children_map.get(nid, [])
-        kids.sort(
-            key=lambda cid: (
-                (nodes[cid].get("message") or {}).get("create_time") is None,
-                (nodes[cid].get("message") or {}).get("create_time"),
-                cid,
-            )
-        )
-        queue.extend(kids)
-
-    # fallback: nodes not reached by BFS (rare)
-    for nid in nodes:
-        if nid not in seen:
-            order.append(nid)
-
-    return order
-
-
 # ============================================================
 #  Main Adapter
 # ============================================================
@@ -172,71 +83,223 @@ def _to_epoch_ms(value: t.Any) -> int | None:
         return None
 
 
-def adapter(conversation: dict, *, source: str | None = None) -> list[dict]:
+def _to_message(conv_id: str, node_id: str, node: dict) -> dict | None:
+    """One mapping node -> normalized message (None for structural / unusable nodes)."""
+    msg = node.get("message")
+    if msg is None:
+        # structural node (UI-only)
+        return None
+    if not isinstance(msg, dict):
+        return None
+
+    author = msg.get("author") or {}
+    role = author.get("role") or msg.get("role") or "unknown"
+    if not isinstance(role, str) or not role:
+        role = "unknown"
+
+    content = msg.get("content") or {}
+    if not isinstance(content, dict):
+        content = {}
+    content_type = content.get("content_type") if isinstance(content.get("content_type"), str) else "text"
+    raw_parts = content.get("parts")
+    if isinstance(raw_parts, list):
+        parts = [str(p) for p in raw_parts if isinstance(p, str)]
+    else:
+        parts = []
+
+    ts = _to_epoch_ms(msg.get("create_time") or node.get("create_time"))
+    if ts is None:
+        # create_time is required for stable ordering in normalized schema
+        return None
+
+    text = "\n".join(parts)
+
+    message_id = msg.get("id") or node_id
+    if not isinstance(message_id, str):
+        message_id = json_safe(message_id)
+
+    # Every field is built from str/int values above, so the entry is
+    # JSON-safe without a recursive json_safe copy (the parser's readers
+    # also decode numbers as float, never Decimal).
+    return {
+        "conversation_id": conv_id,
+        "message_id": message_id,
+        "parent_id": node.get("parent") if isinstance(node.get("parent"), str) else None,
+        "role": role,
+        "ts": ts,  # epoch milliseconds
+        "content": {"content_type": content_type, "parts": parts},
+        "text": text,
+    }
+
+
+def _message_order(m: dict):
+    return (m.get("ts") is None, m.get("ts"), m.get("message_id") or "")
+
+
+# ============================================================
+#  Helper: Branch selection (--branch active / all)
+# ============================================================
+
+def _path_to(mapping: dict, node_id: str) -> list[str]:
+    """Node ids from the root down to node_id, following parent pointers (O(depth))."""
+    path: list[str] = []
+    seen = set()
+    nid: t.Any = node_id
+    while isinstance(nid, str) and nid not in seen:
+        node = mapping.get(nid)
+        if not isinstance(node, dict):
+            break
+        seen.add(nid)
+        path.append(nid)
+        nid = node.get("parent")
+    path.reverse()
+    return path
+
+
+def _active_leaf(conversation: dict, mapping: dict) -> str | None:
+    """current_node, or (when it is missing or dangling) the most recent message's node."""
+    current = conversation.get("current_node")
+    if isinstance(current, str) and isinstance(mapping.get(current), dict):
+        return current
+    best, best_key = None, None
+    for nid, node in mapping.items():
+        msg = node.get("message") if isinstance(node, dict) else None
+        ts = _to_epoch_ms(msg.get("create_time")) if isinstance(msg, dict) else None
+        if ts is not None and (best_key is None or (ts, nid) > best_key):
+            best, best_key = nid, (ts, nid)
+    return best
+
+
+def _iter_branches(conversation: dict, conv_id: str, mapping: dict) -> t.Iterator[dict]:
+    """
+    --branch all: the active branch as conv_id, then every other leaf's
+    branch as "<conv_id>~<leaf>", one after the other. Branches are built on
+    demand; a node's message is normalized once and shared between branches.
+    """
+    table = NodeTable(mapping)
+    if not len(table):
+        return
+    ids, nodes = table.ids, table.nodes
+    built: dict[int, dict | None] = {}
+
+    def branch(path: list[int], cid: str) -> list[dict]:
+        out = []
+        for i in path:
+            if i not in built:
+                built[i] = _to_message(conv_id, ids[i], nodes[i])
+            m = built[i]
+            if m is not None:
+                out.append(m if cid == conv_id else {**m, "conversation_id": cid})
+        out.sort(key=_message_order)
+        return out
+
+    leaf = _active_leaf(conversation, mapping)
+    active = ids.index(leaf) if leaf is not None else -1
+    if active >= 0:
+        yield from branch(table.path_to(active), conv_id)
+    for i in table.linearize():
+        if i != active and table.is_leaf(i):
+            yield from branch(table.path_to(i), f"{conv_id}{VARIANT_SEPARATOR}{ids[i]}")
+
+
+def adapter(conversation: dict, *, source: str | None = None, branch: str = "merged") -> t.Iterable[dict]:
+    """
+    Normalized messages of one conversation, ordered by ts.
+    branch="all" returns a generator that yields the branches one at a time.
+    """
+    if branch not in BRANCH_MODES:
+        raise ValueError(f"unknown branch mode: {branch}")
     conv_id = _derive_conversation_id(conversation, source=source)
 
     mapping = conversation.get("mapping")
     if not isinstance(mapping, dict):
         return []
 
-    # ---- extract valid nodes ----
-    nodes = _extract_nodes(mapping)
-
-    if not nodes:
-        return []
+    if branch == "all":
+        return _iter_branches(conversation, conv_id, mapping)
 
-    # ---- build graph ----
-    parents, children_map = _build_graph(nodes)
+    if branch == "active":
+        leaf = _active_leaf(conversation, mapping)
+        node_ids = _path_to(mapping, leaf) if leaf is not None else []
+        path = [(nid, mapping[nid]) for nid in node_ids]
+    else:
+        # ---- node table (includes structural nodes to preserve graph order) ----
+        table = NodeTable(mapping)
+        if not len(table):
+            return []
 
-    # ---- linearize ----
-    order = _linearize(nodes, parents, children_map)
+        # ---- linearize ----
+        ids, nodes = table.ids, table.nodes
+        path = [(ids[i], nodes[i]) for i in table.linearize()]
 
     # ---- build final messages ----
     out: list[dict] = []
-    for node_id in order:
-        node = nodes[node_id]
-        msg = node.get("message")
-        if msg is None:
-            # structural node (UI-only)
-            continue
-        if not isinstance(msg, dict):
-            continue
+    for node_id, node in path:
+        entry = _to_message(conv_id, node_id, node)
+        if entry is not None:
+            out.append(entry)
 
-        author = msg.get("author") or {}
-        role = author.get("role") or msg.get("role") or "unknown"
-        if not isinstance(role, str) or not role:
-            role = "unknown"
-
-        content = msg.get("content") or {}
-        if not isinstance(content, dict):
-            content = {}
-        content_type = content.get("content_type") if isinstance(content.get("content_type"), str) else "text"
-        raw_parts = content.get("parts")
-        if isinstance(raw_parts, list):
-            parts = [str(p) for p in raw_parts if isinstance(p, str)]
-        else:
-            parts = []
-
-        ts = _to_epoch_ms(msg.get("create_time") or node.get("create_time"))
-        if ts is None:
-            # create_time is required for stable ordering in normalized schema
-            continue
+    out.sort(key=_message_order)
+    return out
 
-        text = "\n".join(parts)
 
-        entry = {
-            "conversation_id": conv_id,
-            "message_id": msg.get("id") or node_id,
-            "parent_id": node.get("parent") if isinstance(node.get("parent"), str) else None,
-            "role": role,
-            "ts": ts,  # epoch milliseconds
-            "content": {"content_type": content_type, "parts": parts},
-            "text": text,
-        }
+def adapter_batch(
+    conversations: t.Sequence[dict], *, source: str | None = None, branch: str = "merged"
+) -> list[list[dict]]:
+    """Batch entry point: one message list per conversation, in input order."""
+    return [adapter(conv, source=source, branch=branch) for conv in conversations]
+
 
-        out.append(json_safe(entry))
+def _record_epoch_seconds(value: t.Any) -> t.Any:
+    """Epoch seconds from a number or an ISO-8601 string (message-level records)."""
+    if not isinstance(value, str):
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def adapter_messages(records: t.Sequence[dict], *, source: str | None = None) -> list[dict]:
+    """
+    Message-level records of one conversation (one message per JSONL line,
+    regrouped by parse --group-messages) -> normalized messages.
+    content may be a plain string or {"content_type", "parts"}; create_time
+    may be epoch seconds or ISO-8601.
+    """
+    if not records:
+        return []
+    conv_id = records[0].get(MESSAGE_THREAD_FIELD)
+    if not isinstance(conv_id, str) or not conv_id:
+        conv_id = _derive_conversation_id({}, source=source)
+
+    out: list[dict] = []
+    for seq, rec in enumerate(records):
+        if not isinstance(rec, dict):
+            continue
+        message_id = rec.get("message_id") or rec.get("id") or f"{conv_id}-{seq}"
+        content = rec.get("content")
+        if isinstance(content, str):
+            content = {"content_type": "text", "parts": [content]}
+        msg = {
+            **rec,
+            "id": message_id,
+            "content": content,
+            "create_time": _record_epoch_seconds(rec.get("create_time")),
+        }
+        parent = rec.get("parent_id", rec.get("parent"))
+        entry = _to_message(conv_id, message_id, {"message": msg, "parent": parent})
+        if entry is not None:
+            out.append(entry)
 
-    out.sort(key=lambda m: (m.get("ts") is None, m.get("ts"), m.get("message_id") or ""))
+    out.sort(key=_message_order)
     return out
 
 
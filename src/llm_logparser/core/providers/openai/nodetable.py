@@ -0,0 +1,150 @@
+# src/llm_logparser/core/providers/openai/nodetable.py
+"""
+Compact, array-backed view of one conversation's `mapping`.
+
+Node ids are interned to ints in mapping order. Parent links and
+create_time live in `array` columns, and children are stored CSR-style: the
+children of node i are child_index[child_start[i]:child_start[i + 1]].
+Linearization then sorts and walks ints instead of re-reading node dicts on
+every comparison.
+
+Node dicts are kept by reference (`nodes`), so message text is never copied;
+the table only adds a few machine words per node.
+"""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+
+_NONE = -1
+
+
+def _as_float(value) -> float | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class NodeTable:
+    """Columns for one mapping; node i is ids[i] / nodes[i]."""
+
+    __slots__ = ("ids", "nodes", "parent", "ts", "has_ts", "child_start", "child_index")
+
+    def __init__(self, mapping: dict):
+        ids: list[str] = []
+        nodes: list[dict] = []
+        for node_id, node in mapping.items():
+            if isinstance(node, dict):
+                ids.append(node_id)
+                nodes.append(node)
+        index = {node_id: i for i, node_id in enumerate(ids)}
+        n = len(ids)
+
+        parents = [_NONE] * n
+        ts = [0.0] * n
+        has_ts = bytearray(n)
+        starts = [0] * (n + 1)
+        kids: list[int] = []
+        index_get, add_kid = index.get, kids.append
+        for i, node in enumerate(nodes):
+            p = node.get("parent")
+            if isinstance(p, str):
+                parents[i] = index_get(p, _NONE)
+            msg = node.get("message")
+            if isinstance(msg, dict):
+                ct = msg.get("create_time")
+                if type(ct) is not float:
+                    ct = _as_float(ct)
+                if ct is not None:
+                    ts[i] = ct
+                    has_ts[i] = 1
+            children = node.get("children")
+            if children:
+                for child in children:
+                    if isinstance(child, str):
+                        j = index_get(child)
+                        if j is not None:
+                            add_kid(j)
+            starts[i + 1] = len(kids)
+        parent = array("q", parents)
+        child_start = array("q", starts)
+        child_index = array("q", kids)
+
+        if not child_index:
+            # no usable children lists: derive them from parent pointers
+            counts = [0] * (n + 1)
+            for i in range(n):
+                if parent[i] != _NONE:
+                    counts[parent[i] + 1] += 1
+            for i in range(n):
+                counts[i + 1] += counts[i]
+            child_start = array("q", counts)
+            child_index = array("q", [0]) * counts[n]
+            fill = counts[:n]
+            for i in range(n):
+                p = parent[i]
+                if p != _NONE:
+                    child_index[fill[p]] = i
+                    fill[p] += 1
+
+        self.ids = ids
+        self.nodes = nodes
+        self.parent = parent
+        self.ts = array("d", ts)
+        self.has_ts = has_ts
+        self.child_start = child_start
+        self.child_index = child_index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def is_leaf(self, i: int) -> bool:
+        return self.child_start[i] == self.child_start[i + 1]
+
+    def _key(self, i: int) -> tuple:
+        # nodes without create_time last, then by time, then by id
+        return (not self.has_ts[i], self.ts[i], self.ids[i])
+
+    def linearize(self) -> list[int]:
+        """
+        Parent-first traversal (BFS) with timestamp secondary ordering;
+        nodes the traversal does not reach follow in mapping order.
+        """
+        parent = self.parent
+        key = self._key
+        roots = [i for i in range(len(self.ids)) if parent[i] == _NONE]
+        roots.sort(key=key)
+
+        queue = deque(roots)
+        order: list[int] = []
+        seen = bytearray(len(self.ids))
+        start, index = self.child_start, self.child_index
+        while queue:
+            i = queue.popleft()
+            if seen[i]:
+                continue
+            seen[i] = 1
+            order.append(i)
+            lo, hi = start[i], start[i + 1]
+            if hi - lo == 1:
+                queue.append(index[lo])
+            elif hi > lo:
+                queue.extend(sorted(index[lo:hi], key=key))
+
+        if len(order) < len(self.ids):
+            order.extend(i for i in range(len(self.ids)) if not seen[i])
+        return order
+
+    def path_to(self, i: int) -> list[int]:
+        """Node numbers from the root down to i, following parent links (O(depth))."""
+        path: list[int] = []
+        seen = set()
+        while i != _NONE and i not in seen:
+            seen.add(i)
+            path.append(i)
+            i = self.parent[i]
+        path.reverse()
+        return path
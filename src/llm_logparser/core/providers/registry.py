@@ -0,0 +1,239 @@
+# src/llm_logparser/core/providers/registry.py
+"""
+Provider registry: which adapters exist, without importing them.
+
+Providers come from two places:
+
+- the built-in table below (shipped with this package), and
+- the `llm_logparser.providers` entry point group, so third-party packages
+  can register adapters without living inside this one:
+
+      [project.entry-points."llm_logparser.providers"]
+      mytool = "mytool_llp.adapter"
+
+  The value names the adapter module; it follows the same protocol as the
+  built-in ones (get_adapter(), optional get_manifest() / get_policy()).
+
+Listing providers only reads entry point metadata. Nothing is imported until
+a provider is selected (import_module). The id, input formats and
+capabilities of plugin providers are taken from their manifest the first
+time they are loaded and cached in `<cache dir>/providers.json`, keyed by
+module and distribution version, so later listings can show them without
+importing anything.
+
+Ids that are neither built in nor registered fall back to the in-package
+module `llm_logparser.core.providers.<id>.adapter`.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass, replace
+from importlib import import_module
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, Optional
+
+ENTRY_POINT_GROUP = "llm_logparser.providers"
+CACHE_ENV = "LLM_LOGPARSER_CACHE_DIR"
+CACHE_NAME = "providers.json"
+CACHE_VERSION = 1
+PACKAGE_PREFIX = "llm_logparser.core.providers"
+
+
+class UnknownProviderError(LookupError):
+    """No built-in, registered or in-package adapter for the given id."""
+
+
+@dataclass(frozen=True)
+class ProviderInfo:
+    """What is known about a provider before its adapter is imported."""
+    id: str
+    module: str
+    origin: str = "builtin"  # "builtin", "package" or "<distribution> <version>"
+    input_formats: tuple[str, ...] = ()
+    capabilities: tuple[str, ...] = ()
+    described: bool = True  # False until the manifest has been read once
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "module": self.module,
+            "origin": self.origin,
+            "input_formats": list(self.input_formats),
+            "capabilities": list(self.capabilities),
+            "described": self.described,
+        }
+
+
+def describe_manifest(manifest: Dict[str, Any]) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """(input_formats, capabilities) from an adapter's get_manifest()."""
+    formats = manifest.get("input_formats") or manifest.get("input_format") or ()
+    if isinstance(formats, str):
+        formats = (formats,)
+    declared = manifest.get("adapter")
+    declared = declared if isinstance(declared, dict) else {}
+    caps = []
+    if declared.get("batch"):
+        caps.append("batch")
+    if declared.get("update_time_field"):
+        caps.append("incremental")
+    if len(declared.get("branch_modes") or ()) > 1:
+        caps.append("branches")
+    if isinstance(declared.get("message_records"), dict):
+        caps.append("message-records")
+    return tuple(str(f) for f in formats), tuple(caps)
+
+
+# Kept in sync with each adapter's get_manifest() (see tests/test_provider_registry.py).
+BUILTIN_PROVIDERS = (
+    ProviderInfo(
+        "openai",
+        f"{PACKAGE_PREFIX}.openai.adapter",
+        input_formats=("chatgpt_export_v2+",),
+        capabilities=("batch", "incremental", "branches", "message-records"),
+    ),
+)
+
+
+def default_cache_path() -> Path:
+    root = os.environ.get(CACHE_ENV)
+    if root:
+        return Path(root) / CACHE_NAME
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "llm-logparser" / CACHE_NAME
+
+
+def _entry_points() -> Iterable[Any]:
+    from importlib.metadata import entry_points
+
+    return entry_points(group=ENTRY_POINT_GROUP)
+
+
+class ProviderRegistry:
+    """Discovers providers once; imports an adapter module only on request."""
+
+    def __init__(
+        self,
+        *,
+        builtins: Iterable[ProviderInfo] = BUILTIN_PROVIDERS,
+        entry_points: Callable[[], Iterable[Any]] = _entry_points,
+        cache_path: Optional[Path] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self._builtins = tuple(builtins)
+        self._entry_points = entry_points
+        self.cache_path = cache_path
+        self.log = logger or logging.getLogger("llm_logparser.providers")
+        self._providers: Optional[Dict[str, ProviderInfo]] = None
+
+    # ---- cache -------------------------------------------------
+    def _cache_file(self) -> Path:
+        return self.cache_path or default_cache_path()
+
+    def _read_cache(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self._cache_file().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return {}
+        providers = data.get("providers")
+        return providers if isinstance(providers, dict) else {}
+
+    def _write_cache(self, providers: Dict[str, Any]) -> None:
+        path = self._cache_file()
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(
+                json.dumps({"version": CACHE_VERSION, "providers": providers}, indent=2, sort_keys=True) + "\n",
+                encoding="utf-8",
+            )
+            os.replace(tmp, path)
+        except OSError as e:
+            self.log.debug(f"provider cache not written ({path}): {e}")
+            tmp.unlink(missing_ok=True)
+
+    # ---- discovery ---------------------------------------------
+    def providers(self) -> Dict[str, ProviderInfo]:
+        """All built-in and registered providers by id (no adapter is imported)."""
+        if self._providers is not None:
+            return self._providers
+        found = {info.id: info for info in self._builtins}
+        cached = self._read_cache()
+        for ep in self._entry_points():
+            dist = getattr(ep, "dist", None)
+            origin = f"{dist.name} {dist.version}" if dist is not None else "entry point"
+            known = found.get(ep.name)
+            if known is not None:
+                if known.module != ep.module:
+                    self.log.warning(
+                        f"provider {ep.name!r} from {origin} ignored: already provided by {known.origin}"
+                    )
+                continue
+            info = ProviderInfo(ep.name, ep.module, origin, described=False)
+            entry = cached.get(ep.name)
+            if isinstance(entry, dict) and entry.get("module") == ep.module and entry.get("origin") == origin:
+                info = replace(
+                    info,
+                    input_formats=tuple(entry.get("input_formats") or ()),
+                    capabilities=tuple(entry.get("capabilities") or ()),
+                    described=True,
+                )
+            found[ep.name] = info
+        self._providers = dict(sorted(found.items()))
+        return self._providers
+
+    def get(self, provider_id: str) -> ProviderInfo:
+        info = self.providers().get(provider_id)
+        if info is not None:
+            return info
+        if not provider_id or not provider_id.isidentifier():
+            raise UnknownProviderError(self._unknown(provider_id))
+        return ProviderInfo(provider_id, f"{PACKAGE_PREFIX}.{provider_id}.adapter", "package", described=False)
+
+    def _unknown(self, provider_id: str) -> str:
+        known = ", ".join(self.providers()) or "none"
+        return f"unknown provider {provider_id!r} (available: {known})"
+
+    # ---- loading -----------------------------------------------
+    def import_module(self, provider_id: str) -> ModuleType:
+        """Import the adapter module of one provider."""
+        info = self.get(provider_id)
+        try:
+            return import_module(info.module)
+        except ModuleNotFoundError as e:
+            # only "this provider does not exist", not a missing dependency inside it
+            if info.origin == "package" and e.name and info.module.startswith(e.name):
+                raise UnknownProviderError(self._unknown(provider_id)) from None
+            raise
+
+    def remember(self, provider_id: str, manifest: Dict[str, Any]) -> ProviderInfo:
+        """Record a loaded adapter's manifest; plugin metadata is cached on disk."""
+        info = self.get(provider_id)
+        if info.origin in ("builtin", "package"):
+            return info
+        formats, caps = describe_manifest(manifest)
+        described = replace(info, input_formats=formats, capabilities=caps, described=True)
+        if described != info:
+            cached = self._read_cache()
+            entry = described.to_dict()
+            del entry["id"], entry["described"]
+            cached[provider_id] = entry
+            self._write_cache(cached)
+            if self._providers is not None:
+                self._providers[provider_id] = described
+        return described
+
+
+_default: Optional[ProviderRegistry] = None
+
+
+def default_registry() -> ProviderRegistry:
+    """The process-wide registry (entry points are scanned on first use)."""
+    global _default
+    if _default is None:
+        _default = ProviderRegistry()
+    return _default
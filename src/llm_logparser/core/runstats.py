@@ -0,0 +1,214 @@
+# src/llm_logparser/core/runstats.py
+"""
+Machine-readable run statistics (`--stats-json`).
+
+StageTimes accumulates wall / CPU seconds per pipeline stage:
+
+- parse: read, adapter, validate, serialize, write; with --group-messages
+  also group (the grouping pass, including the reads it triggers)
+- export: read, render, split, write
+
+CPU time is measured on the thread that runs the stage (time.thread_time).
+With --jobs N the adapter/validate/serialize stages run in the workers; their
+times are summed over all workers and can exceed the run's wall time.
+
+RunStats adds counters, throughput, peak RSS and the largest thread, and
+writes the report as JSON.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TypeVar
+
+try:
+    import resource  # type: ignore
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+STATS_VERSION = 1
+
+# Counters reported per second of wall time.
+_RATE_COUNTS = (
+    "input_bytes", "records", "messages", "output_bytes",
+    "export_input_bytes", "export_threads", "markdown_bytes",
+)
+
+T = TypeVar("T")
+
+
+class StageTimes:
+    """stage name -> [wall seconds, cpu seconds, calls]."""
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.totals: Dict[str, list] = {}
+
+    def add(self, name: str, wall: float, cpu: float, calls: int = 1) -> None:
+        t = self.totals.get(name)
+        if t is None:
+            t = self.totals[name] = [0.0, 0.0, 0]
+        t[0] += wall
+        t[1] += cpu
+        t[2] += calls
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def profiled(self, name: str):
+        """Attribute the enclosed code to `name` without timing it (see profiling.py)."""
+        return nullcontext()
+
+    def timed_iter(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Yield from `items`, charging the time spent in next() to `name`."""
+        it = iter(items)
+        while True:
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self.add(name, time.perf_counter() - wall, time.thread_time() - cpu)
+            yield item
+
+    def laps(self) -> Callable[[str], None]:
+        """
+        Stopwatch for straight-line code: each lap(name) charges the time
+        since the previous lap (or since laps() was called) to `name`.
+        """
+        last = [time.perf_counter(), time.thread_time()]
+
+        def lap(name: str) -> None:
+            wall, cpu = time.perf_counter(), time.thread_time()
+            self.add(name, wall - last[0], cpu - last[1])
+            last[0], last[1] = wall, cpu
+
+        return lap
+
+    def merge(self, totals: Dict[str, list]) -> None:
+        for name, (wall, cpu, calls) in totals.items():
+            self.add(name, wall, cpu, calls)
+
+    def drain(self) -> Dict[str, list]:
+        """Return the totals so far and start over (used by worker processes)."""
+        out, self.totals = self.totals, {}
+        return out
+
+
+class _NullStageTimes(StageTimes):
+    """Stand-in when no report was requested: timing calls cost next to nothing."""
+
+    enabled = False
+
+    def add(self, name: str, wall: float, cpu: float, calls: int = 1) -> None:
+        pass
+
+    def stage(self, name: str):  # type: ignore[override]
+        return nullcontext()
+
+    def timed_iter(self, name: str, items: Iterable[T]) -> Iterable[T]:
+        return items
+
+    def laps(self) -> Callable[[str], None]:
+        return _no_lap
+
+
+def _no_lap(name: str) -> None:
+    pass
+
+
+NULL_TIMES: StageTimes = _NullStageTimes()
+
+
+def _maxrss_bytes(who: int) -> Optional[int]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class RunStats:
+    """Collects one command's statistics; see to_dict() for the report layout."""
+
+    def __init__(self, command: str, times: Optional[StageTimes] = None):
+        self.command = command
+        self.started_at = datetime.now(timezone.utc)
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self.times = times if times is not None else StageTimes()
+        self.counts: Dict[str, int] = {}
+        self.settings: Dict[str, Any] = {}
+        self.status = "running"
+        # kind ("parsed" / "markdown") -> {"by_messages": row, "by_bytes": row}
+        self.largest: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def thread(self, kind: str, cid: str, messages: int, nbytes: int) -> None:
+        """Track the largest `kind` output (by messages and by bytes)."""
+        row = {"conversation_id": cid, "messages": messages, "bytes": nbytes}
+        top = self.largest.setdefault(kind, {"by_messages": row, "by_bytes": row})
+        if messages > top["by_messages"]["messages"]:
+            top["by_messages"] = row
+        if nbytes > top["by_bytes"]["bytes"]:
+            top["by_bytes"] = row
+
+    def merge(self, counts: Dict[str, int], largest: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        """Fold in counters and largest threads collected by a worker process."""
+        for name, n in counts.items():
+            self.count(name, n)
+        for kind, top in largest.items():
+            for row in top.values():
+                self.thread(kind, row["conversation_id"], row["messages"], row["bytes"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        wall = time.perf_counter() - self._wall0
+        cpu = time.process_time() - self._cpu0
+        children_cpu = None
+        if resource is not None:
+            usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+            children_cpu = usage.ru_utime + usage.ru_stime
+
+        throughput = {
+            f"{name}_per_second": round(n / wall, 3) if wall > 0 else None
+            for name, n in self.counts.items()
+            if name in _RATE_COUNTS
+        }
+
+        return {
+            "version": STATS_VERSION,
+            "command": self.command,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "settings": self.settings,
+            "wall_seconds": round(wall, 6),
+            "cpu_seconds": round(cpu, 6),
+            "children_cpu_seconds": None if children_cpu is None else round(children_cpu, 6),
+            "stages": {
+                name: {"wall_seconds": round(w, 6), "cpu_seconds": round(c, 6), "calls": n}
+                for name, (w, c, n) in self.times.totals.items()
+            },
+            "counts": dict(self.counts),
+            "throughput": throughput,
+            "peak_rss_bytes": _maxrss_bytes(resource.RUSAGE_SELF) if resource else None,
+            "peak_rss_children_bytes": _maxrss_bytes(resource.RUSAGE_CHILDREN) if resource else None,
+            "largest_thread": self.largest,
+        }
+
+    def write_json(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        return path
@@ -0,0 +1,281 @@
+# src/llm_logparser/core/scanner.py
+from __future__ import annotations
+
+import mmap
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Sequence
+
+from . import codec
+
+# Structural tokens: a complete string literal (escapes included) or a single
+# bracket/comma. Strings are consumed inside the regex engine, so brackets and
+# commas that appear in text never reach the Python-level depth tracking.
+_STR = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_TOKEN_RE = re.compile(_STR + rb'|[\[\]{},]', re.DOTALL)
+
+# Whole-element matcher: a bracketed value nested at most _MAX_DEPTH levels,
+# matched in one regex call so the per-element cost stays in C. Possessive
+# quantifiers (3.11+) keep the engine from recording backtrack points.
+_MAX_DEPTH = 24
+_Q = "*+" if sys.version_info >= (3, 11) else "*"
+
+
+def _element_pattern(max_depth: int) -> bytes:
+    q = _Q.encode()
+    string = rb'"[^"\\]' + q + rb'(?:\\.[^"\\]' + q + rb')' + q + rb'"'
+    plain = rb'[^\[\]{}"]' + q
+    level = plain + rb"(?:" + string + plain + rb")" + q
+    for _ in range(max_depth):
+        level = plain + rb"(?:(?:" + string + rb"|[\[{]" + level + rb"[\]}])" + plain + rb")" + q
+    return rb"[\[{]" + level + rb"[\]}]"
+
+
+_ELEMENT_RE = re.compile(_element_pattern(_MAX_DEPTH), re.DOTALL)
+
+# Object member prefix (`"key" :`) and scalar values, for peek_members().
+_KEY_RE = re.compile(rb'[ \t\r\n]*(' + _STR + rb')[ \t\r\n]*:[ \t\r\n]*', re.DOTALL)
+_SCALAR_RE = re.compile(
+    _STR + rb'|-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null',
+    re.DOTALL,
+)
+# peek_members() looks for tail keys in this many trailing bytes only.
+PEEK_TAIL_WINDOW = 16 * 1024
+
+_QUOTE, _COMMA, _CLOSE_ARRAY = ord('"'), ord(","), ord("]")
+_CLOSE_OBJECT, _BACKSLASH = ord("}"), ord("\\")
+_OPEN = (ord("{"), ord("["))
+_WS = b" \t\r\n"
+_BOM = b"\xef\xbb\xbf"
+
+
+class ScanError(ValueError):
+    """Raised when the input is not a well-formed top-level JSON array."""
+
+
+@dataclass(frozen=True)
+class RecordSpan:
+    """Byte range [start, end) of one top-level array element in `path`.
+
+    Spans are tiny and picklable, so worker processes receive offsets instead
+    of decoded objects and decode their own slice of the memory map.
+    """
+    path: str
+    start: int
+    end: int
+    index: int
+
+    def load(self) -> Any:
+        return codec.loads(_mapped(self.path)[self.start:self.end])
+
+    def peek(self, names: Sequence[str]) -> Dict[str, Any]:
+        """Top-level scalar members `names` of this element, without decoding it."""
+        return peek_members(_mapped(self.path), self.start, self.end, names)
+
+
+# Per-process cache of open maps (one per input file).
+_MAPS: Dict[str, mmap.mmap] = {}
+
+
+def _mapped(path: str) -> mmap.mmap:
+    mm = _MAPS.get(path)
+    if mm is None:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _MAPS[path] = mm
+    return mm
+
+
+def _skip_ws(buf, pos: int) -> int:
+    n = len(buf)
+    while pos < n and buf[pos] in _WS:
+        pos += 1
+    return pos
+
+
+def _scan_to_delimiter(buf, pos: int) -> int:
+    """Token-level fallback: offset of the `,`/`]` that ends the element at `pos`."""
+    depth = 0
+    for m in _TOKEN_RE.finditer(buf, pos):
+        at = m.start()
+        c = buf[at]
+        if c == _QUOTE:
+            continue
+        if c in _OPEN:
+            depth += 1
+        elif depth == 0:
+            return at
+        elif c != _COMMA:
+            depth -= 1
+    raise ScanError("unterminated JSON array")
+
+
+def iter_array_spans(buf, start: int = 0, *, resume_at: int | None = None) -> Iterator[tuple[int, int]]:
+    """
+    Yield (start, end) byte offsets of each top-level element of a JSON array.
+
+    Only string/escape state and bracket depth are tracked; nothing is decoded.
+    `buf` is any buffer the regex engine accepts (bytes, mmap, ...).
+    `resume_at` is the `end` of a previously yielded element: scanning
+    continues with the element after it.
+    """
+    n = len(buf)
+    if resume_at is not None:
+        delim = _skip_ws(buf, resume_at)
+        if delim >= n:
+            raise ScanError("unterminated JSON array")
+        if buf[delim] == _CLOSE_ARRAY:
+            return
+        if buf[delim] != _COMMA:
+            raise ScanError(f"unexpected byte at offset {delim}")
+        pos = delim + 1
+    else:
+        pos = start
+        if buf[pos:pos + 3] == _BOM:
+            pos += 3
+        pos = _skip_ws(buf, pos)
+        if pos >= n or buf[pos] != ord("["):
+            raise ScanError("expected JSON array")
+        pos += 1
+
+    while True:
+        pos = _skip_ws(buf, pos)
+        if pos >= n:
+            raise ScanError("unterminated JSON array")
+        if buf[pos] == _CLOSE_ARRAY:
+            return
+        m = _ELEMENT_RE.match(buf, pos)
+        if m is not None:
+            end = m.end()
+            delim = _skip_ws(buf, end)
+        else:
+            # scalar element or nesting deeper than _MAX_DEPTH
+            delim = end = _scan_to_delimiter(buf, pos)
+        if delim >= n:
+            raise ScanError("unterminated JSON array")
+        yield pos, end
+        c = buf[delim]
+        if c == _CLOSE_ARRAY:
+            return
+        if c != _COMMA:
+            raise ScanError(f"unexpected byte at offset {delim}")
+        pos = delim + 1
+
+
+def _iter_members(buf, pos: int, end: int, *, skip_nested: bool) -> Iterator[tuple[bytes, int, int, bool]]:
+    """
+    Walk object members starting at `pos` (just after `{` or `,`).
+
+    Yields (key literal, value start, value end, last). Stops silently on
+    anything it cannot read, or (skip_nested=False) at the first nested value.
+    """
+    while True:
+        m = _KEY_RE.match(buf, pos, end)
+        if m is None:
+            return
+        vpos = m.end()
+        if vpos >= end:
+            return
+        if buf[vpos] in _OPEN:
+            if not skip_nested:
+                return
+            v = _ELEMENT_RE.match(buf, vpos, end)
+        else:
+            v = _SCALAR_RE.match(buf, vpos, end)
+        if v is None:
+            return
+        delim = _skip_ws(buf, v.end())
+        if delim >= end:
+            return
+        c = buf[delim]
+        if c == _CLOSE_OBJECT:
+            yield m.group(1), vpos, v.end(), True
+            return
+        if c != _COMMA:
+            return
+        yield m.group(1), vpos, v.end(), False
+        pos = delim + 1
+
+
+def _is_string_start(buf, at: int, lo: int) -> bool:
+    """True if the quote at `at` is not escaped (so it opens a string there)."""
+    n = 0
+    while at - n - 1 >= lo and buf[at - n - 1] == _BACKSLASH:
+        n += 1
+    return n % 2 == 0
+
+
+def peek_members(buf, start: int, end: int, names: Sequence[str]) -> Dict[str, Any]:
+    """
+    Read top-level scalar members of the JSON object in buf[start:end] without
+    decoding the rest of it (e.g. a conversation's id next to a huge mapping).
+
+    Two cheap passes, each only trusted when it proves the member is top-level:
+    - head: members from the opening `{` up to the first nested value;
+    - tail: for a key found near the end (last PEEK_TAIL_WINDOW bytes), the
+      members from there must parse exactly up to the object's closing `}`;
+      a key nested deeper would hit an extra closing bracket first.
+    Names in neither region (e.g. between two nested values) are left out.
+    """
+    found: Dict[str, Any] = {}
+    wanted = {b'"' + n.encode() + b'"': n for n in names}
+    pos = _skip_ws(buf, start)
+    if pos >= end or buf[pos] != ord("{"):
+        return found
+
+    def take(key: bytes, vs: int, ve: int) -> None:
+        name = wanted.get(key)
+        if name is not None and name not in found:
+            found[name] = codec.loads(buf[vs:ve])
+
+    head_end = pos + 1
+    for key, vs, ve, _ in _iter_members(buf, pos + 1, end, skip_nested=False):
+        take(key, vs, ve)
+        head_end = ve
+
+    lo = max(head_end, end - PEEK_TAIL_WINDOW)
+    for key in wanted:
+        if wanted[key] in found:
+            continue
+        hi = end
+        while True:
+            at = buf.rfind(key, lo, hi)
+            if at < 0:
+                break
+            hi = at
+            before = at - 1
+            while before > lo and buf[before] in _WS:
+                before -= 1
+            if buf[before] != _COMMA or not _is_string_start(buf, at, lo):
+                continue
+            members = list(_iter_members(buf, at, end, skip_nested=True))
+            if not members or not members[-1][3] or _skip_ws(buf, members[-1][2]) != end - 1:
+                continue
+            for k, vs, ve, _ in members:
+                take(k, vs, ve)
+            break
+    return found
+
+
+def iter_record_spans(path: Path, *, resume_at: int | None = None, index: int = 0) -> Iterator[RecordSpan]:
+    """
+    Memory-map `path` and yield a RecordSpan per top-level array element.
+
+    To continue an earlier scan pass the last span's `end` as `resume_at` and
+    its `index` as `index`; numbering carries on from there.
+    """
+    key = str(path)
+    if path.stat().st_size == 0:
+        raise ScanError("expected JSON array")
+    mm = _mapped(key)
+    for i, (start, end) in enumerate(iter_array_spans(mm, resume_at=resume_at), start=index + 1):
+        yield RecordSpan(key, start, end, i)
+
+
+def release_maps() -> None:
+    """Close every cached map (call once the spans are no longer needed)."""
+    while _MAPS:
+        _, mm = _MAPS.popitem()
+        mm.close()
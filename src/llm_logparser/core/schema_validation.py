@@ -7,6 +7,8 @@ from typing import Iterable, Iterator, Literal, Mapping, Optional, Sequence, TYP
 
 import json
 
+from . import codec
+
 if TYPE_CHECKING:
     from jsonschema import ValidationError
 
@@ -243,12 +245,12 @@ def _iter_json_lines(path: Path) -> Iterator[tuple[int, dict]]:
     JSON Lines (JSONL) / NDJSON を 1 行ずつ読み、(行番号, オブジェクト) を yield する。
     行番号は 1 始まり。
     """
-    with path.open("r", encoding="utf-8") as f:
+    with path.open("rb") as f:
         for idx, line in enumerate(f, start=1):
             stripped = line.strip()
             if not stripped:
                 continue
-            obj = json.loads(stripped)
+            obj = codec.loads(stripped)
             if not isinstance(obj, dict):
                 raise ValueError(f"{path}: line {idx} is not a JSON object")
             yield idx, obj
@@ -267,7 +269,7 @@ def validate_parsed_jsonl(
     Parameters
     ----------
     path:
-        parsed.jsonl のパス
+        parsed.jsonl のパス (packed レイアウトの場合は store.PackedThread も可)
     validator:
         事前に load_message_validator() したものを渡す場合。
         None のときは schema_path から自動ロード。
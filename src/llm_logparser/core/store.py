@@ -0,0 +1,290 @@
+# src/llm_logparser/core/store.py
+"""
+Where parse_to_jsonl puts each thread's parsed.jsonl bytes.
+
+- "dirs" (default): <provider>/thread-<cid>/parsed.jsonl, one directory per
+  thread (the original layout).
+- "packed": <provider>/threads.pack holds every thread's parsed.jsonl bytes
+  back to back, appended as threads are parsed; <provider>/threads.idx maps
+  conversation_id -> offset, length, counts and ts range (one JSON line per
+  thread). Re-parsing appends changed threads and repoints the index, so the
+  pack may hold dead bytes from earlier versions; `unpack` rewrites the
+  directory layout when needed.
+
+Readers (exporter, validator) accept a PackedThread wherever they accept a
+parsed.jsonl path: both have .open("rb").
+"""
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional
+
+from . import codec
+
+LAYOUTS = ("dirs", "packed")
+PACK_DATA_NAME = "threads.pack"
+PACK_INDEX_NAME = "threads.idx"
+PACK_INDEX_VERSION = 1
+
+# Manifest entry keys copied into threads.idx.
+_INDEX_KEYS = ("conversation_id", "offset", "length", "count", "ts_min", "ts_max")
+
+
+def thread_relpath(cid: str) -> str:
+    return f"thread-{cid}/parsed.jsonl"
+
+
+@dataclass(frozen=True)
+class PackedThread:
+    """One thread's parsed.jsonl inside a pack file."""
+    pack: Path
+    conversation_id: str
+    offset: int
+    length: int
+
+    @property
+    def name(self) -> str:
+        return f"thread-{self.conversation_id}"
+
+    def read_bytes(self) -> bytes:
+        with self.pack.open("rb") as f:
+            f.seek(self.offset)
+            data = f.read(self.length)
+        if len(data) != self.length:
+            raise ValueError(f"{self}: pack file is truncated")
+        return data
+
+    def open(self, mode: str = "rb") -> BinaryIO:
+        """A buffered, seekable view of the thread's bytes (not read into memory)."""
+        if mode != "rb":
+            raise ValueError("packed threads are read-only")
+        f = self.pack.open("rb")
+        if os.fstat(f.fileno()).st_size < self.offset + self.length:
+            f.close()
+            raise ValueError(f"{self}: pack file is truncated")
+        return io.BufferedReader(_PackSlice(f, self.offset, self.length))
+
+    def __str__(self) -> str:
+        return f"{self.pack}#{self.conversation_id}"
+
+
+class _PackSlice(io.RawIOBase):
+    """bytes [offset, offset + length) of an open pack file, as a raw stream."""
+
+    def __init__(self, f: BinaryIO, offset: int, length: int):
+        self._f = f
+        self._start = offset
+        self._length = length
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self._length - self._pos)
+        if n <= 0:
+            return 0
+        self._f.seek(self._start + self._pos)
+        got = self._f.readinto(memoryview(b)[:n])
+        self._pos += got
+        return got
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._length}[whence]
+        self._pos = max(0, base + pos)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        if not self.closed:
+            self._f.close()
+        super().close()
+
+
+class DirectoryStore:
+    """thread-<cid>/parsed.jsonl per thread, each written via .tmp + rename."""
+
+    layout = "dirs"
+
+    def __init__(self, provider_dir: Path):
+        self.provider_dir = provider_dir
+
+    def write(self, cid: str, data: bytes) -> Dict[str, Any]:
+        rel = thread_relpath(cid)
+        outpath = self.provider_dir / rel
+        outpath.parent.mkdir(parents=True, exist_ok=True)
+        tmp = outpath.with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            f.write(data)
+        tmp.replace(outpath)
+        return {"path": rel}
+
+    def tell(self) -> Optional[int]:
+        return None
+
+    def flush(self) -> None:
+        pass
+
+    def close(self, entries: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+        """With `entries` (manifest entries), prune a threads.idx left by an earlier packed parse."""
+        if entries is not None and (self.provider_dir / PACK_INDEX_NAME).exists():
+            sync_pack_index(self.provider_dir, entries)
+
+
+class PackedStore:
+    """Appends threads to threads.pack; close() writes threads.idx."""
+
+    layout = "packed"
+
+    def __init__(self, provider_dir: Path, *, truncate_to: Optional[int] = None):
+        self.provider_dir = provider_dir
+        self.path = provider_dir / PACK_DATA_NAME
+        self._f = self.path.open("ab")
+        if truncate_to is not None:
+            # resuming: drop bytes written after the last checkpoint
+            self._f.truncate(truncate_to)
+        self._f.seek(0, os.SEEK_END)
+        self._pos = self._f.tell()
+
+    def write(self, cid: str, data: bytes) -> Dict[str, Any]:
+        offset = self._pos
+        self._f.write(data)
+        self._pos += len(data)
+        return {"path": PACK_DATA_NAME, "offset": offset, "length": len(data)}
+
+    def tell(self) -> Optional[int]:
+        """Pack size including buffered writes."""
+        return self._pos
+
+    def flush(self) -> None:
+        """Hand buffered threads to the OS (before a checkpoint refers to them)."""
+        self._f.flush()
+
+    def close(self, entries: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+        """Finish the pack; with `entries` (manifest entries) also write threads.idx."""
+        if self._f.closed:
+            return
+        self._f.close()
+        if entries is not None:
+            write_pack_index(self.provider_dir, entries)
+
+
+def open_store(layout: str, provider_dir: Path, *, truncate_to: Optional[int] = None):
+    if layout == "dirs":
+        return DirectoryStore(provider_dir)
+    if layout == "packed":
+        return PackedStore(provider_dir, truncate_to=truncate_to)
+    raise ValueError(f"unknown layout: {layout}")
+
+
+def write_pack_index(provider_dir: Path, entries: Iterable[Dict[str, Any]]) -> Path:
+    """Write threads.idx for the entries stored in the pack (atomic)."""
+    path = provider_dir / PACK_INDEX_NAME
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(codec.dumps({"version": PACK_INDEX_VERSION, "data": PACK_DATA_NAME}) + "\n")
+        for e in entries:
+            if e.get("path") == PACK_DATA_NAME:
+                f.write(codec.dumps({k: e.get(k) for k in _INDEX_KEYS}) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def sync_pack_index(provider_dir: Path, entries: Iterable[Dict[str, Any]]) -> Optional[Path]:
+    """
+    Make threads.idx match the manifest: rewrite it with the entries still
+    stored in the pack, or remove it when none are. A stale index would make
+    find_parsed_threads prefer old packed copies over newer thread dirs.
+    """
+    entries = list(entries)
+    if any(e.get("path") == PACK_DATA_NAME for e in entries):
+        return write_pack_index(provider_dir, entries)
+    (provider_dir / PACK_INDEX_NAME).unlink(missing_ok=True)
+    return None
+
+
+def load_pack_index(provider_dir: Path) -> List[Dict[str, Any]]:
+    """threads.idx entries in manifest order ([] if there is no pack)."""
+    path = provider_dir / PACK_INDEX_NAME
+    if not path.exists():
+        return []
+    with path.open("rb") as f:
+        lines = [line for line in f if line.strip()]
+    if not lines:
+        return []
+    header = codec.loads(lines[0])
+    if header.get("version") != PACK_INDEX_VERSION:
+        raise ValueError(f"{path}: unsupported pack index version {header.get('version')!r}")
+    return [codec.loads(line) for line in lines[1:]]
+
+
+def iter_packed_threads(provider_dir: Path) -> List[PackedThread]:
+    pack = provider_dir / PACK_DATA_NAME
+    return [
+        PackedThread(pack, e["conversation_id"], e["offset"], e["length"])
+        for e in load_pack_index(provider_dir)
+    ]
+
+
+def find_parsed_threads(root: Path) -> List[Path | PackedThread]:
+    """
+    Every thread under `root`: packed threads (from any threads.idx) plus
+    thread-*/parsed.jsonl files not superseded by a packed copy.
+    """
+    packed: List[PackedThread] = []
+    for idx in sorted(root.rglob(PACK_INDEX_NAME)):
+        packed.extend(iter_packed_threads(idx.parent))
+    in_pack = {(t.pack.parent, t.name) for t in packed}
+    files = [
+        p for p in sorted(root.rglob("parsed.jsonl"))
+        if (p.parent.parent, p.parent.name) not in in_pack
+    ]
+    return [*packed, *files]
+
+
+def unpack(provider_dir: Path, *, remove_pack: bool = False, logger: Optional[logging.Logger] = None) -> int:
+    """
+    Rewrite a packed provider directory in the "dirs" layout: one
+    thread-<cid>/parsed.jsonl per thread, manifest paths updated.
+    Returns the number of threads written.
+    """
+    log = logger or logging.getLogger("llm_logparser.store")
+    threads = iter_packed_threads(provider_dir)
+    if not threads and not (provider_dir / PACK_INDEX_NAME).exists():
+        raise FileNotFoundError(f"{provider_dir / PACK_INDEX_NAME} not found")
+
+    out = DirectoryStore(provider_dir)
+    with (provider_dir / PACK_DATA_NAME).open("rb") as f:
+        for t in threads:
+            f.seek(t.offset)
+            out.write(t.conversation_id, f.read(t.length))
+
+    manifest_path = provider_dir / "manifest.json"
+    if manifest_path.exists():
+        manifest = codec.loads(manifest_path.read_bytes())
+        for e in manifest.get("index", {}).get("threads", []):
+            if e.get("path") == PACK_DATA_NAME:
+                e["path"] = thread_relpath(e["conversation_id"])
+                e.pop("offset", None)
+                e.pop("length", None)
+        tmp = manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, ensure_ascii=True, indent=2), encoding="utf-8")
+        tmp.replace(manifest_path)
+
+    # every thread now lives in thread-*/parsed.jsonl: the index must go, or
+    # find_parsed_threads would keep reading the packed copies
+    (provider_dir / PACK_INDEX_NAME).unlink(missing_ok=True)
+    if remove_pack:
+        (provider_dir / PACK_DATA_NAME).unlink(missing_ok=True)
+    log.info(f"unpacked {len(threads)} threads into {provider_dir}")
+    return len(threads)
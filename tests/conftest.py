@@ -0,0 +1,63 @@
+"""Helpers shared by the tests (imported as `from conftest import ...`)."""
+import copy
+import json
+from pathlib import Path
+from typing import Iterable, Optional
+
+SAMPLE = Path(__file__).parent / "fixtures" / "openai_sample.json"
+
+
+def edit_message(conv: dict, text: str) -> None:
+    """Replace the text of the first timed message of a sample conversation."""
+    for node in conv["mapping"].values():
+        msg = node.get("message")
+        if msg and msg.get("create_time"):
+            msg["content"]["parts"] = [text]
+            return
+    raise AssertionError("fixture has no timed message")
+
+
+def conversations(n: int = 4, *, ids: Optional[Iterable[str]] = None, edit: Iterable[str] = ()) -> list[dict]:
+    """
+    Copies of the sample export conversation with ids conv-0 ... conv-<n-1>
+    (or `ids`). The copies listed in `edit` get an edited title and first
+    message and a newer update_time.
+    """
+    base = json.loads(SAMPLE.read_text(encoding="utf-8"))
+    edit = set(edit)
+    convs = []
+    for cid in (list(ids) if ids is not None else [f"conv-{i}" for i in range(n)]):
+        conv = copy.deepcopy(base)
+        conv["id"] = conv["conversation_id"] = cid
+        if cid in edit:
+            conv["title"] = "edited"
+            conv["update_time"] += 1
+            edit_message(conv, "edited")
+        convs.append(conv)
+    return convs
+
+
+def write_conversations(path: Path, convs: list[dict]) -> Path:
+    """Write `convs` as one export JSON array."""
+    path.write_text(json.dumps(convs, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def snapshot(root: Path) -> dict:
+    """Every file under `root` by relative path (manifest without exported_at)."""
+    out = {}
+    for p in sorted(root.rglob("*")):
+        if not p.is_file():
+            continue
+        data = p.read_text(encoding="utf-8")
+        if p.name == "manifest.json":
+            obj = json.loads(data)
+            obj.pop("exported_at")
+            data = json.dumps(obj, sort_keys=True)
+        out[p.relative_to(root).as_posix()] = data
+    return out
+
+
+def thread_files(provider_dir: Path) -> dict:
+    """parsed.jsonl bytes by thread directory name (dirs layout)."""
+    return {p.parent.name: p.read_bytes() for p in sorted(provider_dir.glob("thread-*/parsed.jsonl"))}
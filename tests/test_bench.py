@@ -0,0 +1,75 @@
+import json
+import random
+
+import pytest
+
+from llm_logparser.bench.runner import compare_to_baseline, mismatches, run_bench, tree_digest
+from llm_logparser.bench.synth import SynthSpec, make_conversation, write_export
+from llm_logparser.core.parser import load_adapter
+
+
+def test_synthetic_export_is_deterministic_and_linearizes(tmp_path):
+    spec = SynthSpec(conversations=3, nodes=12, branching=0.5, message_chars=60, cjk_ratio=0.5, seed=7)
+    a, b = tmp_path / "a.json", tmp_path / "b.json"
+    info = write_export(a, spec)
+    write_export(b, spec)
+    assert a.read_bytes() == b.read_bytes()
+
+    convs = json.loads(a.read_text(encoding="utf-8"))
+    assert len(convs) == 3
+    adapter = load_adapter("openai")
+    messages = [m for conv in convs for m in adapter.adapt(conv, str(a))]
+    assert len(messages) == info["messages"] > 3 * 12  # branches add messages
+    assert any("東京" in m["text"] or "データ" in m["text"] for m in messages)
+
+
+def test_branching_zero_gives_a_single_path():
+    conv = make_conversation(0, random.Random(1), SynthSpec(nodes=5, branching=0.0))
+    assert len(conv["mapping"]) == 6
+    assert all(len(n["children"]) <= 1 for n in conv["mapping"].values())
+
+
+def test_tree_digest_ignores_exported_at(tmp_path):
+    for name, ts in (("a", "2020-01-01"), ("b", "2030-01-01")):
+        (tmp_path / name / "p").mkdir(parents=True)
+        (tmp_path / name / "p" / "manifest.json").write_text(json.dumps({"exported_at": ts, "x": 1}))
+    assert tree_digest(tmp_path / "a") == tree_digest(tmp_path / "b")
+    (tmp_path / "b" / "p" / "extra").write_text("x")
+    assert tree_digest(tmp_path / "a") != tree_digest(tmp_path / "b")
+
+
+def _results(rate, rss, spec=None):
+    return {
+        "version": 1,
+        "spec": spec or SynthSpec().to_dict(),
+        "scenarios": {"parse": {"messages_per_second": rate, "peak_rss_bytes": rss}},
+    }
+
+
+def test_compare_to_baseline_flags_slowdown_and_memory_growth():
+    base = _results(1000.0, 100 * 2**20)
+    assert compare_to_baseline(_results(900.0, 110 * 2**20), base) == []
+    problems = compare_to_baseline(_results(800.0, 130 * 2**20), base)
+    assert len(problems) == 2 and all(p.startswith("parse:") for p in problems)
+
+    other = _results(1000.0, 1, spec={**SynthSpec().to_dict(), "nodes": 3})
+    with pytest.raises(ValueError):
+        compare_to_baseline(other, base)
+
+
+def test_run_bench_parallel_output_matches_serial(tmp_path):
+    spec = SynthSpec(conversations=6, nodes=8, message_chars=40)
+    results = run_bench(tmp_path, spec, jobs=2, scenarios=["parse", "parse-jobs2"], log=lambda msg: None)
+    assert results["identical"] == {"parse-jobs2": True}
+    assert mismatches(results) == []
+    row = results["scenarios"]["parse"]
+    assert row["messages_per_second"] > 0 and row["peak_rss_bytes"] > 0
+    assert not (tmp_path / "parse").exists()
+
+
+def test_run_bench_chain_matches_with_export_cache(tmp_path):
+    spec = SynthSpec(conversations=4, nodes=6, message_chars=40)
+    results = run_bench(tmp_path, spec, jobs=2, scenarios=["chain", "chain-jobs2"], keep=True, log=lambda msg: None)
+    assert list(tmp_path.rglob(".*.md.export.json"))  # the cache is on by default
+    assert results["identical"] == {"chain-jobs2": True}
+    assert mismatches(results) == []
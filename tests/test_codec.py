@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from llm_logparser.core import codec
+
+DOCS = [
+    '{"a": 1, "b": [true, false, null], "c": "text"}',
+    '{"uni": "東京 😀", "esc": "\\u6771\\u4eac \\ud83d\\ude00 \\n\\t\\"\\\\"}',
+    '{"float": 1730000001.002417, "exp": 1e-7, "neg": -0.0, "int": 1730000001000}',
+    '{"big": 123456789012345678901234567890}',
+    '{"nan": NaN, "inf": Infinity}',
+    '{"lone": "\\ud800"}',
+    '{"dup": 1, "dup": 2}',
+    '[]',
+]
+
+
+@pytest.mark.parametrize("backend", codec.BACKENDS)
+@pytest.mark.parametrize("doc", DOCS)
+def test_loads_matches_stdlib(backend, doc):
+    loads = codec.make_loads(backend)
+    expected = json.loads(doc)
+    for data in (doc, doc.encode("utf-8")):
+        got = loads(data)
+        # NaN != NaN, so compare the canonical re-serialization
+        assert json.dumps(got) == json.dumps(expected)
+
+
+@pytest.mark.parametrize("backend", codec.BACKENDS)
+def test_loads_raises_stdlib_error(backend):
+    with pytest.raises(json.JSONDecodeError):
+        codec.make_loads(backend)(b'{"broken": ')
+
+
+def test_dumps_is_byte_identical_to_stdlib():
+    for doc in DOCS:
+        obj = json.loads(doc)
+        assert codec.dumps(obj) == json.dumps(obj, ensure_ascii=True)
+    record = {
+        "record_type": "message",
+        "conversation_id": "c1",
+        "parent_id": None,
+        "ts": 1730000001000,
+        "content": {"content_type": "text", "parts": ["おはよう", "line\nbreak"]},
+        "text": "おはよう\nline\nbreak",
+    }
+    assert codec.dumps(record) == json.dumps(record, ensure_ascii=True)
+
+
+@pytest.mark.parametrize("backend", codec.BACKENDS)
+def test_loads_for_keeps_wide_integers_exact(backend):
+    loads_for = codec.make_loads_for(backend)
+    for doc in DOCS:
+        data = doc.encode("utf-8")
+        got = loads_for(b"{}", data)(data)
+        assert json.dumps(got) == json.dumps(json.loads(doc))
+    with pytest.raises(json.JSONDecodeError):
+        loads_for(b"{}")(b'{"broken": ')
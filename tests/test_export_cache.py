@@ -0,0 +1,59 @@
+import json
+import os
+
+from llm_logparser.core.exporter import export_cache_path, export_thread_md
+from llm_logparser.core.runstats import RunStats
+
+
+def _write_thread(path, n, text="hello"):
+    rows = [{"record_type": "thread", "provider_id": "openai", "conversation_id": "conv-c"}]
+    rows += [
+        {"record_type": "message", "message_id": f"m{i}", "role": "user", "ts": i, "text": f"{text} {i}"}
+        for i in range(n)
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+
+def test_unchanged_thread_is_not_rendered_again(tmp_path):
+    parsed = tmp_path / "parsed.jsonl"
+    _write_thread(parsed, 3)
+    out = tmp_path / "md" / "out.md"
+
+    (first,) = export_thread_md(parsed, out, cache=True)
+    record = json.loads(export_cache_path(out).read_text(encoding="utf-8"))
+    assert record["parts"][0]["name"] == "out.md" and record["input"].startswith("sha256:")
+    os.utime(first, ns=(1, 1))
+
+    stats = RunStats("export")
+    assert export_thread_md(parsed, out, cache=True, run_stats=stats) == [first]
+    assert stats.counts == {"export_cached_threads": 1}
+    assert first.stat().st_mtime_ns == 1  # not rewritten
+
+    # same bytes, new mtime: recognized by digest, still not rewritten
+    os.utime(parsed, ns=(10**18, 10**18))
+    assert export_thread_md(parsed, out, cache=True) == [first]
+    assert first.stat().st_mtime_ns == 1
+
+    # different options or a deleted output: rendered again
+    export_thread_md(parsed, out, cache=True, formatting="none")
+    assert first.stat().st_mtime_ns != 1
+    os.utime(first, ns=(1, 1))
+    _write_thread(parsed, 3, text="changed")
+    export_thread_md(parsed, out, cache=True, formatting="none")
+    assert "changed" in first.read_text(encoding="utf-8")
+
+
+def test_stale_parts_are_removed_when_the_part_count_shrinks(tmp_path):
+    parsed = tmp_path / "parsed.jsonl"
+    out = tmp_path / "md" / "out.md"
+    _write_thread(parsed, 6)
+    many = export_thread_md(parsed, out, cache=True, split="count=2", tiny_tail_threshold=0)
+    assert len(many) == 3
+
+    _write_thread(parsed, 5)
+    fewer = export_thread_md(parsed, out, cache=True, split="count=2", tiny_tail_threshold=0)
+    assert [p.name for p in fewer] == [p.name for p in many[:2]]
+    assert sorted(p.name for p in out.parent.iterdir() if p.suffix == ".md") == [p.name for p in fewer]
+
+    single = export_thread_md(parsed, out, cache=True)
+    assert sorted(p.name for p in out.parent.iterdir() if p.suffix == ".md") == [p.name for p in single]
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from llm_logparser.bench.synth import SynthSpec, write_export
+from llm_logparser.core.exporter import export_threads, schedule_exports
+from llm_logparser.core.parser import parse_to_jsonl
+from llm_logparser.core.runstats import RunStats
+
+
+def test_schedule_exports_largest_first_and_batches_small_threads():
+    weights = [10, 5000, 30, 20, 9000, 40]
+    batches = schedule_exports(weights, batch_bytes=100, batch_threads=2)
+    assert batches[:2] == [[4], [1]]  # big threads alone, largest first
+    assert batches[2:] == [[5, 2], [3, 0]]
+    assert sorted(i for b in batches for i in b) == list(range(len(weights)))
+
+
+def _tasks(tmp_path, n=12):
+    src = tmp_path / "in.json"
+    write_export(src, SynthSpec(conversations=n, nodes=6, message_chars=80))
+    parse_to_jsonl("openai", src, tmp_path / "out")
+    parsed = sorted((tmp_path / "out").rglob("parsed.jsonl"))
+    return [(p, p.parent / f"{p.parent.name}.md") for p in parsed]
+
+
+def test_parallel_export_matches_serial(tmp_path):
+    tasks = _tasks(tmp_path)
+    serial_stats = RunStats("chain")
+    assert export_threads(tasks, jobs=1, run_stats=serial_stats) == (len(tasks), 0)
+    serial = {out: out.read_bytes() for _, out in tasks}
+    for _, out in tasks:
+        out.unlink()
+
+    stats = RunStats("chain")
+    assert export_threads(tasks, jobs=3, run_stats=stats, batch_bytes=2000, batch_threads=3) == (len(tasks), 0)
+    assert {out: out.read_bytes() for _, out in tasks} == serial
+    assert stats.counts == serial_stats.counts
+    assert stats.largest == serial_stats.largest
+    assert {"read", "render", "write"} <= set(stats.times.totals)
+
+
+def test_parallel_export_reports_failures_and_honors_fail_fast(tmp_path):
+    tasks = _tasks(tmp_path, n=4)
+    broken = tasks[1][0]
+    broken.write_text(json.dumps({"record_type": "message", "text": "x"}) + "\n", encoding="utf-8")
+
+    assert export_threads(tasks, jobs=2, batch_threads=1) == (3, 1)
+    with pytest.raises(RuntimeError, match="export failed"):
+        export_threads(tasks, jobs=2, batch_threads=1, fail_fast=True)
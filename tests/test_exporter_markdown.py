@@ -1,6 +1,9 @@
 import json
+import random
 
-from llm_logparser.core.exporter import export_thread_md
+import pytest
+
+from llm_logparser.core.exporter import SplitPlanner, _part_front_matter, export_thread_md
 
 
 def test_export_thread_md(tmp_path):
@@ -42,3 +45,68 @@ def test_export_thread_md(tmp_path):
     md = out.read_text(encoding="utf-8")
     assert "assistant" in md
     assert "Hi" in md
+
+
+def test_export_streams_out_of_order_messages_into_parts(tmp_path):
+    parsed = tmp_path / "parsed.jsonl"
+    rows = [{"record_type": "thread", "provider_id": "openai", "conversation_id": "conv-2"}]
+    for i in (3, None, 1, 4, 0, 2):
+        rows.append({"record_type": "message", "message_id": f"m{i}", "role": "user", "ts": i, "text": f"text {i}"})
+    parsed.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+    paths = export_thread_md(parsed, tmp_path / "md" / "out.md", split="count=2", tiny_tail_threshold=0)
+
+    assert [p.name for p in paths] == [f"thread-conv-2__part0{i}.md" for i in (1, 2, 3)]
+    body = "".join(p.read_text(encoding="utf-8") for p in paths)
+    ids = [line.split(": ")[1] for line in body.splitlines() if line.startswith("- message_id:")]
+    assert ids == ["m0", "m1", "m2", "m3", "m4", "mNone"]
+    assert "message_count: 2" in paths[0].read_text(encoding="utf-8")
+    assert sorted(p.name for p in (tmp_path / "md").iterdir()) == [p.name for p in paths]  # no spool left
+
+
+def _reference_parts(blocks, size_limit, count_limit, hard, soft=0.2, tiny=20):
+    """The original split loop: renders the front-matter and joins the buffer per block."""
+    fm = lambda count, index: _part_front_matter(
+        conv_id="c", provider="p", models="[]", ts_range="a 〜 b", count=count, index=index,
+        total=0, generated_at="2025-01-01T00:00:00.000001+00:00", tz_name="UTC",
+    )
+    parts, buf = [], []
+    for i, block in enumerate(blocks):
+        bsz = len(block.encode("utf-8"))
+        body = len("".join(buf).encode("utf-8"))
+        if hard:
+            over_size = len((fm(len(buf) + 1, len(parts) + 1) + "".join(buf + [block])).encode("utf-8")) > size_limit
+        else:
+            over_size = body + bsz + 1024 > size_limit
+        over_count = not over_size and bool(count_limit) and len(buf) >= count_limit
+        if over_size or over_count:
+            within_soft = not over_count and body + bsz + 1024 <= int(size_limit * (1 + soft))
+            if not hard and (within_soft or len(blocks) - (i + 1) <= tiny):
+                buf.append(block)
+                continue
+            if buf:
+                parts.append(buf)
+                buf = []
+        buf.append(block)
+    if buf:
+        parts.append(buf)
+    return [(len(b), len("".join(b).encode("utf-8"))) for b in parts] or [(0, 0)]
+
+
+@pytest.mark.parametrize("hard", [False, True])
+def test_split_planner_matches_original_boundaries(hard):
+    rng = random.Random(5)
+    for _ in range(30):
+        blocks = ["東" * rng.randint(1, 400) + "x" * rng.randint(0, 2000) for _ in range(rng.randint(0, 300))]
+        size_limit, count_limit = rng.choice([3000, 8000, 20000]), rng.choice([None, 4, 15])
+        tiny = rng.choice([0, 3, 20])
+        planner = SplitPlanner(
+            total=len(blocks), size_limit=size_limit, count_limit=count_limit, hard=hard, tiny_tail_threshold=tiny,
+            fm_fixed_bytes=len(_part_front_matter(
+                conv_id="c", provider="p", models="[]", ts_range="a 〜 b", count="", index="",
+                total=0, generated_at="2025-01-01T00:00:00.000001+00:00", tz_name="UTC",
+            ).encode("utf-8")),
+        )
+        for block in blocks:
+            planner.add(len(block.encode("utf-8")))
+        assert planner.finish() == _reference_parts(blocks, size_limit, count_limit, hard, tiny=tiny)
@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from llm_logparser.core import grouping
+from llm_logparser.core.grouping import MessageGrouper
+from llm_logparser.core.parser import parse_to_jsonl
+
+
+def _message(cid: str, n: int) -> dict:
+    return {
+        "conversation_id": cid,
+        "message_id": f"{cid}-m{n}",
+        "create_time": 1730000000 + n,
+        "author": {"role": "user" if n % 2 == 0 else "assistant"},
+        "content": f"{cid} message {n}",
+    }
+
+
+def _interleaved(convs: int = 5, per_conv: int = 4) -> list[dict]:
+    return [_message(f"c{c}", n) for n in range(per_conv) for c in reversed(range(convs))]
+
+
+def test_grouper_spills_sorted_runs_and_merges(tmp_path, monkeypatch):
+    monkeypatch.setattr(grouping, "MERGE_FANIN", 2)
+    grouper = MessageGrouper(buffer_size=3, tmpdir=tmp_path)
+    for rec in _interleaved():
+        grouper.add(rec["conversation_id"], rec, "in.jsonl")
+    assert grouper.spilled == 18
+
+    groups = list(grouper.groups())
+    assert [g.cid for g in groups] == ["c0", "c1", "c2", "c3", "c4"]
+    for g in groups:
+        assert [r["message_id"] for r in g.records] == [f"{g.cid}-m{n}" for n in range(4)]
+        assert g.source == "in.jsonl"
+    assert list(tmp_path.iterdir()) == []
+
+
+def _write_jsonl(path: Path, records: list) -> Path:
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    return path
+
+
+def _threads(out: Path) -> dict:
+    return {p.parent.name: p.read_bytes() for p in sorted((out / "openai").glob("thread-*/parsed.jsonl"))}
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_group_messages_builds_complete_threads(tmp_path, jobs):
+    records = _interleaved()
+    a = _write_jsonl(tmp_path / "a.jsonl", records[:9] + [{"message_id": "orphan"}])
+    b = _write_jsonl(tmp_path / "b.jsonl", records[9:])
+
+    stats = parse_to_jsonl("openai", [a, b], tmp_path / "spilled", group_messages=True, group_buffer=4, jobs=jobs)
+    assert stats["threads"] == 5 and stats["messages"] == 20
+    assert stats["skipped"] == 1
+
+    parse_to_jsonl("openai", [a, b], tmp_path / "in-memory", group_messages=True)
+    threads = _threads(tmp_path / "spilled")
+    assert threads == _threads(tmp_path / "in-memory")
+
+    lines = [json.loads(line) for line in threads["thread-c3"].splitlines()]
+    assert lines[0]["message_count"] == 4
+    assert [m["message_id"] for m in lines[1:]] == [f"c3-m{n}" for n in range(4)]
+    assert not list((tmp_path / "spilled" / "openai").glob(".group-runs-*"))
+
+
+def test_without_grouping_message_records_are_not_threads(tmp_path):
+    src = _write_jsonl(tmp_path / "a.jsonl", _interleaved(2, 2))
+    assert parse_to_jsonl("openai", src, tmp_path / "out")["threads"] == 0
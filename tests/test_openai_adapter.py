@@ -46,3 +46,105 @@ def test_openai_adapter_basic():
     assert msg["content"]["content_type"] == "text"
     assert msg["content"]["parts"] == ["hello", "world"]
     assert msg["text"] == "hello\nworld"
+
+
+def test_openai_adapter_accepts_decimal_input():
+    from decimal import Decimal
+
+    raw = {
+        "id": "conv-2",
+        "mapping": {
+            "m1": {
+                "parent": None,
+                "children": [],
+                "message": {
+                    "id": Decimal("7"),
+                    "author": {"role": "user"},
+                    "content": {"content_type": "text", "parts": ["hi"]},
+                    "create_time": Decimal("1730000001.25"),
+                },
+            },
+        },
+    }
+
+    (msg,) = openai_adapter(raw)
+    assert msg["ts"] == 1730000001_250
+    assert msg["message_id"] == 7.0
+
+
+def _branched(current_node="u2"):
+    # root -> u1 -> a1 (abandoned) / a1b (regenerated) -> u2
+    def node(nid, parent, children, role, ts):
+        return {
+            "id": nid,
+            "parent": parent,
+            "children": children,
+            "message": {
+                "id": nid,
+                "author": {"role": role},
+                "content": {"content_type": "text", "parts": [nid]},
+                "create_time": ts,
+            },
+        }
+
+    return {
+        "conversation_id": "conv-b",
+        "current_node": current_node,
+        "mapping": {
+            "root": {"id": "root", "parent": None, "children": ["u1"], "message": None},
+            "u1": node("u1", "root", ["a1", "a1b"], "user", 1.0),
+            "a1": node("a1", "u1", [], "assistant", 2.0),
+            "a1b": node("a1b", "u1", ["u2"], "assistant", 3.0),
+            "u2": node("u2", "a1b", [], "user", 4.0),
+        },
+    }
+
+
+def _ids(messages):
+    return [(m["conversation_id"], m["message_id"]) for m in messages]
+
+
+def test_openai_adapter_branch_modes():
+    raw = _branched()
+    assert [m["message_id"] for m in openai_adapter(raw)] == ["u1", "a1", "a1b", "u2"]
+    assert [m["message_id"] for m in openai_adapter(raw, branch="active")] == ["u1", "a1b", "u2"]
+    assert _ids(openai_adapter(raw, branch="all")) == [
+        ("conv-b", "u1"), ("conv-b", "a1b"), ("conv-b", "u2"),
+        ("conv-b~a1", "u1"), ("conv-b~a1", "a1"),
+    ]
+
+
+def test_openai_adapter_active_branch_without_current_node():
+    # falls back to the most recent message
+    raw = _branched(current_node="missing")
+    assert [m["message_id"] for m in openai_adapter(raw, branch="active")] == ["u1", "a1b", "u2"]
+
+    raw["mapping"]["a1"]["message"]["create_time"] = 9.0
+    assert [m["message_id"] for m in openai_adapter(raw, branch="active")] == ["u1", "a1"]
+
+
+def test_node_table_columns_and_linearize():
+    from llm_logparser.core.providers.openai.nodetable import NodeTable
+
+    raw = _branched()
+    table = NodeTable(raw["mapping"])
+    assert table.ids == ["root", "u1", "a1", "a1b", "u2"]
+    assert list(table.parent) == [-1, 0, 1, 1, 3]
+    assert [table.ids[i] for i in table.linearize()] == ["root", "u1", "a1", "a1b", "u2"]
+    assert [table.ids[i] for i in table.path_to(4)] == ["root", "u1", "a1b", "u2"]
+    assert [table.is_leaf(i) for i in range(len(table))] == [False, False, True, False, True]
+
+
+def test_node_table_falls_back_to_parent_pointers():
+    from llm_logparser.core.providers.openai.nodetable import NodeTable
+
+    raw = _branched()
+    for node in raw["mapping"].values():
+        node["children"] = []
+    # a cycle is cut instead of looping; the nodes still appear once
+    raw["mapping"]["x"] = {"id": "x", "parent": "y", "children": [], "message": None}
+    raw["mapping"]["y"] = {"id": "y", "parent": "x", "children": [], "message": None}
+    table = NodeTable(raw["mapping"])
+    order = [table.ids[i] for i in table.linearize()]
+    assert order == ["root", "u1", "a1", "a1b", "u2", "x", "y"]
+    assert [table.ids[i] for i in table.path_to(table.ids.index("x"))] == ["y", "x"]
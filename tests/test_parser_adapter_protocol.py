@@ -0,0 +1,69 @@
+import sys
+import types
+
+import pytest
+
+from llm_logparser.core.parser import LLPAdapterError, _ThreadProcessor, load_adapter
+
+
+def _install_provider(monkeypatch, name: str, **attrs) -> None:
+    mod = types.ModuleType(f"llm_logparser.core.providers.{name}.adapter")
+    for key, value in attrs.items():
+        setattr(mod, key, value)
+    monkeypatch.setitem(sys.modules, mod.__name__, mod)
+
+
+def _messages(conv, source=None):
+    if conv.get("boom"):
+        raise ValueError("bad conversation")
+    return [{"conversation_id": conv["id"], "message_id": "m1", "role": "user", "ts": 1, "text": "hi"}]
+
+
+def test_openai_declares_batch_protocol():
+    spec = load_adapter("openai")
+    assert spec.accepts_source
+    assert spec.batch_func is not None
+
+
+def test_legacy_adapter_is_inspected_once(monkeypatch):
+    _install_provider(monkeypatch, "legacy", get_adapter=lambda: (lambda conv: _messages(conv)))
+    spec = load_adapter("legacy")
+    assert not spec.accepts_source
+    assert spec.batch_func is None
+    assert spec.adapt({"id": "c1"}, "in.json")[0]["conversation_id"] == "c1"
+
+
+def test_declared_batch_without_entry_point_is_rejected(monkeypatch):
+    _install_provider(
+        monkeypatch,
+        "nobatch",
+        get_adapter=lambda: _messages,
+        get_manifest=lambda: {"adapter": {"protocol": 1, "batch": True}},
+    )
+    with pytest.raises(LLPAdapterError):
+        load_adapter("nobatch")
+
+
+def test_batch_failure_falls_back_per_record(monkeypatch):
+    calls = []
+
+    def adapter_batch(convs, *, source=None):
+        calls.append(len(convs))
+        return [_messages(c, source) for c in convs]
+
+    _install_provider(
+        monkeypatch,
+        "batchy",
+        get_adapter=lambda: _messages,
+        adapter_batch=adapter_batch,
+        get_manifest=lambda: {"adapter": {"protocol": 1, "accepts_source": True, "batch": True}},
+    )
+    proc = _ThreadProcessor("batchy", manifest_old={}, dry_run=True, fail_fast=False)
+
+    ok = proc.run_batch([({"id": "a"}, "x.json"), ({"id": "b"}, "x.json"), ({"id": "c"}, "y.json")])
+    assert [r.cid for r in ok] == ["a", "b", "c"]
+    assert calls == [2, 1]  # one call per run of records from the same source
+
+    mixed = proc.run_batch([({"id": "a"}, "x.json"), ({"id": "b", "boom": True}, "x.json")])
+    assert [r.status for r in mixed] == ["ok", "error"]
+    assert mixed[1].error == "adapter error: bad conversation"
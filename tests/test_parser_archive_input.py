@@ -0,0 +1,65 @@
+import bz2
+import gzip
+import json
+import logging
+import lzma
+import zipfile
+
+import pytest
+
+from conftest import conversations
+from llm_logparser.core.parser import iter_json_records, parse_to_jsonl
+
+
+def test_parse_chatgpt_export_zip(tmp_path):
+    archive = tmp_path / "chatgpt-export.zip"
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("chat.html", "<html></html>")
+        zf.writestr("user.json", json.dumps({"id": "user-1"}))
+        zf.writestr(
+            "conversations.json",
+            json.dumps(conversations(ids=["a", "b"]), ensure_ascii=False),
+        )
+
+    out = tmp_path / "out"
+    stats = parse_to_jsonl("openai", archive, out, fail_fast=True, reader="mmap")
+    assert stats["threads"] == 2
+    assert (out / "openai" / "thread-b" / "parsed.jsonl").exists()
+    # nothing extracted next to the archive
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["chatgpt-export.zip", "out"]
+
+
+def test_zip_without_conversations_reads_json_members_in_order(tmp_path):
+    archive = tmp_path / "drop.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("b/messages-00002.jsonl", json.dumps({"n": 2}) + "\n" + json.dumps({"n": 3}) + "\n")
+        zf.writestr("a/messages-00001.jsonl", "﻿" + json.dumps({"n": 1}) + "\n")
+        zf.writestr("readme.txt", "ignored")
+
+    records = list(iter_json_records(archive, logging.getLogger("test")))
+    assert [r["n"] for r in records] == [1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "suffix,opener",
+    [(".gz", gzip.open), (".bz2", bz2.open), (".xz", lzma.open)],
+)
+def test_compressed_inputs_are_sniffed_after_decompression(tmp_path, suffix, opener):
+    logger = logging.getLogger("test")
+    # misleading names on purpose: detection is by magic bytes
+    array = tmp_path / f"export.bin{suffix}"
+    with opener(array, "wb") as f:
+        f.write(b"\xef\xbb\xbf " + json.dumps([{"n": 1}, {"n": 2}]).encode())
+    assert [r["n"] for r in iter_json_records(array, logger)] == [1, 2]
+
+    lines = tmp_path / f"messages-00001.jsonl{suffix}"
+    with opener(lines, "wb") as f:
+        f.write(b'{"n": 1}\n\n{"n": 2}\n')
+    assert [r["n"] for r in iter_json_records(lines, logger)] == [1, 2]
+
+
+def test_zstd_input(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    p = tmp_path / "conversations.json.zst"
+    p.write_bytes(zstandard.ZstdCompressor().compress(json.dumps([{"n": 1}]).encode()))
+    assert list(iter_json_records(p, logging.getLogger("test"))) == [{"n": 1}]
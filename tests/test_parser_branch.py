@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from conftest import thread_files
+from llm_logparser.core.parser import AdapterSpec, parse_to_jsonl
+
+
+def _conversation(cid: str) -> dict:
+    def node(nid, parent, children, role, ts):
+        return {
+            "id": nid,
+            "parent": parent,
+            "children": children,
+            "message": {
+                "id": f"{cid}-{nid}",
+                "author": {"role": role},
+                "content": {"content_type": "text", "parts": [f"{cid} {nid}"]},
+                "create_time": ts,
+            },
+        }
+
+    return {
+        "id": cid,
+        "conversation_id": cid,
+        "update_time": 10.0,
+        "current_node": "u2",
+        "mapping": {
+            "root": {"id": "root", "parent": None, "children": ["u1"], "message": None},
+            "u1": node("u1", "root", ["a1", "a1b"], "user", 1.0),
+            "a1": node("a1", "u1", [], "assistant", 2.0),
+            "a1b": node("a1b", "u1", ["u2"], "assistant", 3.0),
+            "u2": node("u2", "a1b", [], "user", 4.0),
+        },
+    }
+
+
+def _write(tmp_path: Path) -> Path:
+    src = tmp_path / "conversations.json"
+    src.write_text(json.dumps([_conversation("c0"), _conversation("c1")]), encoding="utf-8")
+    return src
+
+
+def _manifest(provider_dir: Path) -> dict:
+    return json.loads((provider_dir / "manifest.json").read_text(encoding="utf-8"))
+
+
+def test_active_branch_drops_abandoned_messages(tmp_path):
+    src = _write(tmp_path)
+    stats = parse_to_jsonl("openai", src, tmp_path / "out", branch="active")
+    assert stats["threads"] == 2 and stats["messages"] == 6
+    manifest = _manifest(tmp_path / "out" / "openai")
+    assert manifest["branch"] == "active"
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_all_branches_become_thread_variants(tmp_path, jobs):
+    src = _write(tmp_path)
+    stats = parse_to_jsonl("openai", src, tmp_path / "out", branch="all", jobs=jobs)
+    assert stats["threads"] == 4 and stats["messages"] == 10
+
+    provider_dir = tmp_path / "out" / "openai"
+    assert sorted(thread_files(provider_dir)) == ["thread-c0", "thread-c0~a1", "thread-c1", "thread-c1~a1"]
+    entries = {e["conversation_id"]: e for e in _manifest(provider_dir)["index"]["threads"]}
+    assert entries["c0"]["variants"] == ["c0~a1"]
+    assert entries["c0~a1"]["count"] == 2
+
+
+def test_all_branches_rerun_skips_and_keeps_variants(tmp_path, monkeypatch):
+    src, out = _write(tmp_path), tmp_path / "out"
+    parse_to_jsonl("openai", src, out, branch="all")
+    before = _manifest(out / "openai")["index"]
+
+    calls = []
+    original = AdapterSpec.iter_adapt
+    monkeypatch.setattr(
+        AdapterSpec, "iter_adapt", lambda self, raw, *a: calls.append(raw["id"]) or original(self, raw, *a)
+    )
+    assert parse_to_jsonl("openai", src, out, branch="all")["threads"] == 0
+    assert calls == []
+    assert _manifest(out / "openai")["index"] == before
+
+    # a missing branch thread forces that record through the adapter again
+    (out / "openai" / "thread-c1~a1" / "parsed.jsonl").unlink()
+    assert parse_to_jsonl("openai", src, out, branch="all")["threads"] == 1
+    assert calls == ["c1"]
+
+
+def test_changing_branch_mode_reparses(tmp_path):
+    src, out = _write(tmp_path), tmp_path / "out"
+    parse_to_jsonl("openai", src, out)
+    stats = parse_to_jsonl("openai", src, out, branch="active")
+    assert stats["threads"] == 2 and stats["messages"] == 6
+    assert parse_to_jsonl("openai", src, out)["messages"] == 8
@@ -0,0 +1,155 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from conftest import conversations, edit_message, write_conversations
+from llm_logparser.core.parser import AdapterSpec, parse_to_jsonl
+
+
+def _manifest(out: Path) -> dict:
+    data = json.loads((out / "openai" / "manifest.json").read_text(encoding="utf-8"))
+    return {t["conversation_id"]: t for t in data["index"]["threads"]}
+
+
+@pytest.fixture
+def adapter_calls(monkeypatch):
+    calls = []
+    original = AdapterSpec.adapt_batch
+
+    def counting(self, raws, source, *args):
+        calls.extend(r["id"] for r in raws)
+        return original(self, raws, source, *args)
+
+    monkeypatch.setattr(AdapterSpec, "adapt_batch", counting)
+    return calls
+
+
+def test_unchanged_threads_skip_adapter_and_stay_in_manifest(tmp_path, adapter_calls):
+    src, out = tmp_path / "conversations.json", tmp_path / "out"
+    write_conversations(src, conversations(3))
+
+    first = parse_to_jsonl("openai", src, out)
+    before = _manifest(out)
+    adapter_calls.clear()
+
+    second = parse_to_jsonl("openai", src, out)
+    assert adapter_calls == []
+    assert second["threads"] == 0 and second["skipped"] == first["threads"]
+    assert _manifest(out) == before
+    assert all(e["digest"].startswith("sha256:") for e in before.values())
+
+
+def test_updated_thread_is_rewritten(tmp_path, adapter_calls):
+    src, out = tmp_path / "conversations.json", tmp_path / "out"
+    convs = conversations(3)
+    write_conversations(src, convs)
+    parse_to_jsonl("openai", src, out)
+    adapter_calls.clear()
+
+    edit_message(convs[1], "edited")
+    convs[1]["update_time"] += 10
+    write_conversations(src, convs)
+    stats = parse_to_jsonl("openai", src, out)
+
+    assert adapter_calls == ["conv-1"]
+    assert stats["threads"] == 1
+    assert "edited" in (out / "openai" / "thread-conv-1" / "parsed.jsonl").read_text(encoding="utf-8")
+    assert _manifest(out)["conv-1"]["update_time"] == convs[1]["update_time"]
+
+
+def test_content_digest_catches_edits_without_update_time(tmp_path):
+    src, out = tmp_path / "conversations.json", tmp_path / "out"
+    convs = conversations(3)
+    for conv in convs:
+        del conv["update_time"]
+    write_conversations(src, convs)
+    parse_to_jsonl("openai", src, out)
+
+    assert parse_to_jsonl("openai", src, out)["threads"] == 0  # same digest
+
+    edit_message(convs[2], "edited")
+    write_conversations(src, convs)
+    assert parse_to_jsonl("openai", src, out)["threads"] == 1
+
+
+def test_missing_thread_file_is_regenerated(tmp_path):
+    src, out = tmp_path / "conversations.json", tmp_path / "out"
+    write_conversations(src, conversations(3))
+    parse_to_jsonl("openai", src, out)
+
+    (out / "openai" / "thread-conv-0" / "parsed.jsonl").unlink()
+    stats = parse_to_jsonl("openai", src, out)
+    assert stats["threads"] == 1
+    assert (out / "openai" / "thread-conv-0" / "parsed.jsonl").exists()
+
+
+def test_older_update_time_keeps_cached_thread(tmp_path, caplog):
+    src, out = tmp_path / "conversations.json", tmp_path / "out"
+    convs = conversations(1)
+    write_conversations(src, convs)
+    parse_to_jsonl("openai", src, out)
+    before = _manifest(out)
+
+    convs[0]["update_time"] -= 10
+    edit_message(convs[0], "stale")
+    write_conversations(src, convs)
+    stats = parse_to_jsonl("openai", src, out)
+
+    assert stats["threads"] == 0
+    assert _manifest(out) == before
+    assert "older than the cached thread" in caplog.text
+
+
+def test_mmap_reader_skips_unchanged_threads_without_decoding(tmp_path, monkeypatch):
+    from llm_logparser.core.scanner import RecordSpan
+
+    src, out = tmp_path / "conversations.json", tmp_path / "out"
+    convs = conversations(3)
+    write_conversations(src, convs)
+    parse_to_jsonl("openai", src, out, reader="mmap")
+    before = _manifest(out)
+
+    loaded = []
+    original = RecordSpan.load
+
+    def counting(self):
+        loaded.append(self.index)
+        return original(self)
+
+    monkeypatch.setattr(RecordSpan, "load", counting)
+    convs[2]["update_time"] += 1
+    write_conversations(src, convs)
+    stats = parse_to_jsonl("openai", src, out, reader="mmap")
+
+    assert loaded == [3]  # only the conversation with a new update_time is decoded
+    assert stats["threads"] == 0  # ...and its content digest is unchanged
+    assert _manifest(out)["conv-2"]["update_time"] == convs[2]["update_time"]
+    assert {k: v for k, v in _manifest(out).items() if k != "conv-2"} == {
+        k: v for k, v in before.items() if k != "conv-2"
+    }
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_rerun_with_duplicate_thread_across_inputs_matches_cold_run(tmp_path, jobs):
+    (newer,) = conversations(1)
+    older = copy.deepcopy(newer)
+    newer["update_time"] = 200.0
+    older["update_time"] = 100.0  # the later file holds the older copy, and still wins
+    edit_message(older, "from the later file")
+    inputs = [tmp_path / "1.json", tmp_path / "2.json"]
+    write_conversations(inputs[0], [newer])
+    write_conversations(inputs[1], [older])
+
+    cold = tmp_path / "cold"
+    parse_to_jsonl("openai", inputs, cold, jobs=jobs)
+    out = tmp_path / "out"
+    for _ in range(3):
+        parse_to_jsonl("openai", inputs, out, jobs=jobs)
+        entry = _manifest(out)["conv-0"]
+        assert entry["update_time"] == 100.0
+        assert entry == _manifest(cold)["conv-0"]  # digest included
+        data = (out / "openai" / entry["path"]).read_bytes()
+        assert data == (cold / "openai" / entry["path"]).read_bytes()
+        assert b"from the later file" in data
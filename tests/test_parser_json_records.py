@@ -13,3 +13,133 @@ def test_iter_json_records_handles_bom(tmp_path):
     records = list(iter_json_records(p, logger))
     assert len(records) == 1
     assert records[0]["foo"] == 1
+
+
+def test_iter_json_records_array_decodes_floats(tmp_path):
+    p = tmp_path / "conversations.json"
+    p.write_bytes(b"\xef\xbb\xbf\n [{\"create_time\": 1730000001.5, \"n\": 2}, 3]")
+
+    logger = logging.getLogger("test")
+    records = list(iter_json_records(p, logger))
+    assert records == [{"create_time": 1730000001.5, "n": 2}]
+    assert type(records[0]["create_time"]) is float
+
+
+_TRICKY = (
+    '[ {"a": "x,]}\\"[{", "n": -1.5e+3, "u": "\\u00e9\\ud83d\\ude00 é😀"},'
+    ' 12345, true, null, "s", [1, [2, {"b": []}]], {}, -0.25e-2 ]'
+)
+
+
+def test_iter_array_items_matches_json_loads_at_any_chunk_size():
+    import io
+    import json
+
+    from llm_logparser.core.parser import iter_array_items
+
+    data = _TRICKY.encode("utf-8")
+    for chunk_size in (1, 2, 3, 5, 7, 16, 1 << 16):
+        items = list(iter_array_items(io.BytesIO(data), chunk_size=chunk_size))
+        assert items == json.loads(data), chunk_size
+    assert list(iter_array_items(io.BytesIO(b"  [ ] "))) == []
+
+
+def test_iter_array_items_rejects_malformed_input():
+    import io
+
+    import pytest
+
+    from llm_logparser.core.parser import LLPInputError, iter_array_items
+
+    for bad in (b'[{"a": 1} {"b": 2}]', b'[{"a": 1}, {"b": ]', b'[{"a": "open', b'{"a": 1}'):
+        with pytest.raises(LLPInputError):
+            list(iter_array_items(io.BytesIO(bad), chunk_size=4))
+
+
+def test_iter_json_records_without_ijson_streams_the_array(tmp_path, monkeypatch):
+    from llm_logparser.core import parser
+
+    p = tmp_path / "conversations.json"
+    p.write_bytes(b"\xef\xbb\xbf\n [{\"create_time\": 1730000001.5, \"n\": 2}, 3, {\"n\": 3}]")
+    monkeypatch.setattr(parser, "select_ijson_backend", lambda: None)
+
+    logger = logging.getLogger("test")
+    records = list(iter_json_records(p, logger))
+    assert records == [{"create_time": 1730000001.5, "n": 2}, {"n": 3}]
+
+
+def test_iter_jsonl_reads_blocks_and_reports_bad_lines(tmp_path, monkeypatch, caplog):
+    from llm_logparser.core import parser
+
+    lines = [b'{"n": 1, "text": "' + b"x" * 40 + b'"}', b"", b"{broken", b'{"n": 2}\r', b"\xff\xfe", b'{"n": 3}']
+    p = tmp_path / "log.jsonl"
+    p.write_bytes(b"\xef\xbb\xbf" + b"\n".join(lines))  # no trailing newline
+
+    for block_size in (7, 1 << 20):
+        monkeypatch.setattr(parser, "JSONL_BLOCK_SIZE", block_size)
+        caplog.clear()
+        records = list(iter_json_records(p, logging.getLogger("test")))
+        assert [r["n"] for r in records] == [1, 2, 3]
+
+        bad = [r.getMessage() for r in caplog.records if "invalid JSON line" in r.getMessage()]
+        offset = 3 + len(lines[0]) + 1 + 1
+        assert bad[0].startswith(f"skip invalid JSON line (3, byte {offset})")
+        offset += len(lines[2]) + 1 + len(lines[3]) + 1
+        assert bad[1].startswith(f"skip invalid JSON line (5, byte {offset})")
+        assert len(bad) == 2
+
+
+def test_iter_jsonl_line_numbers_count_leading_blank_lines(tmp_path, caplog):
+    p = tmp_path / "log.jsonl"
+    p.write_bytes(b"\xef\xbb\xbf\n\n  \n" + b'{"n": 1}\n{broken\n')
+
+    records = list(iter_json_records(p, logging.getLogger("test")))
+    assert records == [{"n": 1}]
+    bad = [r.getMessage() for r in caplog.records if "invalid JSON line" in r.getMessage()]
+    assert bad[0].startswith(f"skip invalid JSON line (5, byte {3 + 5 + 9})")
+
+
+def test_jsonl_under_another_suffix_is_streamed(tmp_path, monkeypatch, caplog):
+    import io
+
+    from llm_logparser.core import parser
+
+    monkeypatch.setattr(parser, "JSONL_BLOCK_SIZE", 64 * 1024)
+    lines = [b'{"n": %d, "pad": "%s"}\n' % (i, b"x" * 200) for i in range(5000)]
+    data = b"\n" + b"".join(lines[:2]) + b"{broken\n" + b"".join(lines[2:])
+
+    raw = io.BytesIO(data)
+    records = parser._iter_stream_records(io.BufferedReader(raw), "app.log", logging.getLogger("test"))
+    assert [next(records)["n"] for _ in range(3)] == [0, 1, 2]
+    assert raw.tell() < len(data) // 10  # not read whole
+    assert sum(1 for _ in records) == 5000 - 3
+    (bad,) = [r.getMessage() for r in caplog.records if "invalid JSON line" in r.getMessage()]
+    assert bad.startswith(f"skip invalid JSON line (4, byte {1 + len(lines[0]) + len(lines[1])})")
+
+    # a multi-line document is still one object
+    pretty = tmp_path / "conversation.json"
+    pretty.write_text('{\n  "id": "c",\n  "n": 1\n}\n', encoding="utf-8")
+    assert list(iter_json_records(pretty, logging.getLogger("test"))) == [{"id": "c", "n": 1}]
+
+
+def test_iter_json_records_with_ijson_before_use_float(tmp_path, monkeypatch):
+    from llm_logparser.core import parser
+
+    p = tmp_path / "conversations.json"
+    p.write_bytes(b'[{"create_time": 1730000001.5, "n": [2, 0.25]}]')
+    python_backend = parser.ijson.get_backend("python")
+
+    class OldBackend:  # ijson 3.0: Decimal numbers, use_float fails once iterated
+        backend_name = "python"
+
+        @staticmethod
+        def items(source, prefix, **config):
+            assert "use_float" not in config
+            return python_backend.items(source, prefix, **config)
+
+    monkeypatch.setattr(parser.ijson, "__version__", "3.0.4")
+    monkeypatch.setattr(parser, "select_ijson_backend", lambda: OldBackend)
+
+    records = list(iter_json_records(p, logging.getLogger("test")))
+    assert records == [{"create_time": 1730000001.5, "n": [2, 0.25]}]
+    assert type(records[0]["create_time"]) is float and type(records[0]["n"][0]) is int
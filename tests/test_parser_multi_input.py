@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from conftest import conversations
+from llm_logparser.cli.cli import resolve_input_paths
+from llm_logparser.core.parser import parse_to_jsonl
+
+
+def test_resolve_input_paths_dirs_globs_and_repeats(tmp_path):
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    for name in ("messages-00002.jsonl", "messages-00001.jsonl", "notes.txt"):
+        (drop / name).write_text("{}\n", encoding="utf-8")
+    single = tmp_path / "conversations.json"
+    single.write_text("[]", encoding="utf-8")
+
+    paths = resolve_input_paths([str(drop), str(drop / "*.jsonl"), str(single)])
+    assert [p.name for p in paths] == [
+        "messages-00001.jsonl",
+        "messages-00002.jsonl",
+        "conversations.json",
+    ]
+
+    with pytest.raises(FileNotFoundError):
+        resolve_input_paths([str(tmp_path / "missing-*.json")])
+
+
+def test_parse_merges_manifest_across_files(tmp_path):
+    files = []
+    for i, cids in enumerate((["a", "b"], ["c"], ["b", "d"])):
+        p = tmp_path / f"messages-{i:05d}.jsonl"
+        p.write_text(
+            "".join(json.dumps(c, ensure_ascii=False) + "\n" for c in conversations(ids=cids)),
+            encoding="utf-8",
+        )
+        files.append(p)
+
+    out = tmp_path / "out"
+    stats = parse_to_jsonl("openai", files, out, fail_fast=True, readers=2)
+    assert stats["errors"] == 0
+
+    manifest = json.loads((out / "openai" / "manifest.json").read_text(encoding="utf-8"))
+    threads = manifest["index"]["threads"]
+    assert [t["conversation_id"] for t in threads] == ["a", "b", "c", "d"]
+    # "b" is written twice but counted once
+    assert stats["threads"] == 4
+    assert stats["messages"] == sum(t["count"] for t in threads)
+    for cid in "abcd":
+        assert (out / "openai" / f"thread-{cid}" / "parsed.jsonl").exists()
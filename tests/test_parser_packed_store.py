@@ -0,0 +1,140 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from conftest import conversations, thread_files, write_conversations
+from llm_logparser.core import parser
+from llm_logparser.core.exporter import export_thread_md
+from llm_logparser.core.parser import parse_to_jsonl
+from llm_logparser.core.store import PACK_DATA_NAME, find_parsed_threads, iter_packed_threads, unpack
+
+
+def _packed(provider_dir: Path) -> dict:
+    return {t.name: t.read_bytes() for t in iter_packed_threads(provider_dir)}
+
+
+def test_packed_layout_holds_the_same_threads(tmp_path):
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations())
+
+    dirs = parse_to_jsonl("openai", src, tmp_path / "dirs")
+    packed = parse_to_jsonl("openai", src, tmp_path / "packed", layout="packed")
+    assert dirs == packed
+
+    provider_dir = tmp_path / "packed" / "openai"
+    assert not list(provider_dir.glob("thread-*"))
+    assert _packed(provider_dir) == thread_files(tmp_path / "dirs" / "openai")
+
+    manifest = json.loads((provider_dir / "manifest.json").read_text())
+    entry = manifest["index"]["threads"][1]
+    assert entry["path"] == PACK_DATA_NAME and entry["offset"] > 0 and entry["length"] > 0
+
+
+def test_exporter_and_validator_read_packed_threads(tmp_path):
+    from llm_logparser.core.schema_validation import validate_parsed_jsonl
+
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations(1))
+    parse_to_jsonl("openai", src, tmp_path / "dirs")
+    parse_to_jsonl("openai", src, tmp_path / "packed", layout="packed")
+
+    (thread,) = find_parsed_threads(tmp_path / "packed")
+    file = tmp_path / "dirs" / "openai" / "thread-conv-0" / "parsed.jsonl"
+
+    from_pack = export_thread_md(thread, tmp_path / "a" / "out.md")
+    from_file = export_thread_md(file, tmp_path / "b" / "out.md")
+    assert from_pack[0].read_text(encoding="utf-8") == from_file[0].read_text(encoding="utf-8")
+
+    from_pack, from_file = validate_parsed_jsonl(thread), validate_parsed_jsonl(file)
+    assert from_pack.ok == from_file.ok
+    assert [(v.location, v.message) for v in from_pack.violations] == [
+        (v.location, v.message) for v in from_file.violations
+    ]
+
+
+def test_packed_rerun_appends_only_changed_threads(tmp_path):
+    src, out = tmp_path / "conversations.json", tmp_path / "out"
+    provider_dir = out / "openai"
+    write_conversations(src, conversations())
+    parse_to_jsonl("openai", src, out, layout="packed")
+    size = (provider_dir / PACK_DATA_NAME).stat().st_size
+
+    assert parse_to_jsonl("openai", src, out, layout="packed")["threads"] == 0
+    assert (provider_dir / PACK_DATA_NAME).stat().st_size == size
+
+    write_conversations(src, conversations(edit=["conv-2"]))
+    assert parse_to_jsonl("openai", src, out, layout="packed")["threads"] == 1
+    threads = {t.conversation_id: t for t in iter_packed_threads(provider_dir)}
+    assert threads["conv-2"].offset == size
+    assert b"edited" in threads["conv-2"].read_bytes()
+    assert threads["conv-1"].offset < size
+
+
+def test_unpack_restores_directory_layout(tmp_path):
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations())
+    parse_to_jsonl("openai", src, tmp_path / "dirs")
+    parse_to_jsonl("openai", src, tmp_path / "packed", layout="packed")
+
+    provider_dir = tmp_path / "packed" / "openai"
+    assert unpack(provider_dir, remove_pack=True) == 4
+    assert thread_files(provider_dir) == thread_files(tmp_path / "dirs" / "openai")
+    assert not (provider_dir / PACK_DATA_NAME).exists()
+
+    def entries(root):
+        data = json.loads((root / "openai" / "manifest.json").read_text())
+        return data["index"]["threads"]
+
+    assert entries(tmp_path / "packed") == entries(tmp_path / "dirs")
+
+
+def test_packed_resume_truncates_uncheckpointed_bytes(tmp_path, monkeypatch):
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations(6))
+    parse_to_jsonl("openai", src, tmp_path / "full", layout="packed")
+
+    out = tmp_path / "resumed"
+    original = parser._ThreadProcessor._finish
+    calls = {"n": 0}
+
+    def flaky(self, recs, *args):
+        calls["n"] += 1
+        if calls["n"] > 3:
+            raise KeyboardInterrupt
+        return original(self, recs, *args)
+
+    with monkeypatch.context() as m:
+        m.setattr(parser._ThreadProcessor, "_finish", flaky)
+        with pytest.raises(KeyboardInterrupt):
+            parse_to_jsonl("openai", src, out, layout="packed", checkpoint_interval=2, batch_size=1)
+
+    parse_to_jsonl("openai", src, out, layout="packed", resume=True)
+    for name in (PACK_DATA_NAME, "threads.idx"):
+        assert (out / "openai" / name).read_bytes() == (tmp_path / "full" / "openai" / name).read_bytes()
+
+
+@pytest.mark.parametrize("via_unpack", [False, True])
+def test_dirs_reparse_after_packed_supersedes_the_pack(tmp_path, via_unpack):
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations())
+    out = tmp_path / "out"
+    parse_to_jsonl("openai", src, out, layout="packed")
+    provider_dir = out / "openai"
+    if via_unpack:
+        unpack(provider_dir)
+        assert not (provider_dir / "threads.idx").exists()
+
+    write_conversations(src, conversations(edit=["conv-2"]))
+    parse_to_jsonl("openai", src, out, layout="dirs")
+
+    found = {t.parent.name if isinstance(t, Path) else t.name: t for t in find_parsed_threads(provider_dir)}
+    assert len(found) == 4
+    assert isinstance(found["thread-conv-2"], Path)  # not the stale packed copy
+    assert b"edited" in found["thread-conv-2"].read_bytes()
+    remaining = {t.name for t in iter_packed_threads(provider_dir)}
+    assert "thread-conv-2" not in remaining
+
+    manifest = json.loads((provider_dir / "manifest.json").read_text())
+    in_pack = {f"thread-{e['conversation_id']}" for e in manifest["index"]["threads"] if e["path"] == PACK_DATA_NAME}
+    assert remaining == in_pack
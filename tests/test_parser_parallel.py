@@ -0,0 +1,31 @@
+import json
+
+from conftest import conversations, snapshot, write_conversations
+from llm_logparser.core.parser import parse_to_jsonl
+
+
+def test_parallel_parse_matches_serial(tmp_path):
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations(6))
+
+    serial = parse_to_jsonl("openai", src, tmp_path / "serial", fail_fast=True)
+    parallel = parse_to_jsonl("openai", src, tmp_path / "parallel", fail_fast=True, jobs=3)
+
+    assert serial == parallel
+    assert serial["threads"] == 6
+    assert snapshot(tmp_path / "serial") == snapshot(tmp_path / "parallel")
+
+    manifest = json.loads((tmp_path / "parallel" / "openai" / "manifest.json").read_text())
+    cids = [t["conversation_id"] for t in manifest["index"]["threads"]]
+    assert cids == [f"conv-{i}" for i in range(6)]
+
+
+def test_mmap_reader_matches_stream_reader(tmp_path):
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations(6))
+
+    stream = parse_to_jsonl("openai", src, tmp_path / "stream", fail_fast=True)
+    mapped = parse_to_jsonl("openai", src, tmp_path / "mmap", fail_fast=True, jobs=2, reader="mmap")
+
+    assert stream == mapped
+    assert snapshot(tmp_path / "stream") == snapshot(tmp_path / "mmap")
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from conftest import conversations, snapshot, write_conversations
+from llm_logparser.core import parser, scanner
+from llm_logparser.core.checkpoint import CHECKPOINT_NAME
+from llm_logparser.core.parser import parse_to_jsonl
+
+
+def _interrupt_after(monkeypatch, n: int) -> None:
+    """Make the n+1-th processed record raise KeyboardInterrupt."""
+    original = parser._ThreadProcessor._finish
+    calls = {"n": 0}
+
+    def flaky(self, recs, *args):
+        calls["n"] += 1
+        if calls["n"] > n:
+            raise KeyboardInterrupt
+        return original(self, recs, *args)
+
+    monkeypatch.setattr(parser._ThreadProcessor, "_finish", flaky)
+
+
+@pytest.mark.parametrize("reader", ["stream", "mmap"])
+def test_resume_matches_uninterrupted_run(tmp_path, monkeypatch, reader):
+    inputs = [tmp_path / "a.json", tmp_path / "b.json"]
+    write_conversations(inputs[0], conversations(ids=[f"a-{i}" for i in range(4)]))
+    write_conversations(inputs[1], conversations(ids=[f"b-{i}" for i in range(4)]))
+
+    full = parse_to_jsonl("openai", inputs, tmp_path / "full", reader=reader)
+
+    out = tmp_path / "resumed"
+    with monkeypatch.context() as m:
+        _interrupt_after(m, 5)
+        with pytest.raises(KeyboardInterrupt):
+            parse_to_jsonl(
+                "openai", inputs, out, reader=reader, readers=1, checkpoint_interval=2, batch_size=1
+            )
+    assert (out / "openai" / CHECKPOINT_NAME).exists()
+    assert not (out / "openai" / "manifest.json").exists()
+    assert not scanner._MAPS  # the failed run released its mapped inputs
+
+    seen = []
+    original = parser._ThreadProcessor._finish
+
+    def recording(self, recs, *args):
+        seen.append(recs[0]["conversation_id"])
+        return original(self, recs, *args)
+
+    monkeypatch.setattr(parser._ThreadProcessor, "_finish", recording)
+    resumed = parse_to_jsonl("openai", inputs, out, reader=reader, resume=True)
+
+    # the interrupted run finished 5 records; everything after them is redone
+    assert seen == ["b-1", "b-2", "b-3"]
+    assert resumed == full
+    assert not (out / "openai" / CHECKPOINT_NAME).exists()
+    assert snapshot(out) == snapshot(tmp_path / "full")
+
+
+def test_interrupted_run_stops_prefetch_readers_before_unmapping(tmp_path, monkeypatch):
+    import threading
+
+    inputs = [tmp_path / f"{k}.json" for k in "abcd"]
+    for path in inputs:  # more records than a prefetch queue holds: readers are still busy
+        write_conversations(path, conversations(ids=[f"{path.stem}-{i}" for i in range(100)]))
+
+    unmapped_while_reading = []
+    release = scanner.release_maps
+
+    def checked_release():
+        unmapped_while_reading.extend(t.name for t in threading.enumerate() if t.name.startswith("llp-reader"))
+        release()
+
+    monkeypatch.setattr(parser, "release_maps", checked_release)
+    _interrupt_after(monkeypatch, 1)
+    with pytest.raises(KeyboardInterrupt):
+        parse_to_jsonl("openai", inputs, tmp_path / "out", reader="mmap", readers=4, batch_size=1)
+    assert unmapped_while_reading == []
+    assert not scanner._MAPS
+
+
+def test_resume_ignores_checkpoint_for_changed_input(tmp_path, monkeypatch):
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations(ids=[f"c-{i}" for i in range(4)]))
+
+    with monkeypatch.context() as m:
+        _interrupt_after(m, 2)
+        with pytest.raises(KeyboardInterrupt):
+            parse_to_jsonl("openai", src, tmp_path / "out", checkpoint_interval=1, batch_size=1)
+
+    write_conversations(src, conversations(ids=[f"c-{i}" for i in range(5)]))
+    stats = parse_to_jsonl("openai", src, tmp_path / "out", resume=True)
+    assert stats["threads"] == 5
+    manifest = json.loads((tmp_path / "out" / "openai" / "manifest.json").read_text())
+    assert [t["conversation_id"] for t in manifest["index"]["threads"]] == [f"c-{i}" for i in range(5)]
@@ -0,0 +1,50 @@
+import pstats
+
+import pytest
+
+from conftest import conversations, write_conversations
+from llm_logparser.core.exporter import export_thread_md
+from llm_logparser.core.parser import parse_to_jsonl
+from llm_logparser.core.profiling import ProfilingStageTimes
+from llm_logparser.core.runstats import RunStats
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_profile_writes_one_pstats_per_stage(tmp_path, jobs):
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations())
+    profiler = ProfilingStageTimes(tmp_path / "prof")
+
+    parse_to_jsonl(
+        "openai", src, tmp_path / "out", jobs=jobs, batch_size=1, run_stats=RunStats("chain", profiler)
+    )
+    (parsed, *_) = sorted((tmp_path / "out").rglob("parsed.jsonl"))
+    with profiler.profiled("export"):
+        export_thread_md(parsed, tmp_path / "md" / "out.md")
+    summary = profiler.write_report(top=5)
+
+    names = {p.name for p in (tmp_path / "prof").iterdir()}
+    assert {"read.pstats", "adapter.pstats", "serialize.pstats", "write.pstats", "export.pstats"} <= names
+    assert not [n for n in names if ".worker-" in n or ".main." in n]  # merged
+    text = summary.read_text(encoding="utf-8")
+    assert "==== stage: adapter" in text and "adapter.py" in text
+    # the summary only lists the top functions by own time; the stage file has them all
+    export = pstats.Stats(str(tmp_path / "prof" / "export.pstats"))
+    assert "export_thread_md" in {func for _, _, func in export.stats}
+
+
+def test_profile_memory_reports_top_allocations(tmp_path):
+    import tracemalloc
+
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations())
+    profiler = ProfilingStageTimes(tmp_path / "prof", memory=True)
+
+    parse_to_jsonl("openai", src, tmp_path / "out", run_stats=RunStats("parse", profiler))
+    report = profiler.memory_report("parse", top=3)
+    profiler.write_report(top=3)
+
+    lines = report.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "phase: parse"
+    assert len([line for line in lines if "size=" in line]) == 3
+    assert not tracemalloc.is_tracing()
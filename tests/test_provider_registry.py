@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+import types
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from llm_logparser.core.parser import LLPAdapterError, load_adapter
+from llm_logparser.core.providers.openai.adapter import get_manifest
+from llm_logparser.core.providers.registry import (
+    BUILTIN_PROVIDERS,
+    ProviderRegistry,
+    UnknownProviderError,
+    describe_manifest,
+)
+
+PLUGIN_MODULE = "llp_test_plugin.adapter"
+
+
+def _plugin_module(monkeypatch):
+    mod = types.ModuleType(PLUGIN_MODULE)
+    mod.get_adapter = lambda: (lambda conv: [])
+    mod.get_manifest = lambda: {
+        "input_format": "plugin_export_v1",
+        "adapter": {"protocol": 1, "batch": False, "update_time_field": "updated"},
+    }
+    monkeypatch.setitem(sys.modules, PLUGIN_MODULE, mod)
+
+
+def _registry(tmp_path, *eps):
+    return ProviderRegistry(
+        entry_points=lambda: [EntryPoint(name, value, "llm_logparser.providers") for name, value in eps],
+        cache_path=tmp_path / "providers.json",
+    )
+
+
+def test_builtin_metadata_matches_manifest():
+    (openai,) = BUILTIN_PROVIDERS
+    assert describe_manifest(get_manifest()) == (openai.input_formats, openai.capabilities)
+
+
+def test_plugin_metadata_is_cached_after_first_load(tmp_path, monkeypatch):
+    _plugin_module(monkeypatch)
+    registry = _registry(tmp_path, ("plug", PLUGIN_MODULE))
+    info = registry.get("plug")
+    assert info.origin == "entry point" and not info.described
+
+    spec = load_adapter("plug", registry=registry)
+    assert spec.provider == "plug"
+    cached = json.loads((tmp_path / "providers.json").read_text(encoding="utf-8"))
+    assert cached["providers"]["plug"]["input_formats"] == ["plugin_export_v1"]
+
+    # a fresh registry describes the plugin without importing it
+    monkeypatch.delitem(sys.modules, PLUGIN_MODULE)
+    fresh = _registry(tmp_path, ("plug", PLUGIN_MODULE)).get("plug")
+    assert fresh.described
+    assert fresh.capabilities == ("incremental",)
+    assert PLUGIN_MODULE not in sys.modules
+
+
+def test_builtin_ids_cannot_be_overridden(tmp_path):
+    registry = _registry(tmp_path, ("openai", "elsewhere.adapter"))
+    assert registry.get("openai").origin == "builtin"
+
+
+def test_unknown_provider(tmp_path):
+    registry = _registry(tmp_path)
+    with pytest.raises(UnknownProviderError, match="available: openai"):
+        registry.import_module("nosuch")
+    with pytest.raises(UnknownProviderError):
+        registry.get("../openai")
+    with pytest.raises(LLPAdapterError):
+        load_adapter("nosuch", registry=registry)
+
+
+def test_listing_and_help_import_no_adapter(tmp_path):
+    code = (
+        "import sys\n"
+        "from llm_logparser.cli.cli import main\n"
+        "for argv in (['providers'], ['--help'], ['parse', '--help']):\n"
+        "    sys.argv = ['llm-logparser', *argv]\n"
+        "    try:\n"
+        "        main()\n"
+        "    except SystemExit:\n"
+        "        pass\n"
+        "bad = [m for m in sys.modules if m.endswith('.adapter') or m.split('.')[0] == 'jsonschema']\n"
+        "print('LOADED', bad)\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path), "LLM_LOGPARSER_CACHE_DIR": str(tmp_path)}
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True).stdout
+    assert "openai\tbuiltin" in out
+    assert "LOADED []" in out
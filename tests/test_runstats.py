@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from conftest import conversations, write_conversations
+from llm_logparser.core.exporter import export_thread_md
+from llm_logparser.core.parser import parse_to_jsonl
+from llm_logparser.core.runstats import RunStats
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_parse_report_has_stage_times_and_counts(tmp_path, jobs):
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations())
+    run_stats = RunStats("parse")
+
+    stats = parse_to_jsonl("openai", src, tmp_path / "out", jobs=jobs, run_stats=run_stats)
+    report = json.loads(run_stats.write_json(tmp_path / "stats.json").read_text(encoding="utf-8"))
+
+    # worker stage times (jobs=2) are shipped back and merged
+    assert {"read", "adapter", "validate", "serialize", "write"} <= set(report["stages"])
+    assert report["stages"]["serialize"]["calls"] == 4
+    counts = report["counts"]
+    assert counts["records"] == 4 and counts["threads"] == stats["threads"] == 4
+    assert counts["input_bytes"] == src.stat().st_size
+    assert counts["output_bytes"] == sum(
+        p.stat().st_size for p in (tmp_path / "out").rglob("parsed.jsonl")
+    )
+    assert report["throughput"]["records_per_second"] > 0
+    assert report["settings"]["jobs"] == jobs
+    assert report["largest_thread"]["parsed"]["by_messages"]["messages"] == 1
+
+
+def test_export_report_tracks_render_split_and_write(tmp_path):
+    src = tmp_path / "conversations.json"
+    write_conversations(src, conversations(1))
+    parse_to_jsonl("openai", src, tmp_path / "out")
+    (parsed,) = (tmp_path / "out").rglob("parsed.jsonl")
+
+    run_stats = RunStats("export")
+    paths = export_thread_md(parsed, tmp_path / "md" / "out.md", split="count=1", run_stats=run_stats)
+    report = run_stats.to_dict()
+
+    assert {"read", "render", "split", "write"} <= set(report["stages"])
+    assert report["counts"]["markdown_files"] == len(paths)
+    assert report["counts"]["markdown_bytes"] == sum(p.stat().st_size for p in paths)
+    assert report["largest_thread"]["markdown"]["by_bytes"]["conversation_id"] == "conv-0"
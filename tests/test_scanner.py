@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from llm_logparser.core.scanner import ScanError, iter_array_spans, iter_record_spans, peek_members
+
+
+def _elements(data: bytes) -> list:
+    return [json.loads(data[a:b]) for a, b in iter_array_spans(data)]
+
+
+def test_spans_ignore_structure_inside_strings():
+    items = [
+        {"text": "brace } bracket ] comma , quote \" backslash \\"},
+        {"nested": [{"a": [1, 2, {"b": "]"}]}], "x": None},
+        "scalar, with comma",
+        42,
+        [],
+        {"uni": "東京 \\u0041"},
+    ]
+    data = ("﻿  " + json.dumps(items, ensure_ascii=False, indent=1)).encode("utf-8")
+    assert _elements(data) == items
+
+
+def test_spans_fall_back_for_deep_nesting():
+    deep = {"k": 0}
+    for _ in range(40):
+        deep = {"k": [deep]}
+    data = json.dumps([deep, {"after": True}]).encode()
+    assert _elements(data) == [deep, {"after": True}]
+
+
+def test_spans_empty_and_invalid_arrays():
+    assert _elements(b" [ ] ") == []
+    with pytest.raises(ScanError):
+        list(iter_array_spans(b'{"a": 1}'))
+    with pytest.raises(ScanError):
+        list(iter_array_spans(b'[{"a": "unterminated}'))
+
+
+def test_record_spans_from_file(tmp_path):
+    p = tmp_path / "conversations.json"
+    p.write_text(json.dumps([{"id": "a"}, {"id": "b"}]), encoding="utf-8")
+    spans = list(iter_record_spans(p))
+    assert [s.index for s in spans] == [1, 2]
+    assert [s.load()["id"] for s in spans] == ["a", "b"]
+
+
+def test_record_spans_resume_at_offset(tmp_path):
+    p = tmp_path / "conversations.json"
+    p.write_text(json.dumps([{"id": "a"}, 7, {"id": "c"}], indent=1), encoding="utf-8")
+    spans = list(iter_record_spans(p))
+    rest = list(iter_record_spans(p, resume_at=spans[0].end, index=1))
+    assert rest == spans[1:]
+    assert list(iter_record_spans(p, resume_at=spans[-1].end, index=3)) == []
+
+
+def _peek(obj, names):
+    data = json.dumps(obj, indent=1).encode()
+    return peek_members(data, 0, len(data), names)
+
+
+def test_peek_members_reads_head_and_tail_only():
+    conv = {"title": "t", "update_time": 1.5, "mapping": {"n": {"id": "inner"}}, "tags": [], "id": "top"}
+    assert _peek(conv, ["id", "update_time", "title"]) == {"id": "top", "update_time": 1.5, "title": "t"}
+    # keys inside nested values or inside strings are never reported
+    assert _peek({"mapping": {"a": 1, "id": "inner"}}, ["id"]) == {}
+    assert _peek({"m": [1], "note": "\"id\": \"fake\"", "z": {"id": 1}}, ["id"]) == {}
+    assert _peek([{"id": "x"}], ["id"]) == {}